@@ -50,6 +50,58 @@ else:
     # SECURITY WARNING: don't run with debug turned on in production!
     DEBUG = True
 
+# How check-ins posted to `/` are written to the database:
+#   "orm": Django model instances inside a transaction (default)
+#   "statement": one `INSERT ... ON CONFLICT DO NOTHING` statement per check-in
+#   "buffered": queued in memory and written in batches by a background thread
+INGEST_MODE = os.environ.get("INGEST_MODE", "orm")
+assert INGEST_MODE in ["orm", "statement", "buffered"]
+
+# "asgi" routes requests to the async views in `pulpanalytics.async_views`. `app.asgi` sets it.
+SERVER_INTERFACE = os.environ.get("SERVER_INTERFACE", "wsgi")
+assert SERVER_INTERFACE in ["wsgi", "asgi"]
+ASYNC_VIEWS = SERVER_INTERFACE == "asgi"
+
+# Buffered ingest: a batch is written when it holds INGEST_BATCH_SIZE check-ins or
+# INGEST_FLUSH_INTERVAL seconds after its first check-in arrived. At most INGEST_QUEUE_SIZE
+# check-ins wait in memory per process; when the queue is full, INGEST_BACKPRESSURE decides
+# whether the request waits ("block"), the check-in is discarded ("drop") or the request is
+# answered with 503 ("reject").
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", 500))
+INGEST_FLUSH_INTERVAL = float(os.environ.get("INGEST_FLUSH_INTERVAL", 5))
+INGEST_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", 10_000))
+INGEST_BACKPRESSURE = os.environ.get("INGEST_BACKPRESSURE", "block")
+assert INGEST_BACKPRESSURE in ["block", "drop", "reject"]
+
+# Limits for the `/batch/` endpoint, which takes a stream of length-delimited check-ins.
+INGEST_BATCH_MAX_MESSAGES = int(os.environ.get("INGEST_BATCH_MAX_MESSAGES", 50_000))
+INGEST_BATCH_MAX_MESSAGE_SIZE = 64 * 1024
+
+# Check-ins may be sent with `Content-Encoding: gzip` or `zstd`. Decoding stops with a 413 as soon
+# as the decompressed body grows beyond these sizes.
+INGEST_MAX_DECODED_SIZE = 1024 * 1024
+INGEST_BATCH_MAX_DECODED_SIZE = 64 * 1024 * 1024
+
+# Keep per-day counters (DailyCounter) up to date as check-ins are stored, so `summarize` can copy
+# a day's counts instead of recomputing them from the System and Component rows.
+INCREMENTAL_SUMMARY = os.environ.get("INCREMENTAL_SUMMARY", "false").lower() == "true"
+
+# Number of system_id -> first_seen entries each process keeps in memory.
+FIRST_SEEN_CACHE_SIZE = int(os.environ.get("FIRST_SEEN_CACHE_SIZE", 100_000))
+
+# Each process remembers up to this many systems that checked in today in a Bloom filter and
+# answers their repeat check-ins without touching the database. A repeat is recognized with
+# certainty, a new system is wrongly taken for a repeat with probability
+# DUPLICATE_FILTER_ERROR_RATE. 0 disables the filter.
+DUPLICATE_FILTER_CAPACITY = int(os.environ.get("DUPLICATE_FILTER_CAPACITY", 0))
+DUPLICATE_FILTER_ERROR_RATE = float(os.environ.get("DUPLICATE_FILTER_ERROR_RATE", 1e-9))
+
+# Embed the data of all dashboard charts in the index page, which is then cached until the
+# summaries change, so the page draws its charts without fetching `/dashboard/`.
+INLINE_DASHBOARD = os.environ.get("INLINE_DASHBOARD", "false").lower() == "true"
+
+# The revision the index page shows when BASE_DIR is not a git checkout.
+GIT_REVISION = os.environ.get("GIT_REVISION", "unknown")
 
 # Application definition
 
@@ -109,6 +161,23 @@ DATABASES = {
     },
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# The "charts" cache keeps chart responses until the summaries change. Every process has its own
+# memory cache by default; CHART_CACHE_BACKEND and CHART_CACHE_LOCATION select another backend,
+# e.g. "django.core.cache.backends.filebased.FileBasedCache" and a directory shared by the workers.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "charts": {
+        "BACKEND": os.environ.get(
+            "CHART_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CHART_CACHE_LOCATION", "charts"),
+        "TIMEOUT": None,
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,85 @@
+"""Compare the payload size and serialization time of the Chart.js and the columnar responses.
+
+The summaries are the synthetic ones of `benchmarks.chart_pivot`. Each chart is computed once,
+then serialized as `JsonResponse` does for Chart.js and as `?format=columnar` does.
+
+Usage: python -m benchmarks.chart_formats [--years N] [--versions N]
+"""
+
+import argparse
+from datetime import timedelta
+
+from benchmarks.chart_pivot import _store
+from benchmarks.utils import setup, test_database, timer
+
+REPEAT = 5
+
+
+def _charts():
+    from pulpanalytics import columnar, views
+    from pulpanalytics.models import AgeCount, NumberCount, XYZVersionCount
+
+    def rows(model, key):
+        qs = model.objects.order_by("summary_id").values_list("summary_id", key, "count")
+        return list(qs.iterator())
+
+    return {
+        "plugin_stats z_stream": (
+            views._plugin_stats_data(rows(XYZVersionCount, "version")),
+            columnar.series,
+        ),
+        "systems_by_age bucket": (
+            views._systems_by_age_data(rows(AgeCount, "age"), bucket=True),
+            columnar.series,
+        ),
+        "rbac_stats users": (
+            views._rbac_stats_data(rows(NumberCount, "number"), bucket=False),
+            columnar.series,
+        ),
+        # The 200 ages of the last day, oldest first.
+        "demography": (
+            views._demography_data(
+                sorted(
+                    ((age, count) for _, age, count in rows(AgeCount, "age")[-200:]), reverse=True
+                )
+            ),
+            columnar.demography,
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--versions", type=int, default=40)
+    args = parser.parse_args()
+
+    setup()
+    from django.http import JsonResponse
+    from django.utils import timezone
+
+    from pulpanalytics import columnar
+
+    days = 365 * args.years
+    last_day = timezone.now().date() - timedelta(days=1)
+    with test_database():
+        _store(last_day - timedelta(days=days - 1), days, args.versions)
+        charts = _charts()
+
+    print(f"{days} days, best of {REPEAT}")
+    print(f"{'chart':<24} {'format':<9} {'bytes':>10} {'ms':>7}")
+    for label, (data, to_columnar) in charts.items():
+        for name, serialize in [
+            ("chartjs", lambda: JsonResponse(data)),
+            ("columnar", lambda: columnar.response(to_columnar(data))),
+        ]:
+            seconds = []
+            for _ in range(REPEAT):
+                with timer() as elapsed:
+                    response = serialize()
+                seconds.append(elapsed["seconds"])
+            print(f"{label:<24} {name:<9} {len(response.content):>10} {min(seconds) * 1000:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
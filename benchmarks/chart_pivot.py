@@ -0,0 +1,84 @@
+"""Time the chart views that pivot daily counts into one series per key.
+
+`--years` years of daily summaries are stored with synthetic counts: `--versions` core X.Y.Z
+versions in use at any time, released one every few days, and system ages and user numbers
+spread over 200 and 50 values. The undecorated sync views are timed, so neither the chart cache
+nor the snapshots answer.
+
+Usage: python -m benchmarks.chart_pivot [--years N] [--versions N]
+"""
+
+import argparse
+from datetime import timedelta
+from inspect import unwrap
+
+from benchmarks.utils import setup, test_database, timer
+
+REQUESTS = {
+    "plugin_stats z_stream": ("plugin_stats_view", {"plugin": "core"}, "z_stream=1"),
+    "systems_by_age bucket": ("systems_by_age_view", {}, "bucket=1"),
+    "rbac_stats users": ("rbac_stats_view", {"measure": "users"}, ""),
+}
+
+
+def _store(first_day, days, versions):
+    from pulpanalytics.models import AgeCount, DailySummary, NumberCount, XYZVersionCount
+
+    rows = 0
+    for offset in range(days):
+        daily_summary = DailySummary.objects.create(date=first_day + timedelta(days=offset))
+        # One new release every third day, the oldest of the `versions` in use drops out.
+        newest = offset // 3
+        counts = [
+            XYZVersionCount(
+                summary=daily_summary,
+                name="core",
+                version=f"3.{release // 10}.{release % 10}",
+                count=1 + (offset * release) % 97,
+            )
+            for release in range(max(newest - versions, 0), newest + 1)
+        ]
+        counts += [
+            AgeCount(summary=daily_summary, age=age, count=1 + (offset + age) % 31)
+            for age in range(200)
+        ]
+        counts += [
+            NumberCount(summary=daily_summary, name="users", number=number, count=1 + number % 7)
+            for number in range(50)
+        ]
+        for model in (XYZVersionCount, AgeCount, NumberCount):
+            rows += len(model.objects.bulk_create(c for c in counts if isinstance(c, model)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--versions", type=int, default=40)
+    args = parser.parse_args()
+
+    setup()
+    from django.http import HttpRequest, QueryDict
+    from django.utils import timezone
+
+    from pulpanalytics import views
+
+    days = 365 * args.years
+    last_day = timezone.now().date() - timedelta(days=1)
+    with test_database():
+        rows = _store(last_day - timedelta(days=days - 1), days, args.versions)
+
+        print(f"{days} days, {rows} rows")
+        print(f"{'request':<24} {'series':>7} {'bytes':>10} {'seconds':>9}")
+        for label, (name, kwargs, query) in REQUESTS.items():
+            request = HttpRequest()
+            request.method = "GET"
+            request.GET = QueryDict(query)
+            with timer() as elapsed:
+                response = unwrap(getattr(views, name))(request, **kwargs)
+            series = response.content.count(b'"label"')
+            print(f"{label:<24} {series:>7} {len(response.content):>10} {elapsed['seconds']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Bytes on the wire and server CPU per check-in for each supported `Content-Encoding`.
+
+The CPU cost is the time the server spends decoding the body and parsing the `Analytics`
+message, measured with `time.process_time()` over many repetitions.
+
+Usage: python -m benchmarks.compression [--repeat N]
+"""
+
+import argparse
+import gzip
+import time
+import uuid
+
+from benchmarks.utils import setup
+
+
+def _checkin(components):
+    from pulpanalytics.analytics_pb2 import Analytics
+
+    analytics = Analytics()
+    analytics.system_id = str(uuid.uuid4())
+    analytics.postgresql_version = 150002
+    analytics.online_workers.processes = 4
+    analytics.online_workers.hosts = 2
+    analytics.online_content_apps.processes = 8
+    analytics.online_content_apps.hosts = 2
+    analytics.rbac_stats.users = 12
+    analytics.rbac_stats.groups = 3
+    for index in range(components):
+        analytics.components.add(name=f"plugin_{index}", version=f"3.{index}.{index % 4}")
+    return analytics.SerializeToString()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    import zstandard
+    from django.test import RequestFactory
+
+    from pulpanalytics.analytics_pb2 import Analytics
+    from pulpanalytics.encoding import decoded_body
+
+    encoders = {
+        "identity": lambda data: data,
+        "gzip": gzip.compress,
+        "zstd": zstandard.ZstdCompressor().compress,
+    }
+    factory = RequestFactory()
+    print(f"{'components':>10} {'encoding':<10} {'bytes':>7} {'server µs':>10}")
+    for components in [3, 10, 30]:
+        payload = _checkin(components)
+        for encoding, encode in encoders.items():
+            body = encode(payload)
+            requests = [
+                factory.post("/", body, "application/octets", HTTP_CONTENT_ENCODING=encoding)
+                for _ in range(args.repeat)
+            ]
+            start = time.process_time()
+            for request in requests:
+                Analytics().ParseFromString(decoded_body(request, 1024 * 1024))
+            cpu = (time.process_time() - start) / args.repeat * 1_000_000
+            print(f"{components:>10} {encoding:<10} {len(body):>7} {cpu:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measure the throughput and peak memory of exporting summary tables.
+
+The summaries are the synthetic ones of `benchmarks.chart_pivot`. Every table is exported once to
+measure the time, and once under tracemalloc to measure the peak of Python allocations, which
+should not grow with `--years`.
+
+Usage: python -m benchmarks.export [--years N]
+"""
+
+import argparse
+import tracemalloc
+from datetime import timedelta
+
+from benchmarks.chart_pivot import _store
+from benchmarks.utils import setup, test_database, timer
+
+TABLES = ["xyzversioncount", "agecount", "numbercount"]
+
+
+def _export(table, export_format):
+    from pulpanalytics import export
+
+    model = export.TABLES[table]
+    encoder = export.ENCODERS[export_format](model)
+    size = 0
+    for chunk in export.stream(encoder, export.export_queryset(model).iterator()):
+        size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+    from django.utils import timezone
+
+    from pulpanalytics import export
+
+    days = 365 * args.years
+    last_day = timezone.now().date() - timedelta(days=1)
+    with test_database():
+        _store(last_day - timedelta(days=days - 1), days, 40)
+
+        print(f"{days} days")
+        print(f"{'table':<16} {'format':<8} {'rows':>8} {'bytes':>10} {'rows/s':>9} {'peak MB':>8}")
+        for table in TABLES:
+            rows = export.TABLES[table].objects.count()
+            for export_format in export.ENCODERS:
+                with timer() as elapsed:
+                    size = _export(table, export_format)
+                tracemalloc.start()
+                _export(table, export_format)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(
+                    f"{table:<16} {export_format:<8} {rows:>8} {size:>10} "
+                    f"{rows / elapsed['seconds']:>9.0f} {peak / 2**20:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
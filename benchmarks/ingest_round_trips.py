@@ -0,0 +1,58 @@
+"""Compare database round trips and latency per check-in for each `INGEST_MODE`.
+
+Usage: python -m benchmarks.ingest_round_trips [--checkins N] [--components N]
+"""
+
+import argparse
+import uuid
+
+from benchmarks.utils import count_round_trips, setup, test_database, timer
+
+
+def _payloads(checkins, components):
+    from pulpanalytics.analytics_pb2 import Analytics
+
+    payloads = []
+    for _ in range(checkins):
+        analytics = Analytics()
+        analytics.system_id = str(uuid.uuid4())
+        analytics.postgresql_version = 150002
+        analytics.online_workers.processes = 4
+        analytics.online_workers.hosts = 2
+        for index in range(components):
+            analytics.components.add(name=f"plugin{index}", version="3.28.1")
+        payloads.append(analytics.SerializeToString())
+    return payloads
+
+
+def _post_all(client, payloads):
+    with count_round_trips() as round_trips, timer() as elapsed:
+        for payload in payloads:
+            response = client.post("/", payload, "application/octets")
+            assert response.status_code == 200, response.status_code
+    return round_trips.count / len(payloads), elapsed["seconds"] * 1000 / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checkins", type=int, default=500)
+    parser.add_argument("--components", type=int, default=8)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    print(f"{'mode':<10} {'case':<10} {'round trips':>12} {'ms/check-in':>12}")
+    with test_database():
+        for mode in ["orm", "statement"]:
+            settings.INGEST_MODE = mode
+            payloads = _payloads(args.checkins, args.components)
+            for case in ["new", "duplicate"]:
+                round_trips, ms = _post_all(client, payloads)
+                print(f"{mode:<10} {case:<10} {round_trips:>12.1f} {ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure the size of the daily plugin bitmaps and the latency of queries over them.
+
+`--days` days of bitmaps are stored for a fleet of `--systems` systems. Each system checks in on
+70% of the days and reports core and, with its own probability, each other plugin. The queries
+are answered by `pulpanalytics.bitmaps.matching_systems`, loading the bitmaps from the database.
+
+Usage: python -m benchmarks.plugin_bitmaps [--systems N] [--days N]
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from benchmarks.utils import setup, test_database, timer
+
+# Plugin: share of the systems reporting it
+PLUGINS = {
+    "core": 1.0,
+    "file": 0.6,
+    "rpm": 0.4,
+    "container": 0.3,
+    "ansible": 0.1,
+    "galaxy": 0.02,
+}
+
+QUERIES = {
+    "core, one day": ({"all_of": ["core"]}, 1),
+    "core, all days": ({"all_of": ["core"]}, None),
+    "rpm and container, same day": ({"all_of": ["rpm", "container"]}, None),
+    "galaxy or ansible, all days": ({"any_of": ["galaxy", "ansible"]}, None),
+}
+
+
+def _store(first_day, days, systems):
+    from pyroaring import BitMap
+
+    from pulpanalytics.models import DailySummary, SystemBitmap
+
+    rng = random.Random(0)
+    plugins = {
+        name: [rng.random() < share for _ in range(systems)] for name, share in PLUGINS.items()
+    }
+    sizes = {name: [] for name in PLUGINS}
+    for offset in range(days):
+        daily_summary = DailySummary.objects.create(date=first_day + timedelta(days=offset))
+        active = [number for number in range(systems) if rng.random() < 0.7]
+        bitmaps = []
+        for name, reports in plugins.items():
+            bitmap = BitMap(number for number in active if reports[number]).serialize()
+            sizes[name].append((len(bitmap), sum(reports[number] for number in active)))
+            bitmaps.append(SystemBitmap(summary=daily_summary, name=name, bitmap=bitmap))
+        SystemBitmap.objects.bulk_create(bitmaps)
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--systems", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    from django.utils import timezone
+
+    from pulpanalytics.bitmaps import matching_systems
+
+    last_day = timezone.now().date() - timedelta(days=1)
+    first_day = last_day - timedelta(days=args.days - 1)
+    with test_database():
+        sizes = _store(first_day, args.days, args.systems)
+
+        print(f"{args.systems} systems, {args.days} days")
+        print(f"{'plugin':<12} {'systems/day':>12} {'bytes/day':>10} {'bytes/system':>13}")
+        for name, day_sizes in sizes.items():
+            size = sum(size for size, _ in day_sizes) / len(day_sizes)
+            count = sum(count for _, count in day_sizes) / len(day_sizes)
+            print(f"{name:<12} {count:>12.0f} {size:>10.0f} {size / max(count, 1):>13.3f}")
+
+        print()
+        print(f"{'query':<30} {'systems':>8} {'seconds':>9}")
+        for label, (query, days) in QUERIES.items():
+            start = last_day - timedelta(days=days - 1) if days else None
+            with timer() as elapsed:
+                systems = len(matching_systems(start=start, **query))
+            print(f"{label:<30} {systems:>8} {elapsed['seconds']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
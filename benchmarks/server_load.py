@@ -0,0 +1,137 @@
+"""Compare requests/sec and p99 latency of the sync (WSGI) and async (ASGI) deployments.
+
+Both are served by gunicorn with the same number of workers, the async one with uvicorn's worker
+class, exactly as `start.sh` would run them. Half of the requests post check-ins, the other half
+read a chart.
+
+Usage: python -m benchmarks.server_load [--workers N] [--concurrency N] [--duration SECONDS]
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+from benchmarks.utils import setup, test_database
+
+PORT = 8765
+
+
+def _seed_summaries(days):
+    from pulpanalytics.models import DailySummary, XYVersionCount
+
+    today = date.today()
+    for offset in range(days):
+        summary = DailySummary.objects.create(date=today - timedelta(days=offset))
+        XYVersionCount.objects.bulk_create(
+            XYVersionCount(summary=summary, name="core", version=f"3.{minor}", count=minor)
+            for minor in range(20)
+        )
+
+
+def _checkin():
+    from pulpanalytics.analytics_pb2 import Analytics
+
+    analytics = Analytics()
+    analytics.system_id = str(uuid.uuid4())
+    for name in ["core", "file", "rpm", "container", "ansible"]:
+        analytics.components.add(name=name, version="3.28.1")
+    return analytics.SerializeToString()
+
+
+def _start_server(interface, workers):
+    from django.db import connection
+
+    env = dict(os.environ, DB_DATABASE=connection.settings_dict["NAME"], SERVER_INTERFACE=interface)
+    command = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{PORT}"]
+    if interface == "asgi":
+        command += ["-k", "uvicorn.workers.UvicornWorker", "app.asgi"]
+    else:
+        command += ["app.wsgi"]
+    server = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", PORT)
+            connection.request("GET", "/postgresql_versions/")
+            connection.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"The {interface} server did not start.")
+
+
+def _client(deadline, latencies, lock):
+    connection = http.client.HTTPConnection("127.0.0.1", PORT)
+    local = {"post": [], "get": []}
+    kind = "post"
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if kind == "post":
+            connection.request("POST", "/", _checkin(), {"Content-Type": "application/octets"})
+        else:
+            connection.request("GET", "/plugin_stats/core/")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        local[kind].append(time.perf_counter() - start)
+        kind = "get" if kind == "post" else "post"
+    with lock:
+        for key, values in local.items():
+            latencies[key].extend(values)
+
+
+def _run_load(concurrency, duration):
+    latencies = {"post": [], "get": []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    clients = [
+        threading.Thread(target=_client, args=(deadline, latencies, lock))
+        for _ in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    return latencies
+
+
+def _p99(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--days", type=int, default=30, help="days of chart data")
+    args = parser.parse_args()
+
+    setup()
+    print(f"{args.workers} workers, {args.concurrency} concurrent clients, {args.duration}s each")
+    print(f"{'interface':<10} {'req/s':>8} {'POST p99 ms':>12} {'GET p99 ms':>12}")
+    with test_database():
+        _seed_summaries(args.days)
+        for interface in ["wsgi", "asgi"]:
+            server = _start_server(interface, args.workers)
+            try:
+                latencies = _run_load(args.concurrency, args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+            total = len(latencies["post"]) + len(latencies["get"])
+            print(
+                f"{interface:<10} {total / args.duration:>8.1f} "
+                f"{_p99(latencies['post']):>12.2f} {_p99(latencies['get']):>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Time each step of `./manage.py summarize` for one day of check-ins.
+
+The day is filled with `--systems` check-ins reporting core and about a third of the other plugins
+each, with spread out versions, RBAC and deployment numbers.
+
+The full recompute is compared with finalizing the day from the incremental counters that ingest
+maintains with `INCREMENTAL_SUMMARY`.
+
+Usage: python -m benchmarks.summarize_day [--systems N]
+"""
+
+import argparse
+from datetime import timedelta
+
+from benchmarks.utils import count_round_trips, setup, test_database, timer
+
+SEED_SYSTEMS_SQL = """
+INSERT INTO pulpanalytics_system (
+    system_id,
+    created,
+    first_seen,
+    postgresql_version,
+    users,
+    groups,
+    domains,
+    custom_access_policies,
+    custom_roles,
+    content_app_processes,
+    content_app_hosts,
+    worker_processes,
+    worker_hosts
+)
+SELECT
+    gen_random_uuid(),
+    %(start)s + (i %% 86400) * INTERVAL '1 second',
+    %(start)s - (i %% 400) * INTERVAL '1 day',
+    (ARRAY[0, 130000, 140000, 150000, 160000])[1 + i %% 5],
+    i %% 50,
+    i %% 7,
+    i %% 3,
+    i %% 4,
+    i %% 5,
+    1 + i %% 8,
+    1 + i %% 3,
+    1 + i %% 16,
+    1 + i %% 4
+FROM generate_series(1, %(systems)s) AS i
+"""
+
+SEED_COMPONENTS_SQL = """
+INSERT INTO pulpanalytics_component (system_id, created, name, version)
+SELECT system.id, system.created, plugin.name,
+    '3.' || (system.id + plugin.k) % 40 || '.' || system.id % 5
+FROM pulpanalytics_system system
+JOIN (
+    VALUES (0, 'core'), (1, 'file'), (2, 'rpm'), (3, 'container'), (4, 'ansible'), (5, 'deb'),
+        (6, 'python'), (7, 'gem'), (8, 'maven'), (9, 'ostree')
+) AS plugin (k, name)
+ON plugin.k = 0 OR (system.id + plugin.k) % 3 = 0
+"""
+
+STEPS = [
+    "_handle_age",
+    "_handle_components",
+    "_handle_system_stats",
+    "_handle_sketches",
+    "_handle_bitmaps",
+]
+
+
+def _seed(day, systems):
+    from django.conf import settings
+    from django.db import connection
+
+    from pulpanalytics.ingest import COUNT_CHECKINS_SQL
+    from pulpanalytics.partitions import day_bounds, ensure_partitions
+
+    ensure_partitions(day, day + timedelta(days=1))
+    start, _ = day_bounds(day)
+    with connection.cursor() as cursor:
+        cursor.execute(SEED_SYSTEMS_SQL, {"start": start, "systems": systems})
+        cursor.execute(SEED_COMPONENTS_SQL)
+        cursor.execute(
+            f"""
+            WITH new_system AS (SELECT * FROM pulpanalytics_system),
+            new_components AS (SELECT system_id, name, version FROM pulpanalytics_component),
+            {COUNT_CHECKINS_SQL}
+            SELECT 1
+            """,
+            {"persistent_min_age_days": settings.PERSISTENT_MIN_AGE_DAYS},
+        )
+        cursor.execute("ANALYZE pulpanalytics_system, pulpanalytics_component")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--systems", type=int, default=100_000)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.db import transaction
+    from django.db.models.functions import TruncDay
+    from django.utils import timezone
+
+    from pulpanalytics.management.commands.summarize import Command
+    from pulpanalytics.models import DailyCounter, DailySummary, System
+    from pulpanalytics.partitions import day_bounds
+
+    day = timezone.now().date() - timedelta(days=1)
+    with test_database():
+        _seed(day, args.systems)
+        start, end = day_bounds(day)
+        systems = System.objects.annotate(age=TruncDay("created") - TruncDay("first_seen")).filter(
+            created__gte=start, created__lt=end
+        )
+        persistent_systems = systems.filter(
+            age__gte=timedelta(days=settings.PERSISTENT_MIN_AGE_DAYS)
+        )
+
+        print(f"{args.systems} systems on {day}")
+        print(f"{'step':<28} {'round trips':>12} {'seconds':>9}")
+        total = 0
+        with transaction.atomic():
+            daily_summary = DailySummary.objects.create(date=day)
+            for step in STEPS:
+                queryset = systems if step == "_handle_age" else persistent_systems
+                with count_round_trips() as round_trips, timer() as elapsed:
+                    getattr(Command, step)(queryset, daily_summary)
+                total += elapsed["seconds"]
+                print(f"{step:<28} {round_trips.count:>12} {elapsed['seconds']:>9.2f}")
+            transaction.set_rollback(True)
+        print(f"{'total':<28} {'':>12} {total:>9.2f}")
+
+        with transaction.atomic():
+            daily_summary = DailySummary.objects.create(date=day)
+            counters = DailyCounter.objects.filter(date=day)
+            with count_round_trips() as round_trips, timer() as elapsed:
+                Command._counters_complete(counters, systems)
+                Command._handle_counters(counters, daily_summary)
+            print(f"{'_handle_counters':<28} {round_trips.count:>12} {elapsed['seconds']:>9.2f}")
+            transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Helpers shared by the benchmark scripts.
+
+The benchmarks run against a throwaway test database created next to the one configured in
+`app/settings.py`, so they need the same `DB_*` and `APP_KEY` environment as `./manage.py`.
+Run them from the repository root, e.g. `python -m benchmarks.ingest_round_trips`.
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+class RoundTrips:
+    count = 0
+
+
+@contextmanager
+def count_round_trips():
+    """Count client/server round trips, including BEGIN, COMMIT and SAVEPOINT statements.
+
+    libpq traces every protocol message; the server answers each round trip with exactly one
+    `ReadyForQuery`.
+    """
+    from django.db import connection
+
+    connection.ensure_connection()
+    pgconn = connection.connection.pgconn
+    result = RoundTrips()
+    with tempfile.TemporaryFile() as trace:
+        pgconn.trace(trace.fileno())
+        try:
+            yield result
+        finally:
+            pgconn.untrace()
+            trace.seek(0)
+            result.count = sum(1 for line in trace if b"\tB\t" in line and b"ReadyForQuery" in line)
+
+
+@contextmanager
+def timer():
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
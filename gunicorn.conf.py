@@ -0,0 +1,15 @@
+import sys
+
+
+def post_worker_init(worker):
+    # Resolve the revision the index page shows at startup rather than on its first request.
+    from pulpanalytics.views import _get_git_revision
+
+    _get_git_revision()
+
+
+def worker_exit(server, worker):
+    # Write check-ins still waiting in the buffer before the worker goes away.
+    buffer = sys.modules.get("pulpanalytics.buffer")
+    if buffer is not None:
+        buffer.checkin_buffer.stop()
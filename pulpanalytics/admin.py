@@ -13,6 +13,7 @@ from pulpanalytics.models import (
     NumberCount,
     PostgresVersionCount,
     System,
+    SystemFirstSeen,
     XYVersionCount,
     XYZVersionCount,
 )
@@ -23,6 +24,7 @@ admin.site.register(DeploymentStats)
 admin.site.register(NumberCount)
 admin.site.register(PostgresVersionCount)
 admin.site.register(System)
+admin.site.register(SystemFirstSeen)
 admin.site.register(XYVersionCount)
 admin.site.register(XYZVersionCount)
 
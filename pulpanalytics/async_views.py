@@ -0,0 +1,131 @@
+"""Async variants of the views in `pulpanalytics.views`, used when served through `app.asgi`.
+
+Reads go through Django's async ORM. Writing a check-in needs a transaction, which the async ORM
+does not offer, so the ingest path hands the synchronous writer to a thread with `sync_to_async`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from pulpanalytics import columnar, export, views
+from pulpanalytics.chart_cache import cached_chart
+from pulpanalytics.models import DailySummary
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class RootView(View):
+    async def get(self, request):
+        # The page may embed the dashboard data, read through the sync ORM.
+        return await sync_to_async(views._render_index)(request)
+
+    async def post(self, request):
+        return await sync_to_async(views._receive_checkin)(request)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class BatchView(View):
+    async def post(self, request):
+        return await sync_to_async(views._receive_batch)(request)
+
+
+class PostgresqlVersionsView(View):
+    async def get(self, request):
+        daily_summary = await views._latest_summary_queryset(request).alast()
+        items = []
+        if daily_summary is not None:
+            qs = daily_summary.postgresversioncount_set.order_by("version")
+            items = [item async for item in qs]
+        return JsonResponse(views._postgresql_versions_data(daily_summary, items))
+
+
+class DeploymentStatsView(View):
+    async def get(self, request, component):
+        rows = [row async for row in views._deployment_stats_queryset(request, component)]
+        return views._series_response(request, views._deployment_stats_data(rows))
+
+
+class PluginStatsView(View):
+    async def get(self, request, plugin):
+        rows = [row async for row in views._plugin_stats_queryset(request, plugin)]
+        return views._series_response(request, views._plugin_stats_data(rows))
+
+
+class DistinctSystemsView(View):
+    async def get(self, request):
+        rows = [row async for row in views._distinct_systems_queryset(request)]
+        return JsonResponse(views._distinct_systems_data(rows))
+
+
+class PluginSystemsView(View):
+    async def get(self, request):
+        qs, all_of, any_of = views._plugin_systems_query(request)
+        rows = [row async for row in qs]
+        return JsonResponse(views._plugin_systems_data(rows, all_of, any_of))
+
+
+class PluginCooccurrenceView(View):
+    async def get(self, request):
+        qs, days = views._plugin_cooccurrence_query(request)
+        rows = [row async for row in qs]
+        return JsonResponse(views._plugin_cooccurrence_data(rows, await days.acount()))
+
+
+class DemographyView(View):
+    async def get(self, request):
+        daily_summary = await views._latest_summary_queryset(request).alast()
+        rows = []
+        if daily_summary is not None:
+            qs = daily_summary.agecount_set.order_by("-age").values_list("age", "count")
+            rows = [row async for row in qs]
+        data = views._demography_data(rows)
+        return views._series_response(request, data, columnar.demography)
+
+
+class SystemsByAgeView(View):
+    async def get(self, request):
+        rows = [row async for row in views._systems_by_age_queryset(request)]
+        data = views._systems_by_age_data(rows, request.GET.get("bucket"))
+        return views._series_response(request, data)
+
+
+class RbacStatsView(View):
+    async def get(self, request, measure):
+        rows = [row async for row in views._rbac_stats_queryset(request, measure)]
+        data = views._rbac_stats_data(rows, request.GET.get("bucket"))
+        return views._series_response(request, data)
+
+
+class DashboardView(View):
+    async def get(self, request):
+        daily_summary = await DailySummary.objects.order_by("date").alast()
+        querysets = views._dashboard_querysets(daily_summary)
+        rows = {name: [row async for row in qs] for name, qs in querysets.items()}
+        return JsonResponse(views._dashboard_data(daily_summary, **rows))
+
+
+class ExportView(View):
+    async def get(self, request, table):
+        # `request.user` is loaded lazily from the session, which must not happen in the event loop.
+        if not await sync_to_async(lambda: request.user.has_perm(views.EXPORT_PERMISSION))():
+            raise PermissionDenied
+        encoder, qs, filename = views._export_query(request, table)
+        return views._export_response(export.astream(encoder, qs.iterator()), encoder, filename)
+
+
+batch_view = BatchView.as_view()
+runtime_stats_view = views.runtime_stats_view
+postgresql_versions_view = cached_chart("postgresql_versions")(PostgresqlVersionsView.as_view())
+deployment_stats_view = cached_chart("deployment_stats")(DeploymentStatsView.as_view())
+plugin_stats_view = cached_chart("plugin_stats")(PluginStatsView.as_view())
+distinct_systems_view = cached_chart("distinct_systems")(DistinctSystemsView.as_view())
+plugin_systems_view = cached_chart("plugin_systems")(PluginSystemsView.as_view())
+plugin_cooccurrence_view = cached_chart("plugin_cooccurrence")(PluginCooccurrenceView.as_view())
+demography_view = cached_chart("demography")(DemographyView.as_view())
+systems_by_age_view = cached_chart("systems_by_age")(SystemsByAgeView.as_view())
+rbac_stats_view = cached_chart("rbac_stats")(RbacStatsView.as_view())
+dashboard_view = cached_chart("dashboard")(DashboardView.as_view())
+export_view = ExportView.as_view()
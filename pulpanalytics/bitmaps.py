@@ -0,0 +1,71 @@
+"""Roaring bitmaps of the systems that reported each component on a day.
+
+`summarize` numbers the systems densely (`SystemNumber`) and stores, per day and component name,
+the numbers of the systems that reported it. Unions and intersections of these sets answer
+questions about the systems behind the counts after their check-ins have been cleaned up, e.g.
+how many systems ran rpm and container on the same day, or used galaxy during a month.
+"""
+
+from collections import defaultdict
+
+from pyroaring import BitMap
+
+from pulpanalytics.models import SystemBitmap
+
+# Numbers the systems selected by `{systems}` that have none yet. Older systems get the lower
+# numbers, so that the long-lived systems that make up most of a day share bitmap containers.
+NUMBER_SYSTEMS_SQL = """
+INSERT INTO pulpanalytics_systemnumber (system_id)
+SELECT system.system_id FROM ({systems}) AS system
+WHERE NOT EXISTS (
+    SELECT 1 FROM pulpanalytics_systemnumber number WHERE number.system_id = system.system_id
+)
+GROUP BY system.system_id
+ORDER BY MIN(system.first_seen), system.system_id
+ON CONFLICT (system_id) DO NOTHING
+"""
+
+# The numbers of the systems selected by `{systems}`, per component name they reported.
+NUMBERS_BY_NAME_SQL = """
+SELECT component.name, ARRAY_AGG(number.id)
+FROM ({systems}) AS system
+JOIN pulpanalytics_systemnumber number ON number.system_id = system.system_id
+JOIN pulpanalytics_component component ON component.system_id = system.id
+WHERE component.created >= %s AND component.created < %s
+GROUP BY component.name
+"""
+
+
+def bitmap_rows(names, start=None, end=None):
+    """Return the day, name and serialized bitmap of `names` from `start` to `end` (inclusive)."""
+    qs = SystemBitmap.objects.filter(name__in=names)
+    if start is not None:
+        qs = qs.filter(summary__gte=start)
+    if end is not None:
+        qs = qs.filter(summary__lte=end)
+    return qs.values_list("summary_id", "name", "bitmap")
+
+
+def combine(rows, all_of=(), any_of=()):
+    """Return the systems that, on one of the days of `rows`, reported all components of `all_of`
+    and at least one of `any_of`."""
+    if not all_of and not any_of:
+        return BitMap()
+    days = defaultdict(dict)
+    for day, name, bitmap in rows:
+        days[day][name] = BitMap.deserialize(bitmap)
+
+    matches = [BitMap()]
+    for bitmaps in days.values():
+        if not all(name in bitmaps for name in all_of):
+            continue
+        sets = [bitmaps[name] for name in all_of]
+        if any_of:
+            sets.append(BitMap.union(BitMap(), *(bitmaps.get(name, BitMap()) for name in any_of)))
+        matches.append(BitMap.intersection(*sets))
+    return BitMap.union(*matches)
+
+
+def matching_systems(start=None, end=None, all_of=(), any_of=()):
+    """Like `combine()`, over the stored bitmaps from `start` to `end` (inclusive)."""
+    return combine(bitmap_rows({*all_of, *any_of}, start, end), all_of, any_of)
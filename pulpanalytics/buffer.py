@@ -0,0 +1,150 @@
+import atexit
+import logging
+import queue
+import time
+from threading import Event, Lock, Thread
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from pulpanalytics.dedup import duplicate_filter
+from pulpanalytics.ingest import insert_checkins
+
+logger = logging.getLogger(__name__)
+
+
+class _Marker:
+    """Queued behind pending check-ins to find out when they have been written."""
+
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = Event()
+
+
+class CheckinBuffer:
+    """Collect check-ins in memory and write them in batches from a background thread.
+
+    A batch is written once `batch_size` check-ins are queued or `flush_interval` seconds after
+    its first check-in arrived, whichever comes first. When the queue is full, `backpressure`
+    decides what happens to a new check-in: "block" waits for room, "drop" discards it and
+    "reject" refuses it so the caller can answer with an error.
+    """
+
+    def __init__(self, batch_size, flush_interval, queue_size, backpressure):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backpressure = backpressure
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = Lock()
+
+    def put(self, analytics):
+        """Queue a check-in, returns False if it was rejected."""
+        self._start()
+        item = (analytics, timezone.now())
+        if self.backpressure == "block":
+            self._queue.put(item)
+            return True
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.backpressure == "drop":
+                logger.warning("Check-in buffer is full, dropping a check-in.")
+                return True
+            return False
+        return True
+
+    def flush(self):
+        """Block until every check-in queued so far has been written."""
+        self._wait_for(_Marker())
+
+    def stop(self):
+        """Write all pending check-ins and stop the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_Marker(stop=True))
+            thread.join()
+        self._write(self._drain())
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="checkin-buffer", daemon=True)
+                self._thread.start()
+
+    def _wait_for(self, marker):
+        if self._thread is None:
+            self._write(self._drain())
+        else:
+            self._queue.put(marker)
+            marker.done.wait()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if isinstance(item, _Marker):
+                item.done.set()
+            else:
+                batch.append(item)
+
+    def _run(self):
+        try:
+            while True:
+                batch, marker = self._collect()
+                self._write(batch)
+                connection.close_if_unusable_or_obsolete()
+                if marker is not None:
+                    marker.done.set()
+                    if marker.stop:
+                        return
+        finally:
+            connection.close()
+
+    def _collect(self):
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if isinstance(item, _Marker):
+                return batch, item
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch, None
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            stored, dropped = insert_checkins(batch)
+        except Exception:
+            logger.exception(f"Failed to write a batch of {len(batch)} check-ins.")
+            return
+        # The batch is committed, only the check-ins it stored are known to have a row.
+        for system_id, created in stored:
+            duplicate_filter.add(system_id, created.date())
+        logger.info(
+            f"Wrote {len(stored)} check-ins, skipped {len(batch) - dropped - len(stored)} "
+            f"duplicates and dropped {dropped}."
+        )
+
+
+checkin_buffer = CheckinBuffer(
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL,
+    queue_size=settings.INGEST_QUEUE_SIZE,
+    backpressure=settings.INGEST_BACKPRESSURE,
+)
+atexit.register(checkin_buffer.stop)
@@ -0,0 +1,215 @@
+"""Cache of the chart responses, which only change when `summarize` writes summaries.
+
+A response is cached under its view, its normalized query, the newest summary it can show and the
+current summary generation, a counter in the database that is bumped after every transaction
+writing or deleting summaries. Bumping it makes the cached responses stale at once in every process,
+whatever the cache backend (the `charts` alias of `CACHES`).
+
+On a miss, the dashboard charts that `summarize` rendered ahead of time are looked up by the same
+key, see `pulpanalytics.snapshots`.
+
+The same key is the strong ETag of the response, so browsers and proxies revalidating a chart with
+`If-None-Match` or `If-Modified-Since` get a 304 after a single query. Last-Modified is when the
+generation was last bumped, and no earlier than the start of today unless the range ended before.
+"""
+
+import asyncio
+import calendar
+import gzip
+import hashlib
+from contextlib import suppress
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+from functools import wraps
+from threading import Lock
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F, Subquery
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from pulpanalytics.models import ChartSnapshot, DailySummary, SummaryGeneration
+
+# Charts of ranges that ended before today only change when old days are summarized again.
+PAST_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def bump_generation():
+    now = timezone.now()
+    if not SummaryGeneration.objects.filter(pk=1).update(value=F("value") + 1, modified=now):
+        with suppress(IntegrityError), transaction.atomic():
+            SummaryGeneration.objects.create(pk=1, value=1, modified=now)
+
+
+def state_queryset(request):
+    """The newest summary a chart of `request` can show, the generation and when it was bumped."""
+    qs = DailySummary.objects.order_by("-date")
+    end = _end_date(request)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    generation = SummaryGeneration.objects.filter(pk=1)
+    return qs.annotate(
+        generation=Subquery(generation.values("value")),
+        modified=Subquery(generation.values("modified")),
+    ).values_list("date", "generation", "modified")
+
+
+def _end_date(request):
+    return request.GET.get("end_date") or request.GET.get("date")
+
+
+def _past(request):
+    """Whether the range of `request` ended before today, so that it does not depend on the date."""
+    try:
+        return date.fromisoformat(_end_date(request)) < timezone.now().date()
+    except (TypeError, ValueError):
+        return False
+
+
+class ChartCache:
+    """Chart responses in a Django cache, with hit and miss counters of this process."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.hits = 0
+        self.snapshot_hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, name, request, kwargs, state):
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        # Views without a `start_date` default to a range ending today, so the day is part of
+        # the key as well.
+        key = f"{state}:{timezone.now().date()}:{name}:{sorted(kwargs.items())}:{query}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def count(self, hit, snapshot=False):
+        """Count a lookup, `snapshot` hits are the ones answered by a `ChartSnapshot`."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            if snapshot:
+                self.snapshot_hits += 1
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.snapshot_hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.cache.__class__.__name__,
+                "hits": self.hits,
+                "snapshot_hits": self.snapshot_hits,
+                "misses": self.misses,
+            }
+
+
+chart_cache = ChartCache("charts")
+
+
+def _snapshot_queryset(key):
+    return ChartSnapshot.objects.filter(key=key).values_list("content", flat=True)
+
+
+def _conditional_response(request, key, state):
+    """Return a 304 response if the client has the current chart, else None."""
+    return get_conditional_response(
+        request, etag=quote_etag(key), last_modified=_last_modified(request, state)
+    )
+
+
+def _last_modified(request, state):
+    # Summaries only change with a bump of the generation, ranges up to today also with the date.
+    modified = state[2] if state is not None else None
+    if modified is None or not _past(request):
+        today = datetime.combine(timezone.now().date(), time(), tzinfo=dt_timezone.utc)
+        modified = today if modified is None else max(modified, today)
+    return calendar.timegm(modified.utctimetuple())
+
+
+def _set_headers(response, request, key, state):
+    response["ETag"] = quote_etag(key)
+    response["Last-Modified"] = http_date(_last_modified(request, state))
+    if _past(request):
+        patch_cache_control(response, public=True, max_age=PAST_MAX_AGE)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def cached_chart(name):
+    """Serve the GET responses of the chart view `name` from `chart_cache`.
+
+    Responses carry an ETag derived from the newest summary they can show and the generation, and
+    a Last-Modified; clients sending them back get a 304 before the view runs. Only successful
+    responses are stored. Works for sync and async views alike.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, **kwargs):
+                if request.method != "GET":
+                    return await view(request, **kwargs)
+                state = await state_queryset(request).afirst()
+                key = chart_cache.key(name, request, kwargs, state)
+                response = _conditional_response(request, key, state)
+                if response is None:
+                    content = await chart_cache.cache.aget(key)
+                    snapshot = None
+                    if content is None and (snapshot := await _snapshot_queryset(key).afirst()):
+                        content = gzip.decompress(snapshot)
+                        await chart_cache.cache.aset(key, content)
+                    chart_cache.count(content is not None, snapshot=snapshot is not None)
+                    if content is not None:
+                        response = HttpResponse(content, content_type="application/json")
+                    else:
+                        response = await view(request, **kwargs)
+                        if response.status_code != 200:
+                            return response
+                        await chart_cache.cache.aset(key, response.content)
+                return _set_headers(response, request, key, state)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            if request.method != "GET":
+                return view(request, **kwargs)
+            state = state_queryset(request).first()
+            key = chart_cache.key(name, request, kwargs, state)
+            response = _conditional_response(request, key, state)
+            if response is None:
+                content = chart_cache.cache.get(key)
+                snapshot = None
+                if content is None and (snapshot := _snapshot_queryset(key).first()):
+                    content = gzip.decompress(snapshot)
+                    chart_cache.cache.set(key, content)
+                chart_cache.count(content is not None, snapshot=snapshot is not None)
+                if content is not None:
+                    response = HttpResponse(content, content_type="application/json")
+                else:
+                    response = view(request, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                    chart_cache.cache.set(key, response.content)
+            return _set_headers(response, request, key, state)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,102 @@
+import hashlib
+import math
+from threading import Lock
+
+from django.conf import settings
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over byte strings.
+
+    Sized for `capacity` keys at a false positive rate of `error_rate`. It never answers "no" for
+    a key that was added.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing (Kirsch-Mitzenmacher) derives all positions from one digest.
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key)
+        )
+
+
+class DuplicateFilter:
+    """Remembers which systems have checked in today, in this process.
+
+    `seen()` answering True means the system already has a System row for `day`, up to the false
+    positive rate `DUPLICATE_FILTER_ERROR_RATE`. False means it may be new, so the check-in goes to
+    the database where the unique index of the day's partition decides. Keys are only added once
+    their row is known to exist, and no more than `DUPLICATE_FILTER_CAPACITY` per day so the error
+    rate holds. The filter starts empty every day. `DUPLICATE_FILTER_CAPACITY = 0` disables it.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.clear()
+
+    @property
+    def enabled(self):
+        return settings.DUPLICATE_FILTER_CAPACITY > 0
+
+    def clear(self):
+        with self._lock:
+            self._day = None
+            self._filter = None
+            self._entries = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _rotate(self, day):
+        if day != self._day:
+            self._day = day
+            self._filter = BloomFilter(
+                settings.DUPLICATE_FILTER_CAPACITY, settings.DUPLICATE_FILTER_ERROR_RATE
+            )
+            self._entries = 0
+
+    def seen(self, system_id, day):
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._rotate(day)
+            if system_id.bytes in self._filter:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, system_id, day):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._rotate(day)
+            if self._entries < settings.DUPLICATE_FILTER_CAPACITY:
+                self._filter.add(system_id.bytes)
+                self._entries += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "day": self._day,
+                "entries": self._entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+duplicate_filter = DuplicateFilter()
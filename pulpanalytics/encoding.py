@@ -0,0 +1,78 @@
+import gzip
+import zlib
+
+import zstandard
+
+# Compressed input is pulled from the request in chunks of this size.
+READ_SIZE = 16 * 1024
+
+
+class BodyDecodingError(Exception):
+    status = 400
+
+
+class UnsupportedEncoding(BodyDecodingError):
+    status = 415
+
+
+class PayloadTooLarge(BodyDecodingError):
+    status = 413
+
+
+class _LimitedReader:
+    """Read from a decompressing stream, failing as soon as `max_size` bytes were produced."""
+
+    def __init__(self, reader, max_size):
+        self._reader = reader
+        self._remaining = max_size
+
+    def read(self, size=-1):
+        """Read `size` bytes, or everything for a negative size; fewer only at the end."""
+        if size is None or size < 0:
+            size = self._remaining + 1
+        chunks = []
+        while size > 0:
+            chunk = self._read(min(size, self._remaining + 1, READ_SIZE))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def _read(self, size):
+        try:
+            data = self._reader.read(size)
+        except (EOFError, OSError, zlib.error, zstandard.ZstdError) as e:
+            raise BodyDecodingError(f"The request body can not be decoded: {e}")
+        self._remaining -= len(data)
+        if self._remaining < 0:
+            raise PayloadTooLarge("The decoded request body is too large.")
+        return data
+
+
+def decoded_stream(request, max_size):
+    """Return a file-like object yielding the request body with its `Content-Encoding` removed.
+
+    Decompression is incremental, so an oversized or malicious payload is rejected with
+    `PayloadTooLarge` after at most `max_size` decoded bytes, never buffered as a whole.
+    """
+    encoding = request.headers.get("Content-Encoding", "identity").strip().lower()
+    if encoding == "identity":
+        return request
+    if encoding == "gzip":
+        reader = gzip.GzipFile(fileobj=request, mode="rb")
+    elif encoding == "zstd":
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            request, read_size=READ_SIZE, read_across_frames=True
+        )
+    else:
+        raise UnsupportedEncoding(f"The content encoding {encoding} is not supported.")
+    return _LimitedReader(reader, max_size)
+
+
+def decoded_body(request, max_size):
+    """Return the whole request body with its `Content-Encoding` removed."""
+    stream = decoded_stream(request, max_size)
+    if stream is request:
+        return request.body
+    return stream.read()
@@ -0,0 +1,166 @@
+"""Bulk export of the summary tables as CSV or Parquet.
+
+Rows are read with a server-side cursor and encoded in row groups of `ROW_GROUP_SIZE`, each
+handed on as soon as it is encoded, so the memory used does not depend on the date range. The
+`export` command writes the tables to files, `/export/<table>/` streams one of them.
+"""
+
+import csv
+import io
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from pulpanalytics.models import (
+    AgeCount,
+    DailySummary,
+    DeploymentStats,
+    NumberCount,
+    PostgresVersionCount,
+    XYVersionCount,
+    XYZVersionCount,
+)
+
+ROW_GROUP_SIZE = 50_000
+
+TABLES = {
+    model._meta.model_name: model
+    for model in [
+        DailySummary,
+        XYVersionCount,
+        XYZVersionCount,
+        AgeCount,
+        NumberCount,
+        PostgresVersionCount,
+        DeploymentStats,
+    ]
+}
+
+# Django field type: Arrow type name
+ARROW_TYPES = {
+    "DateField": "date32",
+    "FloatField": "float64",
+    "PositiveIntegerField": "int64",
+    "TextField": "string",
+}
+
+
+def _fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if not (field.primary_key and field.auto_created)
+    ]
+
+
+def columns(model):
+    """The exported columns of `model`, the summary a row belongs to is its `date`."""
+    return ["date" if field.is_relation else field.name for field in _fields(model)]
+
+
+def _type_of(field):
+    return (field.target_field if field.is_relation else field).get_internal_type()
+
+
+def export_queryset(model, start_date=None, end_date=None):
+    date = "date" if model is DailySummary else "summary_id"
+    qs = model.objects.order_by(*(field.attname for field in _fields(model)))
+    if start_date is not None:
+        qs = qs.filter(**{f"{date}__gte": start_date})
+    if end_date is not None:
+        qs = qs.filter(**{f"{date}__lte": end_date})
+    return qs.values_list(*(field.attname for field in _fields(model)))
+
+
+class CsvEncoder:
+    content_type = "text/csv"
+
+    def __init__(self, model):
+        self.header = columns(model)
+
+    def encode(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self.header:
+            writer.writerow(self.header)
+            self.header = None
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def close(self):
+        return self.encode([]) if self.header else b""
+
+
+class _Sink(io.RawIOBase):
+    """A file the Parquet writer appends to, emptied after every row group."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ParquetEncoder:
+    content_type = "application/vnd.apache.parquet"
+
+    def __init__(self, model):
+        # Imported here, pyarrow is large and only needed by exports.
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema(
+            (name, getattr(pyarrow, ARROW_TYPES[_type_of(field)])())
+            for name, field in zip(columns(model), _fields(model))
+        )
+        self.sink = _Sink()
+        self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema)
+
+    def encode(self, rows):
+        arrays = [
+            self.pyarrow.array(column, type=field.type)
+            for column, field in zip(zip(*rows), self.schema)
+        ]
+        table = self.pyarrow.Table.from_arrays(arrays, schema=self.schema)
+        self.writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        return self.sink.take()
+
+    def close(self):
+        self.writer.close()
+        return self.sink.take()
+
+
+ENCODERS = {"csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+def stream(encoder, rows):
+    """Encode `rows` in row groups, yielding the bytes of each."""
+    rows = iter(rows)
+    while batch := list(islice(rows, ROW_GROUP_SIZE)):
+        yield encoder.encode(batch)
+    yield encoder.close()
+
+
+async def astream(encoder, rows):
+    """`stream` for async views, each row group read and encoded in the thread of the connection.
+
+    `QuerySet.aiterator()` runs `values_list()` queries in the event loop in Django 4.2.
+    """
+    chunks = stream(encoder, rows)
+    while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+        yield chunk
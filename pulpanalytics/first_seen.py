@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.db import connection
+
+# Returns the stored first_seen, or records `now` for a system that has never been seen. The
+# upsert does not touch existing rows, so repeated check-ins do not leave dead tuples behind.
+UPSERT_FIRST_SEEN_SQL = """
+WITH inserted AS (
+    INSERT INTO pulpanalytics_systemfirstseen (system_id, first_seen)
+    VALUES (%(system_id)s, %(now)s)
+    ON CONFLICT (system_id) DO NOTHING
+    RETURNING first_seen
+)
+SELECT first_seen, FALSE FROM pulpanalytics_systemfirstseen WHERE system_id = %(system_id)s
+UNION ALL
+SELECT first_seen, TRUE FROM inserted
+"""
+
+
+class FirstSeenCache:
+    """A bounded, thread-safe LRU mapping of system_id to first_seen."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, system_id):
+        with self._lock:
+            first_seen = self._data.get(system_id)
+            if first_seen is not None:
+                self._data.move_to_end(system_id)
+            return first_seen
+
+    def set(self, system_id, first_seen):
+        with self._lock:
+            self._data[system_id] = first_seen
+            self._data.move_to_end(system_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+first_seen_cache = FirstSeenCache(settings.FIRST_SEEN_CACHE_SIZE)
+
+
+def get_first_seen(system_id, now):
+    """Return when `system_id` was first seen, recording `now` if it is a new system."""
+    first_seen = first_seen_cache.get(system_id)
+    if first_seen is not None:
+        return first_seen
+
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_FIRST_SEEN_SQL, {"system_id": system_id, "now": now})
+        row = cursor.fetchone()
+    if row is None:
+        # A concurrent request inserted the row after this statement took its snapshot.
+        return now
+    first_seen, inserted = row
+    # Rows inserted by this transaction may still be rolled back, only cache committed ones.
+    if not inserted:
+        first_seen_cache.set(system_id, first_seen)
+    return first_seen
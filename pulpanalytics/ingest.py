@@ -0,0 +1,431 @@
+import logging
+import uuid
+from contextlib import suppress
+from datetime import timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from google.protobuf.message import DecodeError
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.models import Component, System
+
+logger = logging.getLogger(__name__)
+
+
+# Writes the System rows, their `first_seen` and all of their Components in one round trip, however
+# many check-ins are in the batch. The first check-in of a system is recorded in
+# `pulpanalytics_systemfirstseen` on the way. A repeated check-in on the same day hits the unique
+# index of that day's partition, inserts nothing and leaves the transaction intact, so no
+# savepoint is needed. Returns the `system_id` and `created` of every check-in that was stored.
+_INSERT_CHECKINS_SQL = """
+WITH checkin AS (
+    SELECT * FROM UNNEST(
+        %(system_id)s::uuid[],
+        %(created)s::timestamptz[],
+        %(postgresql_version)s::integer[],
+        %(users)s::integer[],
+        %(groups)s::integer[],
+        %(domains)s::integer[],
+        %(custom_access_policies)s::integer[],
+        %(custom_roles)s::integer[],
+        %(content_app_processes)s::integer[],
+        %(content_app_hosts)s::integer[],
+        %(worker_processes)s::integer[],
+        %(worker_hosts)s::integer[]
+    ) AS checkin (
+        system_id,
+        created,
+        postgresql_version,
+        users,
+        groups,
+        domains,
+        custom_access_policies,
+        custom_roles,
+        content_app_processes,
+        content_app_hosts,
+        worker_processes,
+        worker_hosts
+    )
+), inserted_first_seen AS (
+    INSERT INTO pulpanalytics_systemfirstseen (system_id, first_seen)
+    SELECT system_id, MIN(created) FROM checkin GROUP BY system_id
+    ON CONFLICT (system_id) DO NOTHING
+    RETURNING system_id, first_seen
+), first_seen AS (
+    SELECT system_id, first_seen FROM inserted_first_seen
+    UNION ALL
+    SELECT system_id, first_seen FROM pulpanalytics_systemfirstseen
+    WHERE system_id IN (SELECT system_id FROM checkin)
+), new_system AS (
+    INSERT INTO pulpanalytics_system (
+        system_id,
+        created,
+        first_seen,
+        postgresql_version,
+        users,
+        groups,
+        domains,
+        custom_access_policies,
+        custom_roles,
+        content_app_processes,
+        content_app_hosts,
+        worker_processes,
+        worker_hosts
+    )
+    SELECT
+        checkin.system_id,
+        checkin.created,
+        -- Missing only if a concurrent transaction recorded this system after our snapshot.
+        LEAST(COALESCE(first_seen.first_seen, checkin.created), checkin.created),
+        checkin.postgresql_version,
+        checkin.users,
+        checkin.groups,
+        checkin.domains,
+        checkin.custom_access_policies,
+        checkin.custom_roles,
+        checkin.content_app_processes,
+        checkin.content_app_hosts,
+        checkin.worker_processes,
+        checkin.worker_hosts
+    FROM checkin LEFT JOIN first_seen USING (system_id)
+    ON CONFLICT DO NOTHING
+    RETURNING *
+), new_components AS (
+    INSERT INTO pulpanalytics_component (system_id, created, name, version)
+    SELECT new_system.id, new_system.created, component.name, component.version
+    FROM new_system JOIN UNNEST(
+        %(component_system_id)s::uuid[],
+        %(component_created)s::timestamptz[],
+        %(component_name)s::text[],
+        %(component_version)s::text[]
+    ) AS component (system_id, created, name, version) USING (system_id, created)
+    RETURNING system_id, name, version
+){counters}
+SELECT system_id, created FROM new_system
+"""
+
+# Adds the systems in `new_system` and their components in `new_components` to the DailyCounter
+# rows of their day, the way `summarize` would count them: the age histogram counts every system,
+# everything else only the systems at least PERSISTENT_MIN_AGE_DAYS old. Rows are upserted in a
+# fixed order so concurrent check-ins can not deadlock on them.
+COUNT_CHECKINS_SQL = """
+counted AS (
+    SELECT
+        new_system.*,
+        (created AT TIME ZONE 'UTC')::date AS date,
+        (created AT TIME ZONE 'UTC')::date - (first_seen AT TIME ZONE 'UTC')::date AS age
+    FROM new_system
+), persistent AS (
+    SELECT * FROM counted WHERE age >= %(persistent_min_age_days)s
+), counter AS (
+    SELECT date, 'systems' AS kind, '' AS name, '' AS value, 0::bigint AS total FROM counted
+    UNION ALL
+    SELECT date, 'age', '', age::text, 0 FROM counted
+    UNION ALL
+    SELECT date, 'postgresql_version', '', postgresql_version::text, 0 FROM persistent
+    UNION ALL
+    SELECT date, 'number', rbac.name, rbac.number::text, 0
+    FROM persistent CROSS JOIN LATERAL (
+        VALUES
+            ('users', users),
+            ('groups', groups),
+            ('domains', domains),
+            ('custom_access_policies', custom_access_policies),
+            ('custom_roles', custom_roles)
+    ) AS rbac (name, number)
+    WHERE rbac.number IS NOT NULL
+    UNION ALL
+    SELECT date, 'deployment', deployment.name, '', deployment.value
+    FROM persistent CROSS JOIN LATERAL (
+        VALUES
+            ('worker_processes', worker_processes),
+            ('worker_hosts', worker_hosts),
+            ('content_app_processes', content_app_processes),
+            ('content_app_hosts', content_app_hosts)
+    ) AS deployment (name, value)
+    WHERE deployment.value IS NOT NULL
+    UNION ALL
+    SELECT persistent.date, 'xyz_version', component.name, component.version, 0
+    FROM persistent JOIN new_components component ON component.system_id = persistent.id
+), counted_rows AS (
+    INSERT INTO pulpanalytics_dailycounter (date, kind, name, value, count, total)
+    SELECT date, kind, name, value, COUNT(*), SUM(total)
+    FROM counter
+    GROUP BY date, kind, name, value
+    ORDER BY date, kind, name, value
+    ON CONFLICT (date, kind, name, value) DO UPDATE SET
+        count = pulpanalytics_dailycounter.count + EXCLUDED.count,
+        total = pulpanalytics_dailycounter.total + EXCLUDED.total
+)"""
+
+INSERT_CHECKINS_SQL = _INSERT_CHECKINS_SQL.format(counters="")
+INSERT_AND_COUNT_CHECKINS_SQL = _INSERT_CHECKINS_SQL.format(counters=", " + COUNT_CHECKINS_SQL)
+
+# Counts a check-in stored by `save_checkin_orm`.
+COUNT_CHECKIN_SQL = f"""
+WITH new_system AS (
+    SELECT * FROM pulpanalytics_system WHERE id = %(id)s AND created = %(created)s
+), new_components AS (
+    SELECT system_id, name, version FROM pulpanalytics_component
+    WHERE system_id = %(id)s AND created = %(created)s
+), {COUNT_CHECKINS_SQL}
+SELECT COUNT(*) FROM new_system
+"""
+
+SYSTEM_COLUMNS = [
+    "system_id",
+    "created",
+    "postgresql_version",
+    "users",
+    "groups",
+    "domains",
+    "custom_access_policies",
+    "custom_roles",
+    "content_app_processes",
+    "content_app_hosts",
+    "worker_processes",
+    "worker_hosts",
+]
+
+
+class IngestResult(NamedTuple):
+    accepted: int
+    duplicate: int
+    dropped: int
+
+
+class LogAndDropData(IntegrityError):
+    def __init__(self, msg):
+        logger.error(msg)
+        super().__init__(msg)
+
+
+def _check_component_version(version):
+    if not version.count(".") == 2:
+        raise LogAndDropData(f"The version string {version} does not have two periods.")
+
+    x, y, z = version.split(".")
+    for item in [x, y, z]:
+        if not item.isdigit():
+            raise LogAndDropData(f"The version string {version} does not only contain numbers.")
+
+
+def _system_kwargs(analytics):
+    kwargs = {
+        "system_id": analytics.system_id,
+        "postgresql_version": analytics.postgresql_version,
+        "content_app_processes": analytics.online_content_apps.processes,
+        "content_app_hosts": analytics.online_content_apps.hosts,
+        "worker_processes": analytics.online_workers.processes,
+        "worker_hosts": analytics.online_workers.hosts,
+    }
+    if analytics.HasField("rbac_stats"):
+        kwargs["users"] = analytics.rbac_stats.users
+        kwargs["groups"] = analytics.rbac_stats.groups
+        kwargs["domains"] = analytics.rbac_stats.domains
+        kwargs["custom_access_policies"] = analytics.rbac_stats.custom_access_policies
+        kwargs["custom_roles"] = analytics.rbac_stats.custom_roles
+    return kwargs
+
+
+def _save_components(system, analytics):
+    components = []
+    for component in analytics.components:
+        if not settings.COLLECT_DEV_SYSTEMS:
+            _check_component_version(component.version)
+        components.append(
+            Component(
+                system=system,
+                created=system.created,
+                name=component.name,
+                version=component.version,
+            )
+        )
+    Component.objects.bulk_create(components)
+
+
+def save_checkin_orm(analytics):
+    """Store a check-in with the ORM, relying on the database to reject same-day duplicates."""
+    with suppress(IntegrityError), transaction.atomic():
+        system = System.objects.create(**_system_kwargs(analytics))
+        _save_components(system, analytics)
+        if settings.INCREMENTAL_SUMMARY:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    COUNT_CHECKIN_SQL,
+                    {
+                        "id": system.id,
+                        "created": system.created,
+                        "persistent_min_age_days": settings.PERSISTENT_MIN_AGE_DAYS,
+                    },
+                )
+
+
+def validate_checkin(analytics):
+    """Raise `LogAndDropData` for check-ins that must not be stored, return the system_id."""
+    try:
+        system_id = uuid.UUID(analytics.system_id)
+    except ValueError:
+        raise LogAndDropData(f"The system_id {analytics.system_id} is not a UUID.")
+    names = set()
+    for component in analytics.components:
+        if not settings.COLLECT_DEV_SYSTEMS:
+            _check_component_version(component.version)
+        if component.name in names:
+            # The ORM path drops these through `pulpanalytics_component_uniquenes`.
+            raise LogAndDropData(f"The component {component.name} is reported more than once.")
+        names.add(component.name)
+    return system_id
+
+
+def _checkin_params(checkins):
+    """Validate `(analytics, created)` pairs and arrange them as arrays for INSERT_CHECKINS_SQL.
+
+    Returns the parameters and the number of check-ins that were dropped.
+    """
+    params = {column: [] for column in SYSTEM_COLUMNS}
+    params.update(
+        component_system_id=[], component_created=[], component_name=[], component_version=[]
+    )
+    seen = set()
+    dropped = 0
+    for analytics, created in checkins:
+        try:
+            system_id = validate_checkin(analytics)
+        except LogAndDropData:
+            dropped += 1
+            continue
+        # A batch may span midnight, each UTC day of a system has its own row.
+        key = (system_id, created.astimezone(dt_timezone.utc).date())
+        if key in seen:
+            # Same-day repeats within one batch are counted as duplicates by the caller.
+            continue
+        seen.add(key)
+
+        system = {
+            "users": None,
+            "groups": None,
+            "domains": None,
+            "custom_access_policies": None,
+            "custom_roles": None,
+            **_system_kwargs(analytics),
+            "system_id": system_id,
+            "created": created,
+        }
+        for column in SYSTEM_COLUMNS:
+            params[column].append(system[column])
+        for component in analytics.components:
+            params["component_system_id"].append(system_id)
+            params["component_created"].append(created)
+            params["component_name"].append(component.name)
+            params["component_version"].append(component.version)
+    return params, dropped
+
+
+def insert_checkins(checkins):
+    """Store `(analytics, created)` pairs with a single statement.
+
+    Invalid check-ins are logged and dropped, repeated ones on the same day are skipped. Returns
+    the `(system_id, created)` of every check-in that was stored and the number dropped.
+    """
+    params, dropped = _checkin_params(checkins)
+    if not params["system_id"]:
+        return [], dropped
+    sql = INSERT_CHECKINS_SQL
+    if settings.INCREMENTAL_SUMMARY:
+        sql = INSERT_AND_COUNT_CHECKINS_SQL
+        params["persistent_min_age_days"] = settings.PERSISTENT_MIN_AGE_DAYS
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall(), dropped
+
+
+def save_checkins(checkins):
+    """`insert_checkins`, counting what became of the check-ins."""
+    checkins = list(checkins)
+    stored, dropped = insert_checkins(checkins)
+    accepted = len(stored)
+    return IngestResult(
+        accepted=accepted, duplicate=len(checkins) - dropped - accepted, dropped=dropped
+    )
+
+
+def save_checkin_statement(analytics):
+    """Store a check-in with a single `INSERT ... ON CONFLICT DO NOTHING` statement."""
+    return save_checkins([(analytics, timezone.now())])
+
+
+def save_checkin(analytics):
+    """Store a check-in using the strategy selected by `settings.INGEST_MODE`."""
+    if settings.INGEST_MODE == "statement":
+        save_checkin_statement(analytics)
+    else:
+        save_checkin_orm(analytics)
+
+
+class MalformedBatch(ValueError):
+    pass
+
+
+def _read_varint(stream):
+    """Read a base 128 varint, return None at the end of the stream."""
+    result = 0
+    for shift in range(0, 64, 7):
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise MalformedBatch("The stream ends inside a length prefix.")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+    raise MalformedBatch("A length prefix is longer than 64 bits.")
+
+
+def read_delimited(stream):
+    """Yield the raw messages of a stream of varint length-prefixed protobuf messages."""
+    while True:
+        length = _read_varint(stream)
+        if length is None:
+            return
+        if length > settings.INGEST_BATCH_MAX_MESSAGE_SIZE:
+            raise MalformedBatch(f"A message of {length} bytes exceeds the size limit.")
+        data = stream.read(length)
+        if len(data) < length:
+            raise MalformedBatch("The stream ends inside a message.")
+        yield data
+
+
+def save_batch(stream):
+    """Store a length-delimited stream of `Analytics` messages in one transaction.
+
+    Messages are parsed as they are read and written in bulk, `INGEST_BATCH_SIZE` at a time.
+    Nothing is stored if the stream is malformed or holds more than `INGEST_BATCH_MAX_MESSAGES`.
+    """
+    results = []
+    undecodable = 0
+    now = timezone.now()
+    with transaction.atomic():
+        chunk = []
+        for count, data in enumerate(read_delimited(stream), start=1):
+            if count > settings.INGEST_BATCH_MAX_MESSAGES:
+                raise MalformedBatch(
+                    f"A batch may hold at most {settings.INGEST_BATCH_MAX_MESSAGES} messages."
+                )
+            analytics = Analytics()
+            try:
+                analytics.ParseFromString(data)
+            except DecodeError:
+                logger.error("Dropping a message that is not a valid Analytics payload.")
+                undecodable += 1
+                continue
+            chunk.append((analytics, now))
+            if len(chunk) >= settings.INGEST_BATCH_SIZE:
+                results.append(save_checkins(chunk))
+                chunk = []
+        results.append(save_checkins(chunk))
+    results.append(IngestResult(accepted=0, duplicate=0, dropped=undecodable))
+    return IngestResult(*map(sum, zip(*results)))
@@ -0,0 +1,36 @@
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from pulpanalytics.export import ENCODERS, TABLES, export_queryset, stream
+
+
+class Command(BaseCommand):
+    help = "Export the summary tables to one CSV or Parquet file each."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", type=Path, help="Directory to write the files to, e.g. agecount.parquet."
+        )
+        parser.add_argument("--start-date", type=date.fromisoformat, help="First day to export.")
+        parser.add_argument("--end-date", type=date.fromisoformat, help="Last day to export.")
+        parser.add_argument("--format", choices=list(ENCODERS), default="csv")
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=list(TABLES),
+            help="Table to export, can be repeated. All tables by default.",
+        )
+
+    def handle(self, *args, **options):
+        options["output"].mkdir(parents=True, exist_ok=True)
+        for table in options["table"] or TABLES:
+            model = TABLES[table]
+            qs = export_queryset(model, options["start_date"], options["end_date"])
+            encoder = ENCODERS[options["format"]](model)
+            path = options["output"] / f"{table}.{options['format']}"
+            with path.open("wb") as f:
+                for chunk in stream(encoder, qs.iterator()):
+                    f.write(chunk)
+            print(f"Wrote {path}")
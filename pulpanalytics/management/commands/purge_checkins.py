@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pulpanalytics.models import DailySummary
+from pulpanalytics.retention import CLEANUP_AFTER_N_DAYS, DEFAULT_CHUNK_SIZE, purge_checkins
+
+
+class Command(BaseCommand):
+    help = "Delete the check-ins older than the retention period, in small chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=CLEANUP_AFTER_N_DAYS,
+            help="Keep the check-ins of this many days before today, and all that are not "
+            "summarized yet.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of Systems deleted from the default partition per statement.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.1,
+            help="Seconds to wait between two chunks or dropped partitions.",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            help="Stop after this many seconds, leaving the rest for the next run.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count what would be deleted."
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--days and --chunk-size must be positive.")
+        before = datetime.now(timezone.utc).date() - timedelta(days=options["days"])
+        # Check-ins are only purged once they are summarized, even when summarize lags behind.
+        latest = DailySummary.objects.order_by("-date").values_list("date", flat=True).first()
+        if latest is None:
+            raise CommandError("There are no summaries yet, run summarize first.")
+        if before > latest + timedelta(days=1):
+            before = latest + timedelta(days=1)
+            print(f"Keeping the check-ins from {before} on, they are not summarized yet.")
+
+        result = purge_checkins(
+            before,
+            chunk_size=options["chunk_size"],
+            pause=options["sleep"],
+            time_budget=options["time_budget"],
+            dry_run=options["dry_run"],
+        )
+
+        if options["dry_run"]:
+            print(
+                f"Would drop the partitions of {len(result.days)} days and delete "
+                f"{result.systems} Systems and {result.components} Components from before "
+                f"{before}."
+            )
+            return
+        print(
+            f"Dropped the partitions of {len(result.days)} days and deleted {result.systems} "
+            f"Systems and {result.components} Components from before "
+            f"{before} in {result.seconds:.2f}s, {result.rows_per_second:.0f} rows/s."
+        )
+        if not result.finished:
+            print("The time budget ran out, run again to delete the rest.")
@@ -1,16 +1,65 @@
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timedelta, timezone
+from itertools import combinations_with_replacement, repeat
+from multiprocessing import get_context
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.db.models import Avg, Count
-from django.db.models.functions import TruncDay
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Count, Func, TextField, Value
+from django.db.models.functions import Concat, TruncDay
+from pyroaring import BitMap
 
-from pulpanalytics.models import Component, DailySummary, DeploymentStats, System
+from pulpanalytics.bitmaps import NUMBER_SYSTEMS_SQL, NUMBERS_BY_NAME_SQL
+from pulpanalytics.models import (
+    AgeCount,
+    Component,
+    CooccurrenceCount,
+    DailyCounter,
+    DailySummary,
+    DeploymentStats,
+    DistinctSystemsSketch,
+    NumberCount,
+    PostgresVersionCount,
+    System,
+    SystemBitmap,
+    XYVersionCount,
+    XYZVersionCount,
+)
+from pulpanalytics.partitions import day_bounds, ensure_partitions
+from pulpanalytics.retention import CLEANUP_AFTER_N_DAYS, purge_checkins
+from pulpanalytics.rollups import update_rollups
+from pulpanalytics.sketches import REGISTERS_SQL, HyperLogLog
+from pulpanalytics.snapshots import write_snapshots
 
-CLEANUP_AFTER_N_DAYS = 14
+PARTITIONS_AHEAD_N_DAYS = 7
+
+RBAC_NAMES = ["users", "groups", "domains", "custom_access_policies", "custom_roles"]
+# DeploymentStats field: System field averaged into it
+DEPLOYMENT_AVERAGES = {
+    "online_worker_processes_avg": "worker_processes",
+    "online_worker_hosts_avg": "worker_hosts",
+    "online_content_app_processes_avg": "content_app_processes",
+    "online_content_app_hosts_avg": "content_app_hosts",
+}
+
+
+class SplitPart(Func):
+    function = "SPLIT_PART"
+    output_field = TextField()
+
+
+def xy_version_of(field):
+    """The X.Y part of the X.Y.Z version stored in `field`."""
+    return Concat(
+        SplitPart(field, Value("."), Value(1)),
+        Value("."),
+        SplitPart(field, Value("."), Value(2)),
+        output_field=TextField(),
+    )
 
 
 class Command(BaseCommand):
@@ -38,110 +87,386 @@ class Command(BaseCommand):
             return
 
     @staticmethod
-    def _handle_deployment_stats(systems, daily_summary):
-        deployment_stats = systems.aggregate(
-            Avg("worker_processes"),
-            Avg("worker_hosts"),
-            Avg("content_app_processes"),
-            Avg("content_app_hosts"),
+    def _handle_components(systems, daily_summary):
+        # Filtering on `created` as well limits the scan to the partition of the day.
+        start, end = day_bounds(daily_summary.date)
+        version_counts = (
+            Component.objects.filter(system__in=systems, created__gte=start, created__lt=end)
+            .annotate(xy_version=xy_version_of("version"))
+            .values_list("name", "version", "xy_version")
+            .annotate(count=Count("id"))
         )
 
-        DeploymentStats.objects.create(
-            summary=daily_summary,
-            online_worker_processes_avg=deployment_stats["worker_processes__avg"],
-            online_worker_hosts_avg=deployment_stats["worker_hosts__avg"],
-            online_content_app_processes_avg=deployment_stats["content_app_processes__avg"],
-            online_content_app_hosts_avg=deployment_stats["content_app_hosts__avg"],
+        xy_counts = defaultdict(int)
+        xyz_version_counts = []
+        for name, version, xy_version, count in version_counts:
+            xy_counts[name, xy_version] += count
+            xyz_version_counts.append(
+                XYZVersionCount(summary=daily_summary, name=name, version=version, count=count)
+            )
+        XYVersionCount.objects.bulk_create(
+            XYVersionCount(summary=daily_summary, name=name, version=version, count=count)
+            for (name, version), count in xy_counts.items()
         )
+        XYZVersionCount.objects.bulk_create(xyz_version_counts)
 
     @staticmethod
-    def _handle_components(systems, daily_summary):
-        components_qs = Component.objects.filter(system__in=systems)
-        for name in components_qs.values_list("name", flat=True).distinct():
-            xy_dict = defaultdict(int)
-            xyz_dict = defaultdict(int)
+    def _handle_age(systems, daily_summary):
+        age_q = systems.values("age").annotate(count=Count("system_id"))
+
+        for entry in age_q:
+            daily_summary.agecount_set.create(age=entry["age"].days, count=entry["count"])
 
-            for component in components_qs.filter(name=name):
-                version_components = component.version.split(".")
-                xy_version = f"{version_components[0]}.{version_components[1]}"
-                xy_dict[xy_version] += 1
-                xyz_dict[component.version] += 1
+    @staticmethod
+    def _handle_system_stats(systems, daily_summary):
+        """Count systems per PostgreSQL version and RBAC number, and average the deployment sizes.
+
+        Every histogram and the averages come from a single scan of the day's systems, each
+        histogram being one of the GROUPING SETS and the averages the empty grouping set.
+        """
+        columns = ["postgresql_version", *RBAC_NAMES]
+        subquery, params = systems.values(
+            *columns, *DEPLOYMENT_AVERAGES.values()
+        ).query.sql_with_params()
+        sql = f"""
+            SELECT
+                {", ".join(f"GROUPING({column}) = 0" for column in columns)},
+                {", ".join(columns)},
+                COUNT(*),
+                {", ".join(f"AVG({column})::float" for column in DEPLOYMENT_AVERAGES.values())}
+            FROM ({subquery}) AS system
+            GROUP BY GROUPING SETS ({", ".join(f"({column})" for column in columns)}, ())
+            ORDER BY {", ".join(columns)}
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
 
-            for version, count in xy_dict.items():
-                daily_summary.xyversioncount_set.create(name=name, version=version, count=count)
+        deployment_stats = DeploymentStats(summary=daily_summary)
+        postgres_version_counts = []
+        number_counts = []
+        for row in rows:
+            grouped = row[: len(columns)]
+            values = row[len(columns) : 2 * len(columns)]
+            count = row[2 * len(columns)]
+            if not any(grouped):
+                averages = row[2 * len(columns) + 1 :]
+                for field, average in zip(DEPLOYMENT_AVERAGES, averages):
+                    setattr(deployment_stats, field, average)
+                continue
+            index = grouped.index(True)
+            name, value = columns[index], values[index]
+            if name == "postgresql_version":
+                postgres_version_counts.append(
+                    PostgresVersionCount(summary=daily_summary, version=value, count=count)
+                )
+            elif value is not None:
+                number_counts.append(
+                    NumberCount(summary=daily_summary, name=name, number=value, count=count)
+                )
 
-            for version, count in xyz_dict.items():
-                daily_summary.xyzversioncount_set.create(name=name, version=version, count=count)
+        deployment_stats.save(force_insert=True)
+        PostgresVersionCount.objects.bulk_create(postgres_version_counts)
+        NumberCount.objects.bulk_create(number_counts)
 
     @staticmethod
-    def _handle_age(systems, daily_summary):
-        age_q = systems.values("age").annotate(count=Count("system_id"))
+    def _handle_sketches(systems, daily_summary):
+        """Store the HyperLogLog sketches of the systems, overall and per component name."""
+        start, end = day_bounds(daily_summary.date)
+        subquery, params = systems.values("id", "system_id").query.sql_with_params()
+        sketches = defaultdict(HyperLogLog)
+        with connection.cursor() as cursor:
+            cursor.execute(REGISTERS_SQL.format(systems=subquery), (*params, start, end))
+            for by_name, name, register, rank in cursor.fetchall():
+                if by_name and name is None:
+                    continue  # The systems without any component
+                sketches[name if by_name else ""].set(register, rank)
 
-        for entry in age_q:
-            daily_summary.agecount_set.create(age=entry["age"].days, count=entry["count"])
+        DistinctSystemsSketch.objects.bulk_create(
+            DistinctSystemsSketch(summary=daily_summary, name=name, registers=sketch.registers)
+            for name, sketch in sorted(sketches.items())
+        )
+
+    @staticmethod
+    def _handle_bitmaps(systems, daily_summary):
+        """Number the new systems and store the bitmap of the systems of each component name.
+
+        The systems reporting both of two components are the intersection of their bitmaps, which
+        also gives the co-occurrence counts.
+        """
+        start, end = day_bounds(daily_summary.date)
+        subquery, params = systems.values("id", "system_id", "first_seen").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(NUMBER_SYSTEMS_SQL.format(systems=subquery), params)
+            cursor.execute(NUMBERS_BY_NAME_SQL.format(systems=subquery), (*params, start, end))
+            bitmaps = {name: BitMap(numbers) for name, numbers in sorted(cursor.fetchall())}
+
+        SystemBitmap.objects.bulk_create(
+            SystemBitmap(summary=daily_summary, name=name, bitmap=bitmap.serialize())
+            for name, bitmap in bitmaps.items()
+        )
+        cooccurrence_counts = []
+        for name, other in combinations_with_replacement(bitmaps, 2):
+            count = bitmaps[name].intersection_cardinality(bitmaps[other])
+            if count:
+                cooccurrence_counts.append(
+                    CooccurrenceCount(summary=daily_summary, name=name, other=other, count=count)
+                )
+        CooccurrenceCount.objects.bulk_create(cooccurrence_counts)
+
+    @staticmethod
+    def _counters_complete(counters, systems):
+        """Whether every check-in of the day has been counted."""
+        counted = counters.filter(kind="systems").values_list("count", flat=True).first()
+        return (counted or 0) == systems.count()
+
+    @staticmethod
+    def _handle_counters(counters, daily_summary):
+        """Copy the incremental counters of the day into the summary tables."""
+        fields = {column: field for field, column in DEPLOYMENT_AVERAGES.items()}
+        deployment_stats = DeploymentStats(summary=daily_summary)
+        age_counts = []
+        postgres_version_counts = []
+        number_counts = []
+        xyz_version_counts = []
+        xy_counts = defaultdict(int)
+        rows = counters.annotate(xy_version=xy_version_of("value")).values_list(
+            "kind", "name", "value", "xy_version", "count", "total"
+        )
+        for kind, name, value, xy, count, total in rows:
+            if kind == "age":
+                age_counts.append(AgeCount(summary=daily_summary, age=int(value), count=count))
+            elif kind == "postgresql_version":
+                postgres_version_counts.append(
+                    PostgresVersionCount(summary=daily_summary, version=int(value), count=count)
+                )
+            elif kind == "number":
+                number_counts.append(
+                    NumberCount(summary=daily_summary, name=name, number=int(value), count=count)
+                )
+            elif kind == "xyz_version":
+                xyz_version_counts.append(
+                    XYZVersionCount(summary=daily_summary, name=name, version=value, count=count)
+                )
+                xy_counts[name, xy] += count
+            elif kind == "deployment":
+                setattr(deployment_stats, fields[name], total / count)
+
+        deployment_stats.save(force_insert=True)
+        AgeCount.objects.bulk_create(age_counts)
+        PostgresVersionCount.objects.bulk_create(postgres_version_counts)
+        NumberCount.objects.bulk_create(number_counts)
+        XYZVersionCount.objects.bulk_create(xyz_version_counts)
+        XYVersionCount.objects.bulk_create(
+            XYVersionCount(summary=daily_summary, name=name, version=version, count=count)
+            for (name, version), count in xy_counts.items()
+        )
+
+    @staticmethod
+    def _snapshot(daily_summary):
+        """Everything stored for a summary, to compare two ways of computing it."""
+        deployment_stats = DeploymentStats.objects.filter(summary=daily_summary).values(
+            *DEPLOYMENT_AVERAGES
+        )
+        return {
+            "age": set(daily_summary.agecount_set.values_list("age", "count")),
+            "postgresql_version": set(
+                daily_summary.postgresversioncount_set.values_list("version", "count")
+            ),
+            "number": set(daily_summary.numbercount_set.values_list("name", "number", "count")),
+            "xy_version": set(
+                daily_summary.xyversioncount_set.values_list("name", "version", "count")
+            ),
+            "xyz_version": set(
+                daily_summary.xyzversioncount_set.values_list("name", "version", "count")
+            ),
+            "deployment": {
+                (field, None if average is None else round(average, 9))
+                for stats in deployment_stats
+                for field, average in stats.items()
+            },
+        }
 
     @staticmethod
-    def _handle_postgresql_version(systems, daily_summary):
-        postgresql_dict = defaultdict(int)
-        for system in systems:
-            version = system.postgresql_version
-            postgresql_dict[version] += 1
-        for version, count in postgresql_dict.items():
-            daily_summary.postgresversioncount_set.create(version=version, count=count)
+    def _day_systems(day):
+        start, end = day_bounds(day)
+        return (
+            System.objects.annotate(age=TruncDay("created") - TruncDay("first_seen"))
+            .filter(created__gte=start)
+            .filter(created__lt=end)
+        )
+
+    def _summarize_day(self, day, check=False):
+        """Write the summary of `day` in one transaction, replacing an existing one.
+
+        Returns False if `check` found the incremental counters to differ from a full recompute.
+        """
+        systems = self._day_systems(day)
+        persistent_systems = systems.filter(
+            age__gte=timedelta(days=settings.PERSISTENT_MIN_AGE_DAYS)
+        )
+
+        counters = DailyCounter.objects.filter(date=day)
+        from_counters = settings.INCREMENTAL_SUMMARY and self._counters_complete(counters, systems)
+        if settings.INCREMENTAL_SUMMARY and not from_counters:
+            print(f"Counters for {day} are incomplete, recomputing.")
+
+        matched = True
+        with transaction.atomic():
+            DailySummary.objects.filter(date=day).delete()
+            daily_summary = DailySummary.objects.create(date=day)
+            if from_counters and check:
+                with transaction.atomic():
+                    self._handle_counters(counters, daily_summary)
+                    counted = self._snapshot(daily_summary)
+                    transaction.set_rollback(True)
+            if from_counters and not check:
+                self._handle_counters(counters, daily_summary)
+            else:
+                self._handle_age(systems, daily_summary)
+                self._handle_components(persistent_systems, daily_summary)
+                self._handle_system_stats(persistent_systems, daily_summary)
+            # Sketches and bitmaps need the system ids, which the counters do not keep.
+            self._handle_sketches(persistent_systems, daily_summary)
+            self._handle_bitmaps(persistent_systems, daily_summary)
+            if from_counters and check:
+                recomputed = self._snapshot(daily_summary)
+                for key in counted:
+                    if counted[key] != recomputed[key]:
+                        matched = False
+                        print(
+                            f"{day} {key}: counted {counted[key] - recomputed[key]}, "
+                            f"recomputed {recomputed[key] - counted[key]}"
+                        )
+            counters.delete()
+        return matched
+
+    def _backfill(self, start, end, jobs, check):
+        """Summarize the days from `start` to `end` again, `jobs` days at a time."""
+        today = datetime.now(timezone.utc).date()
+        if start > end or end >= today:
+            raise CommandError("The backfill must be a range of days before today.")
+        # Later days are left to `summarize` without --backfill, which continues from the latest
+        # summary and would never fill the days a backfill skipped over.
+        latest = DailySummary.objects.order_by("-date").values_list("date", flat=True).first()
+        if latest is None or end > latest:
+            raise CommandError(
+                f"The backfill must end by the latest summary ({latest}), summarize the later "
+                "days without --backfill."
+            )
+
+        days = []
+        summarized = set(
+            DailySummary.objects.filter(date__range=(start, end)).values_list("date", flat=True)
+        )
+        day = start
+        while day <= end:
+            # Never replace a summary by an empty one because its check-ins were cleaned up.
+            if day in summarized and not self._day_systems(day).exists():
+                print(f"Skipping {day}, its check-ins are gone.")
+            else:
+                days.append(day)
+            day += timedelta(days=1)
+
+        started = time.perf_counter()
+        if jobs == 1:
+            mismatched = self._report(map(_summarize_day, days, repeat(check)))
+        else:
+            # Forked workers must not share the parent's connection, each opens its own.
+            connections.close_all()
+            with ProcessPoolExecutor(jobs, mp_context=get_context("fork")) as pool:
+                mismatched = self._report(pool.map(_summarize_day, days, repeat(check)))
+        elapsed = time.perf_counter() - started
+        print(
+            f"Summarized {len(days)} days in {elapsed:.2f}s with {jobs} jobs, "
+            f"{len(days) / elapsed:.2f} days/s."
+        )
+        # Also the skipped days, so that a backfill builds the rollups of old summaries.
+        update_rollups([start + timedelta(days=n) for n in range((end - start).days + 1)])
+        return mismatched
 
     @staticmethod
-    def _handle_rbac_stats(systems, daily_summary):
-        NAMES = ["users", "groups", "domains", "custom_access_policies", "custom_roles"]
-        counters = {name: defaultdict(int) for name in NAMES}
-        for system in systems:
-            for name in NAMES:
-                count = getattr(system, name)
-                if count is not None:
-                    counters[name][count] += 1
-        for name in NAMES:
-            for number, count in counters[name].items():
-                daily_summary.numbercount_set.create(name=name, number=number, count=count)
+    def _report(results):
+        """Print the timing of each day, return the days whose counters differed."""
+        mismatched = []
+        for day, seconds, matched in results:
+            print(f"Wrote summary for {day} in {seconds:.2f}s")
+            if not matched:
+                mismatched.append(day)
+        return mismatched
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Recompute the days summarized from incremental counters and fail if they differ.",
+        )
+        parser.add_argument(
+            "--backfill",
+            nargs=2,
+            type=date.fromisoformat,
+            metavar=("START", "END"),
+            help="Summarize the days from START to END (inclusive) again, replacing existing "
+            "summaries. END must not be after the latest summary. No cleanup is done.",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of days a backfill summarizes at the same time, in separate processes.",
+        )
 
     def handle(self, *args, **options):
+        if options["jobs"] < 1:
+            raise CommandError("--jobs must be positive.")
+        if options["backfill"]:
+            mismatched = self._backfill(*options["backfill"], options["jobs"], options["check"])
+        else:
+            mismatched = self._summarize_missing(options["check"])
+
+        started = time.perf_counter()
+        snapshots = write_snapshots()
+        print(f"Wrote {len(snapshots)} chart snapshots in {time.perf_counter() - started:.2f}s")
+
+        if mismatched:
+            days = ", ".join(str(day) for day in sorted(mismatched))
+            raise CommandError(f"The incremental counters differ from a full recompute on {days}.")
+
+    def _summarize_missing(self, check):
+        """Summarize every day since the last summary and clean up old check-ins."""
+        today = datetime.now(timezone.utc).date()
+        ensure_partitions(today, today + timedelta(days=PARTITIONS_AHEAD_N_DAYS + 1))
+        mismatched = []
+
         while True:
             next_summary_date = self._get_next_date_to_summarize()
 
             if not next_summary_date:
                 break
 
-            summary_start_datetime = datetime(
-                year=next_summary_date.year,
-                month=next_summary_date.month,
-                day=next_summary_date.day,
-                tzinfo=timezone.utc,
-            )
-            summary_end_datetime = summary_start_datetime + timedelta(days=1)
-
-            systems = (
-                System.objects.annotate(age=TruncDay("created") - TruncDay("first_seen"))
-                .filter(created__gte=summary_start_datetime)
-                .filter(created__lt=summary_end_datetime)
-            )
-            persistent_systems = systems.filter(
-                age__gte=timedelta(days=settings.PERSISTENT_MIN_AGE_DAYS)
-            )
-
-            with transaction.atomic():
-                daily_summary = DailySummary.objects.create(date=next_summary_date)
-                self._handle_age(systems, daily_summary)
-                self._handle_components(persistent_systems, daily_summary)
-                self._handle_postgresql_version(persistent_systems, daily_summary)
-                self._handle_deployment_stats(persistent_systems, daily_summary)
-                self._handle_rbac_stats(persistent_systems, daily_summary)
+            if not self._summarize_day(next_summary_date, check):
+                mismatched.append(next_summary_date)
+            update_rollups([next_summary_date])
             print(f"Wrote summary for {next_summary_date}")
 
         last_night_midnight = datetime.today().replace(
             hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc
         )
         delete_older_than_datetime = last_night_midnight - timedelta(days=CLEANUP_AFTER_N_DAYS)
-        num, obj_per_type = System.objects.filter(created__lt=delete_older_than_datetime).delete()
+        result = purge_checkins(delete_older_than_datetime.date())
+        DailyCounter.objects.filter(date__lt=delete_older_than_datetime.date()).delete()
+
+        print(
+            f"Dropped the partitions of {len(result.days)} days and deleted {result.systems} "
+            f"Systems and {result.components} Components from before "
+            f"{delete_older_than_datetime} in {result.seconds:.2f}s, "
+            f"{result.rows_per_second:.0f} rows/s."
+        )
+        return mismatched
 
-        if num:
-            num = obj_per_type["pulpanalytics.System"]
 
-        print(f"Deleted {num} Systems from before {delete_older_than_datetime}.")
+def _summarize_day(day, check):
+    """Summarize one day of a backfill, in a worker process when running several jobs."""
+    started = time.perf_counter()
+    matched = Command()._summarize_day(day, check)
+    return day, time.perf_counter() - started, matched
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0001_squashed_0019_alter_agecount_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SystemFirstSeen",
+            fields=[
+                ("system_id", models.UUIDField(primary_key=True, serialize=False)),
+                ("first_seen", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "system first seen",
+            },
+        ),
+        migrations.RunSQL(
+            sql="""
+            INSERT INTO pulpanalytics_systemfirstseen (system_id, first_seen)
+            SELECT system_id, MIN(first_seen) FROM pulpanalytics_system GROUP BY system_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,214 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The tables are rebuilt as partitioned tables and the data is copied over. A primary key or
+# unique constraint of a partitioned table has to include the partition key, and a foreign key
+# can only reference such a constraint, so:
+#   * the primary keys become (id, created),
+#   * "one check-in per system and day" is a unique index on `system_id` in every daily partition,
+#   * Component gets its own `created` and no database level foreign key to System.
+# Partitions are created for every day with data and for the next week, `summarize` keeps
+# creating them ahead of time.
+CREATE_TABLES_SQL = [
+    "ALTER TABLE pulpanalytics_component RENAME TO pulpanalytics_component_old",
+    "ALTER TABLE pulpanalytics_system RENAME TO pulpanalytics_system_old",
+    """
+    CREATE TABLE pulpanalytics_system (
+        id bigint NOT NULL,
+        system_id uuid NOT NULL,
+        created timestamp with time zone NOT NULL,
+        first_seen timestamp with time zone NOT NULL,
+        postgresql_version integer NOT NULL,
+        users integer,
+        groups integer,
+        domains integer,
+        custom_access_policies integer,
+        custom_roles integer,
+        content_app_processes integer,
+        content_app_hosts integer,
+        worker_processes integer,
+        worker_hosts integer,
+        CONSTRAINT pulpanalytics_system_postgresql_version_check
+            CHECK (postgresql_version >= 0),
+        CONSTRAINT pulpanalytics_system_users_check
+            CHECK (users >= 0),
+        CONSTRAINT pulpanalytics_system_groups_check
+            CHECK (groups >= 0),
+        CONSTRAINT pulpanalytics_system_domains_check
+            CHECK (domains >= 0),
+        CONSTRAINT pulpanalytics_system_custom_access_policies_check
+            CHECK (custom_access_policies >= 0),
+        CONSTRAINT pulpanalytics_system_custom_roles_check
+            CHECK (custom_roles >= 0),
+        CONSTRAINT pulpanalytics_system_content_app_processes_check
+            CHECK (content_app_processes >= 0),
+        CONSTRAINT pulpanalytics_system_content_app_hosts_check
+            CHECK (content_app_hosts >= 0),
+        CONSTRAINT pulpanalytics_system_worker_processes_check
+            CHECK (worker_processes >= 0),
+        CONSTRAINT pulpanalytics_system_worker_hosts_check
+            CHECK (worker_hosts >= 0)
+    ) PARTITION BY RANGE (created)
+    """,
+    """
+    CREATE TABLE pulpanalytics_component (
+        id bigint NOT NULL,
+        name text NOT NULL,
+        version text NOT NULL,
+        system_id bigint NOT NULL,
+        created timestamp with time zone NOT NULL
+    ) PARTITION BY RANGE (created)
+    """,
+    "CREATE TABLE pulpanalytics_system_default PARTITION OF pulpanalytics_system DEFAULT",
+    "CREATE TABLE pulpanalytics_component_default PARTITION OF pulpanalytics_component DEFAULT",
+    """
+    CREATE UNIQUE INDEX pulpanalytics_system_default_uniq ON pulpanalytics_system_default
+    (system_id, DATE_TRUNC('day', created AT TIME ZONE 'UTC'))
+    """,
+    """
+    DO $$
+    DECLARE
+        day date;
+        name text;
+    BEGIN
+        FOR day IN
+            SELECT DISTINCT (created AT TIME ZONE 'UTC')::date FROM pulpanalytics_system_old
+            UNION
+            SELECT (NOW() AT TIME ZONE 'UTC')::date + offset_days
+            FROM generate_series(0, 7) AS offset_days
+        LOOP
+            name := 'pulpanalytics_system_' || to_char(day, 'YYYYMMDD');
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF pulpanalytics_system FOR VALUES FROM (%L) TO (%L)',
+                name, day::timestamp AT TIME ZONE 'UTC', (day + 1)::timestamp AT TIME ZONE 'UTC'
+            );
+            EXECUTE format('CREATE UNIQUE INDEX %I ON %I (system_id)', name || '_uniq', name);
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF pulpanalytics_component FOR VALUES FROM (%L) TO (%L)',
+                'pulpanalytics_component_' || to_char(day, 'YYYYMMDD'),
+                day::timestamp AT TIME ZONE 'UTC', (day + 1)::timestamp AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END
+    $$
+    """,
+    """
+    INSERT INTO pulpanalytics_system (
+        id,
+        system_id,
+        created,
+        first_seen,
+        postgresql_version,
+        users,
+        groups,
+        domains,
+        custom_access_policies,
+        custom_roles,
+        content_app_processes,
+        content_app_hosts,
+        worker_processes,
+        worker_hosts
+    )
+    SELECT
+        id,
+        system_id,
+        created,
+        first_seen,
+        postgresql_version,
+        users,
+        groups,
+        domains,
+        custom_access_policies,
+        custom_roles,
+        content_app_processes,
+        content_app_hosts,
+        worker_processes,
+        worker_hosts
+    FROM pulpanalytics_system_old
+    """,
+    """
+    INSERT INTO pulpanalytics_component (id, name, version, system_id, created)
+    SELECT component.id, component.name, component.version, component.system_id, system.created
+    FROM pulpanalytics_component_old component
+    JOIN pulpanalytics_system_old system ON system.id = component.system_id
+    """,
+    "DROP TABLE pulpanalytics_component_old",
+    "DROP TABLE pulpanalytics_system_old",
+    "ALTER TABLE pulpanalytics_system ADD PRIMARY KEY (id, created)",
+    "ALTER TABLE pulpanalytics_component ADD PRIMARY KEY (id, created)",
+    """
+    CREATE UNIQUE INDEX pulpanalytics_component_uniquenes
+    ON pulpanalytics_component (system_id, name, created)
+    """,
+    "CREATE INDEX pulpanalyti_name_459b73_idx ON pulpanalytics_component (name)",
+    """
+    CREATE INDEX pulpanalytics_component_system_id_229f0238
+    ON pulpanalytics_component (system_id)
+    """,
+    "CREATE SEQUENCE pulpanalytics_system_id_seq OWNED BY pulpanalytics_system.id",
+    "CREATE SEQUENCE pulpanalytics_component_id_seq OWNED BY pulpanalytics_component.id",
+    """
+    ALTER TABLE pulpanalytics_system
+    ALTER COLUMN id SET DEFAULT nextval('pulpanalytics_system_id_seq')
+    """,
+    """
+    ALTER TABLE pulpanalytics_component
+    ALTER COLUMN id SET DEFAULT nextval('pulpanalytics_component_id_seq')
+    """,
+    """
+    SELECT setval(
+        'pulpanalytics_system_id_seq', COALESCE(MAX(id), 0) + 1, false
+    ) FROM pulpanalytics_system
+    """,
+    """
+    SELECT setval(
+        'pulpanalytics_component_id_seq', COALESCE(MAX(id), 0) + 1, false
+    ) FROM pulpanalytics_component
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0020_systemfirstseen"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(sql=CREATE_TABLES_SQL)],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name="system",
+                    name="unique_system_checkin_per_day",
+                ),
+                migrations.RemoveConstraint(
+                    model_name="component",
+                    name="pulpanalytics_component_uniquenes",
+                ),
+                migrations.AddField(
+                    model_name="component",
+                    name="created",
+                    field=models.DateTimeField(),
+                    preserve_default=False,
+                ),
+                migrations.AlterField(
+                    model_name="component",
+                    name="system",
+                    field=models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="pulpanalytics.system",
+                    ),
+                ),
+                migrations.AddConstraint(
+                    model_name="component",
+                    constraint=models.UniqueConstraint(
+                        "system", "name", "created", name="pulpanalytics_component_uniquenes"
+                    ),
+                ),
+            ],
+        ),
+    ]
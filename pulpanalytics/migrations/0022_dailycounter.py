@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0021_partition_system_and_component"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("kind", models.TextField()),
+                ("name", models.TextField()),
+                ("value", models.TextField()),
+                ("count", models.BigIntegerField()),
+                ("total", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="dailycounter",
+            constraint=models.UniqueConstraint(
+                models.F("date"),
+                models.F("kind"),
+                models.F("name"),
+                models.F("value"),
+                name="pulpanalytics_dailycounter_uniquenes",
+            ),
+        ),
+    ]
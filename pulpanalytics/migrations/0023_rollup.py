@@ -0,0 +1,164 @@
+# Generated by Django 4.2.11 on 2026-10-18 10:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0022_dailycounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AgeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("age", models.PositiveIntegerField()),
+                ("count", models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="NumberRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("number", models.PositiveIntegerField()),
+                ("count", models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Rollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("resolution", models.TextField(choices=[("week", "week"), ("month", "month")])),
+                ("period", models.DateField()),
+                ("days", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="XYZVersionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("version", models.TextField()),
+                ("count", models.FloatField()),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.rollup"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="XYVersionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("version", models.TextField()),
+                ("count", models.FloatField()),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.rollup"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="rollup",
+            constraint=models.UniqueConstraint(
+                models.F("resolution"), models.F("period"), name="pulpanalytics_rollup_uniquenes"
+            ),
+        ),
+        migrations.AddField(
+            model_name="numberrollup",
+            name="rollup",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.rollup"
+            ),
+        ),
+        migrations.AddField(
+            model_name="agerollup",
+            name="rollup",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.rollup"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="xyzversionrollup",
+            index=models.Index(fields=["rollup", "name"], name="pulpanalyti_rollup__6c8ae8_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="xyzversionrollup",
+            constraint=models.UniqueConstraint(
+                models.F("rollup"),
+                models.F("name"),
+                models.F("version"),
+                name="pulpanalytics_xyzversionrollup_uniquenes",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="xyversionrollup",
+            index=models.Index(fields=["rollup", "name"], name="pulpanalyti_rollup__aaefaf_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="xyversionrollup",
+            constraint=models.UniqueConstraint(
+                models.F("rollup"),
+                models.F("name"),
+                models.F("version"),
+                name="pulpanalytics_xyversionrollup_uniquenes",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="numberrollup",
+            index=models.Index(fields=["rollup", "name"], name="pulpanalyti_rollup__f087ba_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="numberrollup",
+            constraint=models.UniqueConstraint(
+                models.F("rollup"),
+                models.F("name"),
+                models.F("number"),
+                name="pulpanalytics_numberrollup_uniquenes",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="agerollup",
+            index=models.Index(fields=["rollup"], name="pulpanalyti_rollup__a52f78_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="agerollup",
+            constraint=models.UniqueConstraint(
+                models.F("rollup"), models.F("age"), name="pulpanalytics_agerollup_uniquenes"
+            ),
+        ),
+    ]
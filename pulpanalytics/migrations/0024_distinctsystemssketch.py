@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0023_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DistinctSystemsSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField(blank=True)),
+                ("registers", models.BinaryField()),
+                (
+                    "summary",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.dailysummary"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="distinctsystemssketch",
+            constraint=models.UniqueConstraint(
+                models.F("summary"),
+                models.F("name"),
+                name="pulpanalytics_distinctsystemssketch_uniquenes",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0024_distinctsystemssketch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SystemNumber",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("system_id", models.UUIDField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SystemBitmap",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("bitmap", models.BinaryField()),
+                (
+                    "summary",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.dailysummary"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="systembitmap",
+            constraint=models.UniqueConstraint(
+                models.F("summary"), models.F("name"), name="pulpanalytics_systembitmap_uniquenes"
+            ),
+        ),
+    ]
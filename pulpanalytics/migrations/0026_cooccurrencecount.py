@@ -0,0 +1,43 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0025_systemnumber_systembitmap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CooccurrenceCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.TextField()),
+                ("other", models.TextField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "summary",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="pulpanalytics.dailysummary"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="cooccurrencecount",
+            constraint=models.UniqueConstraint(
+                models.F("summary"),
+                models.F("name"),
+                models.F("other"),
+                name="pulpanalytics_cooccurrencecount_uniquenes",
+            ),
+        ),
+    ]
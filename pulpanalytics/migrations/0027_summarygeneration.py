@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0026_cooccurrencecount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
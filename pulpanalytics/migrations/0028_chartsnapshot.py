@@ -0,0 +1,27 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0027_summarygeneration"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChartSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("url", models.TextField(unique=True)),
+                ("key", models.CharField(max_length=32, unique=True)),
+                ("content", models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2026-10-18 14:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pulpanalytics", "0028_chartsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="summarygeneration",
+            name="modified",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,7 +1,14 @@
 from django.db import models
+from django.utils import timezone
 
 
 class System(models.Model):
+    """A check-in, stored in the partition for the UTC day of `created`.
+
+    Each daily partition has a unique index on `system_id`, so a system checks in at most once
+    per day. See `pulpanalytics.partitions`.
+    """
+
     system_id = models.UUIDField()
     created = models.DateTimeField(auto_now_add=True)
     first_seen = models.DateTimeField()
@@ -19,31 +26,84 @@ class System(models.Model):
     def __str__(self):
         return f"SystemID={self.system_id}, Created={self.created}"
 
+
+class SystemFirstSeen(models.Model):
+    """The first check-in of a system, kept after its System rows have been cleaned up."""
+
+    system_id = models.UUIDField(primary_key=True)
+    first_seen = models.DateTimeField()
+
     class Meta:
-        constraints = [
-            models.UniqueConstraint(
-                "system_id",
-                models.functions.TruncDay("created"),
-                name="unique_system_checkin_per_day",
-            ),
-        ]
+        verbose_name_plural = "system first seen"
+
+    def __str__(self):
+        return f"SystemID={self.system_id}, FirstSeen={self.first_seen}"
 
 
 class Component(models.Model):
     name = models.TextField()
     version = models.TextField()
-    system = models.ForeignKey(System, on_delete=models.CASCADE)
+    # Partitioned tables can not be referenced by a foreign key constraint.
+    system = models.ForeignKey(System, on_delete=models.CASCADE, db_constraint=False)
+    # The `created` of the system, it puts the component in the partition of the same day.
+    created = models.DateTimeField()
 
     def __str__(self):
         return f"SystemID={self.system.system_id}, Name={self.name}, Version={self.version}"
 
     class Meta:
         constraints = [
-            models.UniqueConstraint("system", "name", name="%(app_label)s_%(class)s_uniquenes")
+            models.UniqueConstraint(
+                "system", "name", "created", name="%(app_label)s_%(class)s_uniquenes"
+            )
         ]
         indexes = [models.Index(fields=["name"])]
 
 
+class DailyCounter(models.Model):
+    """A running count for a day that has not been summarized yet.
+
+    Kept up to date at ingest when `INCREMENTAL_SUMMARY` is on. `kind` is the summary the counter
+    ends up in, `name` and `value` its bucket, `count` the number of systems in the bucket and
+    `total` the sum of a deployment number over them.
+    """
+
+    date = models.DateField()
+    kind = models.TextField()
+    name = models.TextField()
+    value = models.TextField()
+    count = models.BigIntegerField()
+    total = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "date", "kind", "name", "value", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+
+
+class SummaryGeneration(models.Model):
+    """A single counter, bumped whenever summaries are written or deleted.
+
+    Cached chart responses are only valid for the generation they were computed in, see
+    `pulpanalytics.chart_cache`. `modified` is when it was last bumped.
+    """
+
+    value = models.BigIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+
+class ChartSnapshot(models.Model):
+    """A dashboard chart rendered by `summarize`, see `pulpanalytics.snapshots`."""
+
+    url = models.TextField(unique=True)
+    # The `chart_cache` key of the response, which changes with the summaries.
+    key = models.CharField(max_length=32, unique=True)
+    # The gzip compressed JSON response.
+    content = models.BinaryField()
+
+
 class DailySummary(models.Model):
     date = models.DateField(primary_key=True)
 
@@ -125,6 +185,26 @@ class PostgresVersionCount(models.Model):
         indexes = [models.Index(fields=["summary"])]
 
 
+class CooccurrenceCount(models.Model):
+    """Count of systems reporting both components `name` and `other` on a day.
+
+    Each pair is stored once, with `name <= other`. `name == other` counts the systems reporting
+    the component.
+    """
+
+    summary = models.ForeignKey(DailySummary, on_delete=models.CASCADE)
+    name = models.TextField()
+    other = models.TextField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "summary", "name", "other", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+
+
 class XYVersionCount(models.Model):
     summary = models.ForeignKey(DailySummary, on_delete=models.CASCADE)
     name = models.TextField()
@@ -153,3 +233,123 @@ class XYZVersionCount(models.Model):
             )
         ]
         indexes = [models.Index(fields=["summary", "name"])]
+
+
+class Rollup(models.Model):
+    """The daily summaries of a week or month, rolled up for charts over long ranges.
+
+    `period` is the first day of the week (a Monday) or month, `days` the number of daily
+    summaries within it. The counts of a period are the mean counts per summarized day.
+    """
+
+    resolution = models.TextField(choices=[("week", "week"), ("month", "month")])
+    period = models.DateField()
+    days = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "resolution", "period", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.resolution.capitalize()} rollup for {self.period}"
+
+
+class NumberRollup(models.Model):
+    rollup = models.ForeignKey(Rollup, on_delete=models.CASCADE)
+    name = models.TextField()
+    number = models.PositiveIntegerField()
+    count = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "rollup", "name", "number", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+        indexes = [models.Index(fields=["rollup", "name"])]
+
+
+class AgeRollup(models.Model):
+    rollup = models.ForeignKey(Rollup, on_delete=models.CASCADE)
+    age = models.PositiveIntegerField()
+    count = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint("rollup", "age", name="%(app_label)s_%(class)s_uniquenes")
+        ]
+        indexes = [models.Index(fields=["rollup"])]
+
+
+class XYVersionRollup(models.Model):
+    rollup = models.ForeignKey(Rollup, on_delete=models.CASCADE)
+    name = models.TextField()
+    version = models.TextField()
+    count = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "rollup", "name", "version", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+        indexes = [models.Index(fields=["rollup", "name"])]
+
+
+class XYZVersionRollup(models.Model):
+    rollup = models.ForeignKey(Rollup, on_delete=models.CASCADE)
+    name = models.TextField()
+    version = models.TextField()
+    count = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                "rollup", "name", "version", name="%(app_label)s_%(class)s_uniquenes"
+            )
+        ]
+        indexes = [models.Index(fields=["rollup", "name"])]
+
+
+class DistinctSystemsSketch(models.Model):
+    """The HyperLogLog registers of the systems summarized on a day.
+
+    `name` is the component the systems reported, or empty for all of them. See
+    `pulpanalytics.sketches`.
+    """
+
+    summary = models.ForeignKey(DailySummary, on_delete=models.CASCADE)
+    name = models.TextField(blank=True)
+    registers = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint("summary", "name", name="%(app_label)s_%(class)s_uniquenes")
+        ]
+
+
+class SystemNumber(models.Model):
+    """A small, dense integer id for a system, the key of the system bitmaps.
+
+    Numbers are given out by `summarize` to the systems of the days it summarizes.
+    """
+
+    id = models.AutoField(primary_key=True)
+    system_id = models.UUIDField(unique=True)
+
+
+class SystemBitmap(models.Model):
+    """The `SystemNumber`s of the systems reporting component `name` on a day, as a serialized
+    roaring bitmap. See `pulpanalytics.bitmaps`."""
+
+    summary = models.ForeignKey(DailySummary, on_delete=models.CASCADE)
+    name = models.TextField()
+    bitmap = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint("summary", "name", name="%(app_label)s_%(class)s_uniquenes")
+        ]
@@ -0,0 +1,103 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.db import connection, transaction
+
+# Tables partitioned by the UTC day of their `created` column, and the columns each partition
+# keeps unique. One partition holds exactly one day, so a unique index on `system_id` is the
+# "one check-in per system and day" rule. Rows of days without a partition go to the
+# `<table>_default` partition, which enforces the same rule with an expression index.
+PARTITIONED_TABLES = {
+    "pulpanalytics_system": ["system_id"],
+    "pulpanalytics_component": [],
+}
+
+
+def partition_name(table, day):
+    return f"{table}_{day:%Y%m%d}"
+
+
+def day_bounds(day):
+    """Return the `created` range of the partition for `day`."""
+    start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def partition_days(table):
+    """Return the days that have their own partition of `table`."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [table],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    days = set()
+    for name in names:
+        try:
+            days.add(datetime.strptime(name[len(table) + 1 :], "%Y%m%d").date())
+        except ValueError:
+            continue  # The default partition
+    return days
+
+
+def create_partitions(day):
+    """Create the partitions for `day`, moving its rows out of the default partitions."""
+    start, end = (bound.isoformat() for bound in day_bounds(day))
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, unique_columns in PARTITIONED_TABLES.items():
+            name = partition_name(table, day)
+            moved = f"moved_{name}"
+            # Keep new check-ins out of the default partition while its rows are moved.
+            cursor.execute(f"LOCK TABLE {table}_default IN EXCLUSIVE MODE")
+            cursor.execute(f"CREATE TEMPORARY TABLE {moved} (LIKE {table}) ON COMMIT DROP")
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {table}_default WHERE created >= %s AND created < %s RETURNING *
+                )
+                INSERT INTO {moved} SELECT * FROM moved
+                """,
+                [start, end],
+            )
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            if unique_columns:
+                cursor.execute(
+                    f"CREATE UNIQUE INDEX {name}_uniq ON {name} ({', '.join(unique_columns)})"
+                )
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {moved}")
+
+
+def ensure_partitions(start, end):
+    """Create the missing partitions for the days from `start` up to, not including, `end`."""
+    existing = partition_days("pulpanalytics_system")
+    day = start
+    while day < end:
+        if day not in existing:
+            create_partitions(day)
+        day += timedelta(days=1)
+
+
+def drop_partition(day):
+    """Drop the partitions for `day`, with all of its check-ins.
+
+    Returns the number of rows each partition held, by table.
+    """
+    rows = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, day)
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            if cursor.fetchone()[0] is None:
+                rows[table] = 0
+                continue
+            # Taken first, so that no check-in is stored between counting and dropping.
+            cursor.execute(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(f"SELECT COUNT(*) FROM {name}")
+            rows[table] = cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {name}")
+    return rows
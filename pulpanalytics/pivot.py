@@ -0,0 +1,40 @@
+"""Pivot daily counts into the series of the stacked charts.
+
+The chart views read `(date, key, count)` rows ordered by date, e.g. the counts of each version of a
+plugin per day, and Chart.js wants the dates as labels and one list of counts per key, with a zero
+for each date a key has no row.
+"""
+
+
+def pivot(rows, key=None):
+    """Return the dates of `rows` and the counts of each key, one per date.
+
+    `rows` are `(date, key, count)` tuples ordered by date, read in a single pass. `key`, if given,
+    maps the keys of the rows to the keys of the series, the counts of keys mapped to the same
+    series are added up.
+    """
+    labels = []
+    index = -1
+    series = {}
+    # Row key: the counts of its series
+    row_series = {}
+    for day, row_key, count in rows:
+        if index < 0 or day != labels[index]:
+            labels.append(day)
+            index += 1
+        counts = row_series.get(row_key)
+        if counts is None:
+            series_key = row_key if key is None else key(row_key)
+            counts = row_series[row_key] = series.setdefault(series_key, [])
+        # Zeros for the days since the series was last counted, or since the first date.
+        if len(counts) <= index:
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += count
+    for counts in series.values():
+        counts.extend([0] * (len(labels) - len(counts)))
+    return labels, series
+
+
+def power_of_two_bucket(value):
+    """The smallest power of two not below `value`, 0 stays 0."""
+    return 1 << (value - 1).bit_length() if value else value
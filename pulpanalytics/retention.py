@@ -0,0 +1,102 @@
+"""Delete check-ins past their retention period without holding long locks on the ingest tables.
+
+Days with their own partitions are dropped one day per transaction. Rows that ended up in the
+default partitions are deleted in chunks of systems, together with their components, each chunk
+in its own short statement.
+"""
+
+import time
+from typing import NamedTuple
+
+from django.db import connection
+
+from pulpanalytics.partitions import day_bounds, drop_partition, partition_days
+
+CLEANUP_AFTER_N_DAYS = 14
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Deletes the next `chunk_size` expired systems by id, and their components. Component rows have
+# the `created` of their system, so the same bound prunes both tables to the default partitions.
+DELETE_CHUNK_SQL = """
+WITH chunk AS (
+    SELECT id FROM pulpanalytics_system
+    WHERE created < %(before)s AND id > %(after)s
+    ORDER BY id
+    LIMIT %(chunk_size)s
+),
+deleted_components AS (
+    DELETE FROM pulpanalytics_component
+    WHERE created < %(before)s AND system_id IN (SELECT id FROM chunk)
+    RETURNING 1
+),
+deleted_systems AS (
+    DELETE FROM pulpanalytics_system
+    WHERE created < %(before)s AND id IN (SELECT id FROM chunk)
+    RETURNING id
+)
+SELECT MAX(id), COUNT(*), (SELECT COUNT(*) FROM deleted_components) FROM deleted_systems
+"""
+
+COUNT_EXPIRED_SQL = """
+SELECT
+    (SELECT COUNT(*) FROM pulpanalytics_system WHERE created < %(before)s),
+    (SELECT COUNT(*) FROM pulpanalytics_component WHERE created < %(before)s)
+"""
+
+
+class PurgeResult(NamedTuple):
+    days: list
+    systems: int
+    components: int
+    seconds: float
+    finished: bool
+
+    @property
+    def rows_per_second(self):
+        return (self.systems + self.components) / self.seconds if self.seconds else 0.0
+
+
+def purge_checkins(before, chunk_size=DEFAULT_CHUNK_SIZE, pause=0, time_budget=None, dry_run=False):
+    """Remove all check-ins from before the day `before`.
+
+    Sleeps `pause` seconds between two partitions or chunks, and stops starting new ones once
+    `time_budget` seconds have passed; the rest is left for the next run. With `dry_run` nothing
+    is removed and the counts are those of the rows that would be. The system and component
+    counts include the rows of dropped partitions.
+    """
+    started = time.perf_counter()
+    start, _ = day_bounds(before)
+    days = sorted(day for day in partition_days("pulpanalytics_system") if day < before)
+
+    if dry_run:
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_EXPIRED_SQL, {"before": start})
+            systems, components = cursor.fetchone()
+        return PurgeResult(days, systems, components, time.perf_counter() - started, True)
+
+    def out_of_time():
+        return time_budget is not None and time.perf_counter() - started >= time_budget
+
+    dropped, systems, components = [], 0, 0
+    for day in days:
+        if out_of_time():
+            return PurgeResult(dropped, systems, components, time.perf_counter() - started, False)
+        rows = drop_partition(day)
+        systems += rows["pulpanalytics_system"]
+        components += rows["pulpanalytics_component"]
+        dropped.append(day)
+        time.sleep(pause)
+
+    params = {"before": start, "after": 0, "chunk_size": chunk_size}
+    while True:
+        if out_of_time():
+            return PurgeResult(dropped, systems, components, time.perf_counter() - started, False)
+        with connection.cursor() as cursor:
+            cursor.execute(DELETE_CHUNK_SQL, params)
+            last_id, chunk_systems, chunk_components = cursor.fetchone()
+        systems += chunk_systems
+        components += chunk_components
+        if chunk_systems < chunk_size:
+            return PurgeResult(dropped, systems, components, time.perf_counter() - started, True)
+        params["after"] = last_id
+        time.sleep(pause)
@@ -0,0 +1,71 @@
+"""Weekly and monthly rollups of the daily summaries, maintained by `summarize`.
+
+Charts over long ranges read one row per version or bucket per week or month instead of per day.
+A rollup holds the mean daily counts of its period, so that a period that is still in progress,
+or has days without a summary, is on the same scale as a complete one.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+
+from pulpanalytics.models import (
+    AgeCount,
+    AgeRollup,
+    DailySummary,
+    NumberCount,
+    NumberRollup,
+    Rollup,
+    XYVersionCount,
+    XYVersionRollup,
+    XYZVersionCount,
+    XYZVersionRollup,
+)
+
+RESOLUTIONS = ["week", "month"]
+
+# Rollup model: daily model, fields a count is kept per
+ROLLED_UP = {
+    NumberRollup: (NumberCount, ["name", "number"]),
+    AgeRollup: (AgeCount, ["age"]),
+    XYVersionRollup: (XYVersionCount, ["name", "version"]),
+    XYZVersionRollup: (XYZVersionCount, ["name", "version"]),
+}
+
+
+def period_bounds(day, resolution):
+    """Return the first day of the week or month of `day`, and the first day of the next one."""
+    if resolution == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=31)).replace(day=1)
+
+
+def update_rollups(days):
+    """Recompute the rollups of every week and month that contains one of `days`."""
+    periods = {
+        period_bounds(day, resolution) + (resolution,) for day in days for resolution in RESOLUTIONS
+    }
+    for start, end, resolution in sorted(periods):
+        _update_rollup(resolution, start, end)
+
+
+def _update_rollup(resolution, start, end):
+    with transaction.atomic():
+        Rollup.objects.filter(resolution=resolution, period=start).delete()
+        days = DailySummary.objects.filter(date__gte=start, date__lt=end).count()
+        if not days:
+            return
+        rollup = Rollup.objects.create(resolution=resolution, period=start, days=days)
+        for rollup_class, (count_class, fields) in ROLLED_UP.items():
+            totals = (
+                count_class.objects.filter(summary__gte=start, summary__lt=end)
+                .values(*fields)
+                .annotate(total=Sum("count"))
+                .order_by(*fields)
+            )
+            rollup_class.objects.bulk_create(
+                rollup_class(rollup=rollup, count=row.pop("total") / days, **row) for row in totals
+            )
@@ -1,8 +1,11 @@
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from pulpanalytics.models import System
+from pulpanalytics.chart_cache import bump_generation
+from pulpanalytics.first_seen import get_first_seen
+from pulpanalytics.models import Component, DailySummary, Rollup, System
 
 
 @receiver(pre_save, sender=System)
@@ -10,13 +13,23 @@ def _system_pre_save(sender, instance, raw, **kwargs):
     # `raw` imports should not do any database queries.
     if not raw:
         assert instance.system_id, "System needs a unique id."
-        first_seen_system = (
-            System.objects.filter(system_id=instance.system_id).order_by("first_seen").first()
-        )
-        if first_seen_system is None:
-            instance.first_seen = timezone.now()
-        else:
-            instance.first_seen = first_seen_system.first_seen
+        system_id = sender._meta.get_field("system_id").to_python(instance.system_id)
+        instance.first_seen = get_first_seen(system_id, timezone.now())
 
         if instance.created and instance.first_seen > instance.created:
             instance.first_seen = instance.created
+
+
+@receiver(pre_save, sender=Component)
+def _component_pre_save(sender, instance, raw, **kwargs):
+    if not raw and instance.created is None:
+        instance.created = instance.system.created
+
+
+@receiver(post_save, sender=DailySummary)
+@receiver(post_save, sender=Rollup)
+@receiver(post_delete, sender=DailySummary)
+@receiver(post_delete, sender=Rollup)
+def _summary_changed(sender, **kwargs):
+    # After the commit, so that no response computed from the old summaries is cached as new.
+    transaction.on_commit(bump_generation)
@@ -0,0 +1,64 @@
+"""HyperLogLog sketches of the systems that checked in, for distinct counts over any range of days.
+
+`summarize` stores one sketch per day for all systems and one per component name. A sketch is an
+array of registers, each holding the highest rank seen for the hashes of the systems routed to it.
+Merging sketches takes the highest rank of each register, so the sketches of a range of days
+merge into the sketch of the systems seen during the range, in the space of a single day.
+"""
+
+import math
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+
+# The registers of the systems selected by `{systems}`, overall and per component name they
+# reported. The low bits of a system's 64-bit hash pick its register, the rank is the position of
+# the first 1 in the remaining bits.
+REGISTERS_SQL = f"""
+WITH hashed AS (
+    SELECT system.id, hashtextextended(system.system_id::text, 0) AS hash
+    FROM ({{systems}}) AS system
+),
+ranked AS (
+    SELECT
+        id,
+        hash & {REGISTERS - 1} AS register,
+        COALESCE(
+            NULLIF(POSITION('1' IN (hash >> {PRECISION})::bit({64 - PRECISION})::text), 0),
+            {64 - PRECISION + 1}
+        ) AS rank
+    FROM hashed
+)
+SELECT GROUPING(component.name) = 0, component.name, register, MAX(rank)
+FROM ranked
+LEFT JOIN pulpanalytics_component component
+    ON component.system_id = ranked.id
+    AND component.created >= %s AND component.created < %s
+GROUP BY GROUPING SETS ((register), (component.name, register))
+"""
+
+
+class HyperLogLog:
+    """A HyperLogLog sketch (Flajolet et al., 2007), estimating the number of distinct hashes.
+
+    The standard error of `count()` is about 1.04 / sqrt(number of registers), 1.6% here.
+    """
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers if registers is not None else REGISTERS)
+
+    def set(self, register, rank):
+        self.registers[register] = max(self.registers[register], rank)
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty.
+            return round(m * math.log(m / zeros))
+        return round(estimate)
@@ -0,0 +1,43 @@
+"""Dashboard charts rendered ahead of time by `summarize`.
+
+The dashboard loads the same charts on every visit, from the `DASHBOARD_URLS`. Since they only
+change when summaries are written, `summarize` renders them at the end of each run and stores them
+gzip compressed under their `chart_cache` key. `cached_chart` serves them without any aggregation,
+even when its cache is cold. Requests with other parameters are computed live.
+"""
+
+import gzip
+from inspect import unwrap
+
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve
+
+from pulpanalytics import views
+from pulpanalytics.chart_cache import chart_cache, state_queryset
+from pulpanalytics.models import ChartSnapshot
+
+# The requests of `templates/pulpanalytics/index.html`.
+DASHBOARD_URLS = ["/dashboard/"]
+
+
+def _render(url):
+    path, _, query = url.partition("?")
+    match = resolve(path)
+    request = HttpRequest()
+    request.method = "GET"
+    request.GET = QueryDict(query)
+    key = chart_cache.key(match.url_name, request, match.kwargs, state_queryset(request).first())
+    # The undecorated view, so neither the cache nor an outdated snapshot answers.
+    view = unwrap(getattr(views, f"{match.url_name}_view"))
+    response = view(request, **match.kwargs)
+    return ChartSnapshot(url=url, key=key, content=gzip.compress(response.content))
+
+
+def write_snapshots():
+    """Render the `DASHBOARD_URLS` and replace the stored snapshots with them."""
+    snapshots = [_render(url) for url in DASHBOARD_URLS]
+    with transaction.atomic():
+        ChartSnapshot.objects.all().delete()
+        ChartSnapshot.objects.bulk_create(snapshots)
+    return snapshots
@@ -1,8 +1,23 @@
 import contextlib
+import uuid
 
 import pytest
 from django.utils import timezone
 
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.chart_cache import chart_cache
+from pulpanalytics.dedup import duplicate_filter
+from pulpanalytics.first_seen import first_seen_cache
+from pulpanalytics.models import System
+
+
+@pytest.fixture(autouse=True)
+def _clear_first_seen_cache():
+    # Database changes are rolled back after each test, the in-process caches must follow.
+    first_seen_cache.clear()
+    duplicate_filter.clear()
+    chart_cache.clear()
+
 
 @pytest.fixture
 def yesterday(monkeypatch):
@@ -14,3 +29,52 @@ def yesterday(monkeypatch):
             yield mp
 
     return _yesterday
+
+
+@pytest.fixture
+def old_system(yesterday):
+    """Create a System with a core and a file Component, checked in `days` ago."""
+
+    def _old_system(days):
+        with yesterday(days):
+            system = System.objects.create(system_id=uuid.uuid4(), postgresql_version=0)
+            system.component_set.create(name="core", version="3.28.1")
+            system.component_set.create(name="file", version="1.16.0")
+        return system
+
+    return _old_system
+
+
+@pytest.fixture
+def checkin_message():
+    """Build a serialized `Analytics` message with a core component."""
+
+    def _checkin_message(system_id=None, version="3.28.1"):
+        analytics = Analytics()
+        analytics.system_id = str(system_id or uuid.uuid4())
+        analytics.components.add(name="core", version=version)
+        return analytics.SerializeToString()
+
+    return _checkin_message
+
+
+def _varint(value):
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+@pytest.fixture
+def delimited():
+    """Join messages into the varint length-prefixed stream `/batch/` reads."""
+
+    def _delimited(*messages):
+        return b"".join(_varint(len(message)) + message for message in messages)
+
+    return _delimited
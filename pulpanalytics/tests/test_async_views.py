@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import Http404
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics import async_views, views
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.chart_cache import chart_cache
+from pulpanalytics.models import DailySummary, DeploymentStats, System
+from pulpanalytics.rollups import update_rollups
+
+SYSTEM_ID = "00000000000000000000000000000000"
+
+
+@pytest.fixture
+def daily_summary(db):
+    date = timezone.now().date()
+    daily_summary = DailySummary.objects.create(date=date)
+    DeploymentStats.objects.create(summary=daily_summary, online_worker_processes_avg=1.5)
+    daily_summary.agecount_set.create(age=1, count=2)
+    daily_summary.agecount_set.create(age=3, count=3)
+    daily_summary.numbercount_set.create(name="users", number=4, count=6)
+    daily_summary.postgresversioncount_set.create(version=140005, count=5)
+    daily_summary.xyversioncount_set.create(name="core", version="3.28", count=7)
+    update_rollups([date])
+    return daily_summary
+
+
+@pytest.mark.parametrize(
+    "name,kwargs,query",
+    [
+        ("postgresql_versions_view", {}, ""),
+        ("deployment_stats_view", {"component": "worker"}, ""),
+        ("plugin_stats_view", {"plugin": "core"}, ""),
+        ("plugin_stats_view", {"plugin": "core"}, "?resolution=week"),
+        ("demography_view", {}, ""),
+        ("distinct_systems_view", {}, ""),
+        ("plugin_systems_view", {}, "?all_of=core"),
+        ("plugin_cooccurrence_view", {}, ""),
+        ("systems_by_age_view", {}, "?bucket=1"),
+        ("rbac_stats_view", {"measure": "users"}, ""),
+        ("dashboard_view", {}, ""),
+        ("plugin_stats_view", {"plugin": "core"}, "?format=columnar"),
+        ("demography_view", {}, "?format=columnar"),
+    ],
+)
+def test_same_data_as_sync_views(daily_summary, rf, async_rf, name, kwargs, query):
+    sync_response = getattr(views, name)(rf.get("/" + query), **kwargs)
+    chart_cache.clear()
+    async_response = async_to_sync(getattr(async_views, name))(async_rf.get("/" + query), **kwargs)
+
+    assert async_response.status_code == 200
+    assert json.loads(async_response.content) == json.loads(sync_response.content)
+
+
+def test_not_found(db, async_rf):
+    with pytest.raises(Http404):
+        async_to_sync(async_views.plugin_stats_view)(async_rf.get("/"), plugin="unknown")
+
+
+def test_index(db, async_rf):
+    request = async_rf.get(reverse("pulpanalytics:index"))
+    response = async_to_sync(async_views.RootView.as_view())(request)
+
+    assert response.status_code == 200
+    assert b'<meta name="revision"' in response.content
+
+
+def test_receive_analytics(db, async_rf):
+    analytics = Analytics()
+    analytics.system_id = SYSTEM_ID
+    analytics.components.add(name="core", version="3.28.1")
+    request = async_rf.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    response = async_to_sync(async_views.RootView.as_view())(request)
+
+    assert response.status_code == 200
+    assert System.objects.get(system_id=SYSTEM_ID).component_set.count() == 1
@@ -0,0 +1,63 @@
+import uuid
+
+import pytest
+from django.urls import reverse
+
+from pulpanalytics.models import Component, System
+
+
+def _post(client, body):
+    return client.post(reverse("pulpanalytics:batch"), body, "application/octets")
+
+
+def test_batch(db, client, checkin_message, delimited, settings):
+    settings.COLLECT_DEV_SYSTEMS = False
+    settings.INGEST_BATCH_SIZE = 2
+    system_id = uuid.uuid4()
+    body = delimited(
+        checkin_message(system_id),
+        checkin_message(),
+        checkin_message(system_id),
+        checkin_message(version="3.28.1-dev"),
+        b"not a protobuf message",
+        checkin_message(),
+    )
+
+    response = _post(client, body)
+
+    assert response.status_code == 200, response.content
+    assert response.json() == {"accepted": 3, "duplicate": 1, "dropped": 2}
+    assert System.objects.count() == 3
+    assert Component.objects.count() == 3
+
+
+def test_batch_empty(db, client):
+    response = _post(client, b"")
+
+    assert response.status_code == 200
+    assert response.json() == {"accepted": 0, "duplicate": 0, "dropped": 0}
+
+
+@pytest.mark.parametrize("cut", [1, 5])
+def test_batch_truncated(db, client, checkin_message, delimited, cut):
+    body = delimited(checkin_message(), checkin_message())
+
+    response = _post(client, body[:-cut])
+
+    assert response.status_code == 400
+    assert not System.objects.exists()
+
+
+def test_batch_too_many_messages(db, client, checkin_message, delimited, settings):
+    settings.INGEST_BATCH_MAX_MESSAGES = 1
+
+    response = _post(client, delimited(checkin_message(), checkin_message()))
+
+    assert response.status_code == 400
+    assert not System.objects.exists()
+
+
+def test_batch_get_not_allowed(db, client):
+    response = client.get(reverse("pulpanalytics:batch"))
+
+    assert response.status_code == 405
@@ -0,0 +1,88 @@
+import uuid
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from pyroaring import BitMap
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.bitmaps import combine, matching_systems
+from pulpanalytics.models import SystemBitmap, SystemNumber
+
+MONDAY = date(2024, 1, 29)
+TUESDAY = date(2024, 1, 30)
+
+
+def _row(day, name, numbers):
+    return day, name, BitMap(numbers).serialize()
+
+
+@pytest.mark.parametrize(
+    "all_of,any_of,numbers",
+    [
+        (["rpm"], [], {1, 2, 3, 4}),
+        (["rpm", "container"], [], {2, 4}),
+        ([], ["container", "galaxy"], {2, 3, 4, 5}),
+        (["rpm"], ["container", "galaxy"], {2, 4}),
+        (["galaxy"], [], {5}),
+        ([], [], set()),
+    ],
+)
+def test_combine(all_of, any_of, numbers):
+    # System 3 ran rpm and container, but not on the same day.
+    rows = [
+        _row(MONDAY, "rpm", [1, 2, 3]),
+        _row(MONDAY, "container", [2]),
+        _row(TUESDAY, "rpm", [4]),
+        _row(TUESDAY, "container", [3, 4]),
+        _row(TUESDAY, "galaxy", [5]),
+    ]
+
+    assert set(combine(rows, all_of, any_of)) == numbers
+
+
+def _checkin(client, system_id, plugins):
+    analytics = Analytics()
+    analytics.system_id = str(system_id)
+    for plugin in plugins:
+        analytics.components.add(name=plugin, version="1.0.0")
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200
+
+
+def test_summarize_stores_bitmaps(yesterday, db, client, settings):
+    settings.PERSISTENT_MIN_AGE_DAYS = 0
+    first, second, third = (uuid.uuid4() for _ in range(3))
+    with yesterday(2):
+        _checkin(client, first, ["core", "rpm", "container"])
+        _checkin(client, second, ["core", "rpm"])
+    with yesterday():
+        _checkin(client, second, ["core", "container"])
+        _checkin(client, third, ["core", "galaxy"])
+    call_command("summarize")
+
+    numbers = dict(SystemNumber.objects.values_list("system_id", "id"))
+    lowest = min(numbers.values())
+    assert sorted(numbers.values()) == [lowest, lowest + 1, lowest + 2]
+    assert numbers[third] == lowest + 2
+    assert SystemBitmap.objects.count() == 6
+    day = (timezone.now() - timezone.timedelta(days=1)).date()
+    assert set(matching_systems(all_of=["core"])) == set(numbers.values())
+    assert set(matching_systems(start=day, all_of=["core"])) == {numbers[second], numbers[third]}
+    assert set(matching_systems(all_of=["rpm", "container"])) == {numbers[first]}
+
+    response = client.get(reverse("pulpanalytics:plugin_systems"), {"any_of": "galaxy,container"})
+
+    assert response.status_code == 200
+    assert response.json() == {"systems": 3}
+
+
+@pytest.mark.parametrize("query", [{}, {"all_of": "rpm,nope"}])
+def test_plugin_systems_bad_request(db, client, query):
+    response = client.get(reverse("pulpanalytics:plugin_systems"), query)
+
+    assert response.status_code == 400
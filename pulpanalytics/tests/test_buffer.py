@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.urls import reverse
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.buffer import CheckinBuffer, checkin_buffer
+from pulpanalytics.ingest import save_checkins
+from pulpanalytics.models import Component, System
+
+
+def _analytics(system_id=None):
+    analytics = Analytics()
+    analytics.system_id = str(system_id or uuid.uuid4())
+    analytics.components.add(name="core", version="3.28.1")
+    return analytics
+
+
+@pytest.fixture
+def buffered(settings):
+    settings.INGEST_MODE = "buffered"
+    yield
+    checkin_buffer.stop()
+
+
+def test_buffered_checkins(transactional_db, client, buffered):
+    system_id = uuid.uuid4()
+    for analytics in [_analytics(system_id), _analytics(system_id), _analytics()]:
+        response = client.post(
+            reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+        )
+        assert response.status_code == 200, response.status_code
+
+    checkin_buffer.flush()
+
+    assert System.objects.count() == 2
+    assert System.objects.filter(system_id=system_id).count() == 1
+    assert Component.objects.count() == 2
+
+
+def test_flush_on_stop(transactional_db):
+    buffer = CheckinBuffer(batch_size=100, flush_interval=60, queue_size=10, backpressure="block")
+    buffer.put(_analytics())
+    buffer.put(_analytics())
+    buffer.stop()
+
+    assert System.objects.count() == 2
+
+
+@pytest.mark.parametrize("backpressure", ["drop", "reject"])
+def test_backpressure(db, backpressure):
+    buffer = CheckinBuffer(
+        batch_size=100, flush_interval=60, queue_size=1, backpressure=backpressure
+    )
+    # Keep the background thread from emptying the queue.
+    buffer._start = lambda: None
+
+    assert buffer.put(_analytics()) is True
+    assert buffer.put(_analytics()) is (backpressure == "drop")
+    buffer.flush()
+
+    assert System.objects.count() == 1
+
+
+def test_batch_spanning_midnight(db):
+    analytics = _analytics()
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    created = [midnight - timedelta(minutes=1), midnight, midnight + timedelta(minutes=1)]
+
+    result = save_checkins([(analytics, moment) for moment in created])
+
+    assert (result.accepted, result.duplicate) == (2, 1)
+    assert System.objects.filter(system_id=analytics.system_id).count() == 2
+    assert Component.objects.count() == 2
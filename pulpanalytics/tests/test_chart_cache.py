@@ -0,0 +1,167 @@
+from datetime import date, datetime, time
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import parse_http_date
+
+from pulpanalytics import async_views
+from pulpanalytics.chart_cache import PAST_MAX_AGE, bump_generation, chart_cache
+from pulpanalytics.models import DailySummary, SummaryGeneration
+
+# When the generation was last bumped.
+BUMPED = datetime(2024, 1, 11, tzinfo=dt_timezone.utc)
+
+
+def _plugin_stats(client, headers=None, **query):
+    url = reverse("pulpanalytics:plugin_stats", kwargs={"plugin": "core"})
+    return client.get(url, query, headers=headers)
+
+
+def test_cached_response(db, client, django_assert_num_queries):
+    DailySummary.objects.create(date=timezone.now().date())
+    first = _plugin_stats(client, z_stream=1, start_date="2024-01-01")
+
+    # Only the generation is read, the response comes from the cache.
+    with django_assert_num_queries(1):
+        second = _plugin_stats(client, start_date="2024-01-01", z_stream=1)
+
+    assert second.status_code == 200
+    assert second["Content-Type"] == "application/json"
+    assert second.content == first.content
+    stats = chart_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_query_is_part_of_the_key(db, client):
+    _plugin_stats(client)
+    _plugin_stats(client, z_stream=1)
+
+    assert chart_cache.stats()["misses"] == 2
+
+
+def test_new_summary_invalidates(db, client, django_capture_on_commit_callbacks):
+    today = timezone.now().date()
+    daily_summary = DailySummary.objects.create(date=today)
+    daily_summary.xyversioncount_set.create(name="core", version="3.28", count=1)
+    assert _plugin_stats(client).json()["labels"] == [str(today)]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        DailySummary.objects.filter(date=today).delete()
+
+    assert _plugin_stats(client).json()["labels"] == []
+    assert chart_cache.stats()["misses"] == 2
+
+
+def test_errors_are_not_cached(db, client):
+    url = reverse("pulpanalytics:plugin_stats", kwargs={"plugin": "unknown"})
+    client.get(url)
+
+    assert client.get(url).status_code == 404
+    assert chart_cache.stats()["hits"] == 0
+
+
+def test_async_views_share_the_cache(db, client, async_rf):
+    _plugin_stats(client)
+
+    response = async_to_sync(async_views.plugin_stats_view)(async_rf.get("/"), plugin="core")
+
+    assert response.status_code == 200
+    assert chart_cache.stats()["hits"] == 1
+
+
+def test_file_based_backend(db, client, settings, tmp_path):
+    settings.CACHES = settings.CACHES | {
+        "charts": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    _plugin_stats(client)
+    _plugin_stats(client)
+
+    assert chart_cache.stats() == {
+        "backend": "FileBasedCache",
+        "hits": 1,
+        "snapshot_hits": 0,
+        "misses": 1,
+    }
+    assert list(tmp_path.iterdir())
+
+
+def test_runtime_stats(db, client):
+    _plugin_stats(client)
+
+    response = client.get(reverse("pulpanalytics:runtime_stats"))
+
+    assert response.json()["chart_cache"] == {
+        "backend": "LocMemCache",
+        "hits": 0,
+        "snapshot_hits": 0,
+        "misses": 1,
+    }
+
+
+def test_not_modified(db, client, django_assert_num_queries):
+    DailySummary.objects.create(date=date(2024, 1, 10))
+    response = _plugin_stats(client)
+    assert response["Cache-Control"] == "no-cache"
+
+    # Answered from the newest summary and the generation alone.
+    with django_assert_num_queries(1):
+        not_modified = _plugin_stats(client, headers={"If-None-Match": response["ETag"]})
+
+    assert not_modified.status_code == 304
+    assert not_modified["ETag"] == response["ETag"]
+    assert chart_cache.stats()["misses"] == 1
+
+
+def test_if_modified_since(db, client):
+    DailySummary.objects.create(date=date(2024, 1, 10))
+    SummaryGeneration.objects.create(pk=1, value=1, modified=BUMPED)
+    response = _plugin_stats(client, end_date="2024-01-15")
+    assert response["Last-Modified"] == "Thu, 11 Jan 2024 00:00:00 GMT"
+
+    headers = {"If-Modified-Since": response["Last-Modified"]}
+    assert _plugin_stats(client, headers=headers, end_date="2024-01-15").status_code == 304
+
+    # A rewritten summary keeps the date of the newest one, the bump still shows.
+    bump_generation()
+    response = _plugin_stats(client, headers=headers, end_date="2024-01-15")
+    assert response.status_code == 200
+    assert parse_http_date(response["Last-Modified"]) > parse_http_date(
+        headers["If-Modified-Since"]
+    )
+
+
+def test_last_modified_today(db, client):
+    DailySummary.objects.create(date=date(2024, 1, 10))
+    SummaryGeneration.objects.create(pk=1, value=1, modified=BUMPED)
+
+    response = _plugin_stats(client)
+
+    # The range ends today, so it changes with the date as well.
+    today = datetime.combine(timezone.now().date(), time(), tzinfo=dt_timezone.utc)
+    assert parse_http_date(response["Last-Modified"]) == today.timestamp()
+
+
+def test_new_summary_changes_etag(db, client, django_capture_on_commit_callbacks):
+    DailySummary.objects.create(date=date(2024, 1, 10))
+    etag = _plugin_stats(client)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        DailySummary.objects.create(date=date(2024, 1, 11))
+
+    response = _plugin_stats(client, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_past_range(db, client):
+    DailySummary.objects.create(date=date(2024, 1, 10))
+    DailySummary.objects.create(date=date(2024, 1, 20))
+
+    response = _plugin_stats(client, end_date="2024-01-15")
+
+    assert response["Cache-Control"] == f"public, max-age={PAST_MAX_AGE}"
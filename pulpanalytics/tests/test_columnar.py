@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from pulpanalytics.models import DailySummary
+
+
+@pytest.fixture
+def summaries(db):
+    for day, counts in [
+        (date(2024, 1, 1), {"3.28": 2}),
+        (date(2024, 1, 4), {"3.28": 1, "3.29": 3}),
+    ]:
+        daily_summary = DailySummary.objects.create(date=day)
+        for version, count in counts.items():
+            daily_summary.xyversioncount_set.create(name="core", version=version, count=count)
+        daily_summary.agecount_set.create(age=0, count=1)
+        daily_summary.agecount_set.create(age=2, count=4)
+
+
+def _get(client, name, kwargs=None, **query):
+    return client.get(reverse(f"pulpanalytics:{name}", kwargs=kwargs), query)
+
+
+def test_series(summaries, client):
+    response = _get(client, "plugin_stats", {"plugin": "core"}, format="columnar")
+
+    assert response["Content-Type"] == "application/json"
+    assert response.json() == {
+        "start": "2024-01-01",
+        "days": [0, 3],
+        "labels": ["3.29", "3.28"],
+        "data": [[0, 3], [2, 1]],
+    }
+
+
+def test_series_empty(db, client):
+    response = _get(client, "rbac_stats", {"measure": "users"}, format="columnar")
+
+    assert response.json() == {"start": None, "days": [], "labels": [], "data": []}
+
+
+def test_demography(summaries, client):
+    response = _get(client, "demography", format="columnar")
+
+    assert response.json() == {"max_age": 3, "count": [0, 4, 0, 1], "accumulated": [0, 4, 4, 5]}
+
+
+def test_same_series_as_chartjs(summaries, client):
+    chartjs = _get(client, "systems_by_age", bucket=1).json()
+    columnar = _get(client, "systems_by_age", bucket=1, format="columnar").json()
+
+    assert columnar["labels"] == [dataset["label"] for dataset in chartjs["datasets"]]
+    assert columnar["data"] == [dataset["data"] for dataset in chartjs["datasets"]]
+
+
+def test_unknown_format(db, client):
+    assert (
+        _get(client, "deployment_stats", {"component": "worker"}, format="csv").status_code == 400
+    )
@@ -0,0 +1,80 @@
+import uuid
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.models import CooccurrenceCount, DailySummary
+
+
+def _checkin(client, plugins):
+    analytics = Analytics()
+    analytics.system_id = str(uuid.uuid4())
+    for plugin in plugins:
+        analytics.components.add(name=plugin, version="1.0.0")
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200
+
+
+def test_summarize_counts_cooccurrence(yesterday, db, client, settings):
+    settings.PERSISTENT_MIN_AGE_DAYS = 0
+    with yesterday():
+        _checkin(client, ["core", "rpm", "container"])
+        _checkin(client, ["core", "rpm"])
+        _checkin(client, ["core", "file"])
+
+    call_command("summarize")
+
+    counts = CooccurrenceCount.objects.values_list("name", "other", "count")
+    assert sorted(counts) == [
+        ("container", "container", 1),
+        ("container", "core", 1),
+        ("container", "rpm", 1),
+        ("core", "core", 3),
+        ("core", "file", 1),
+        ("core", "rpm", 2),
+        ("file", "file", 1),
+        ("rpm", "rpm", 2),
+    ]
+
+
+def test_plugin_cooccurrence(db, client):
+    today = timezone.now().date()
+    for days, count in [(1, 4), (2, 2), (40, 100)]:
+        daily_summary = DailySummary.objects.create(date=today - timezone.timedelta(days=days))
+        daily_summary.cooccurrencecount_set.create(name="core", other="core", count=count)
+        daily_summary.cooccurrencecount_set.create(name="core", other="rpm", count=count // 2)
+        daily_summary.cooccurrencecount_set.create(name="rpm", other="rpm", count=count // 2)
+        daily_summary.cooccurrencecount_set.create(name="core", other="not_a_plugin", count=1)
+
+    response = client.get(reverse("pulpanalytics:plugin_cooccurrence"))
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "labels": ["core", "rpm"],
+        "datasets": [
+            {"label": "core", "data": [3.0, 1.5]},
+            {"label": "rpm", "data": [1.5, 1.5]},
+        ],
+    }
+
+
+def test_plugin_cooccurrence_empty(db, client):
+    response = client.get(reverse("pulpanalytics:plugin_cooccurrence"))
+
+    assert response.json() == {"labels": [], "datasets": []}
+
+
+def test_plugin_cooccurrence_mean_over_summaries(db, client):
+    today = timezone.now().date()
+    daily_summary = DailySummary.objects.create(date=today - timezone.timedelta(days=1))
+    daily_summary.cooccurrencecount_set.create(name="core", other="core", count=4)
+    # No system with a plugin that day, but it was summarized.
+    DailySummary.objects.create(date=today - timezone.timedelta(days=2))
+
+    response = client.get(reverse("pulpanalytics:plugin_cooccurrence"))
+
+    assert response.json()["datasets"] == [{"label": "core", "data": [2.0]}]
@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.models import DailyCounter, DailySummary
+
+
+@pytest.fixture(params=["orm", "statement"])
+def incremental(request, settings):
+    settings.INGEST_MODE = request.param
+    settings.INCREMENTAL_SUMMARY = True
+
+
+@pytest.fixture(params=[0, 1])
+def persistent_min_age_days(request, settings):
+    settings.PERSISTENT_MIN_AGE_DAYS = request.param
+    return request.param
+
+
+def _post(client, system_id, index=0):
+    analytics = Analytics()
+    analytics.system_id = str(system_id)
+    analytics.postgresql_version = 150000 + index % 2
+    analytics.online_workers.processes = index
+    analytics.online_workers.hosts = 1
+    if index % 2:
+        analytics.rbac_stats.users = index
+        analytics.rbac_stats.groups = 1
+    analytics.components.add(name="core", version=f"3.{index % 3}.{index}")
+    analytics.components.add(name=f"plugin{index % 2}", version="1.0.0")
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200, response.status_code
+
+
+def _post_days(yesterday, client):
+    system_ids = [uuid.uuid4() for _ in range(6)]
+    with yesterday(3):
+        for index, system_id in enumerate(system_ids[:3]):
+            _post(client, system_id, index)
+    with yesterday():
+        for index, system_id in enumerate(system_ids):
+            _post(client, system_id, index)
+            _post(client, system_id, index)
+
+
+def test_counters_match_recompute(
+    yesterday, db, client, incremental, persistent_min_age_days, capsys
+):
+    _post_days(yesterday, client)
+
+    call_command("summarize", "--check")
+
+    assert "incomplete" not in capsys.readouterr().out
+    assert not DailyCounter.objects.exists()
+    daily_summary = DailySummary.objects.order_by("date").last()
+    persistent = 6 if persistent_min_age_days == 0 else 3
+    assert sum(daily_summary.agecount_set.values_list("count", flat=True)) == 6
+    core_versions = daily_summary.xyversioncount_set.filter(name="core")
+    assert sum(core_versions.values_list("count", flat=True)) == persistent
+
+
+def test_duplicates_are_counted_once(db, client, incremental):
+    system_id = uuid.uuid4()
+    _post(client, system_id)
+    _post(client, system_id)
+
+    counter = DailyCounter.objects.get(date=timezone.now().date(), kind="systems")
+    assert counter.count == 1
+
+
+def test_incomplete_counters_are_recomputed(yesterday, db, client, settings, capsys):
+    with yesterday():
+        _post(client, uuid.uuid4())
+        settings.INCREMENTAL_SUMMARY = True
+        _post(client, uuid.uuid4())
+
+    call_command("summarize")
+
+    assert "incomplete" in capsys.readouterr().out
+    daily_summary = DailySummary.objects.order_by("date").last()
+    assert daily_summary.xyzversioncount_set.get(name="core").count == 2
+
+
+def test_check_finds_differences(yesterday, db, client, incremental):
+    with yesterday():
+        _post(client, uuid.uuid4())
+    DailyCounter.objects.filter(kind="age").update(count=F("count") + 1)
+
+    with pytest.raises(CommandError):
+        call_command("summarize", "--check")
@@ -0,0 +1,66 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from pulpanalytics.models import DailySummary, DeploymentStats
+from pulpanalytics.views import PLUGINS, RBAC_MEASURES
+
+# Canvas id: the chart request the dashboard made before the bundle
+CHART_URLS = {
+    "content-app-graph": "/deployment_stats/content_app/",
+    "worker-graph": "/deployment_stats/worker/",
+    "systems-by-age-graph": "/systems_by_age/?start_date=2022-10-16&bucket=1",
+    **{
+        f"{measure.replace('_', '-')}-graph": (
+            f"/rbac_stats/{measure}/?start_date=2023-03-10&bucket=1"
+        )
+        for measure in RBAC_MEASURES
+    },
+    **{f"{plugin}-versions": f"/plugin_stats/{plugin}/" for plugin in PLUGINS},
+    "demography-graph": "/demography/",
+    "postgresql-versions-graph": "/postgresql_versions/",
+}
+
+
+@pytest.fixture
+def summaries(db):
+    # The first day is before the start of the age and RBAC charts.
+    for day, offset in [(date(2022, 1, 1), 0), (date(2024, 1, 1), 1), (date(2024, 1, 3), 2)]:
+        daily_summary = DailySummary.objects.create(date=day)
+        DeploymentStats.objects.create(
+            summary=daily_summary,
+            online_worker_processes_avg=1.5 + offset,
+            online_content_app_hosts_avg=offset,
+        )
+        daily_summary.agecount_set.create(age=offset, count=2)
+        daily_summary.agecount_set.create(age=3 + offset, count=3)
+        daily_summary.numbercount_set.create(name="users", number=4 + offset, count=6)
+        daily_summary.numbercount_set.create(name="custom_roles", number=offset, count=1)
+        daily_summary.postgresversioncount_set.create(version=140005 + offset, count=5)
+        daily_summary.xyversioncount_set.create(name="core", version=f"3.2{offset}", count=7)
+        daily_summary.xyversioncount_set.create(name="rpm", version="3.20", count=offset)
+
+
+def test_same_data_as_chart_views(summaries, client):
+    dashboard = client.get(reverse("pulpanalytics:dashboard")).json()
+
+    assert set(dashboard) == set(CHART_URLS)
+    for canvas_id, url in CHART_URLS.items():
+        assert dashboard[canvas_id] == client.get(url).json(), canvas_id
+
+
+def test_one_query_per_table(summaries, client, django_assert_num_queries):
+    # The summary state and snapshot lookups of the cache, the latest summary and one query per
+    # count table.
+    with django_assert_num_queries(8):
+        response = client.get(reverse("pulpanalytics:dashboard"))
+
+    assert response.status_code == 200
+
+
+def test_empty(db, client):
+    dashboard = client.get(reverse("pulpanalytics:dashboard")).json()
+
+    assert dashboard["demography-graph"] == {}
+    assert dashboard["core-versions"] == {"labels": [], "datasets": []}
@@ -0,0 +1,133 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from django.urls import reverse
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.buffer import checkin_buffer
+from pulpanalytics.dedup import BloomFilter, duplicate_filter
+from pulpanalytics.models import System
+
+SYSTEM_ID = "00000000000000000000000000000000"
+
+
+@pytest.fixture
+def enabled(settings):
+    settings.DUPLICATE_FILTER_CAPACITY = 1000
+    settings.DUPLICATE_FILTER_ERROR_RATE = 1e-6
+
+
+def _post(client, system_id=SYSTEM_ID):
+    analytics = Analytics()
+    analytics.system_id = system_id
+    analytics.components.add(name="core", version="3.28.1")
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200, response.status_code
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [uuid.uuid4().bytes for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+def test_filter_rotates_daily(enabled):
+    system_id = uuid.uuid4()
+    today = date.today()
+    duplicate_filter.add(system_id, today)
+
+    assert duplicate_filter.seen(system_id, today)
+    assert not duplicate_filter.seen(system_id, today + timedelta(days=1))
+    assert duplicate_filter.stats()["hits"] == 1
+    assert duplicate_filter.stats()["misses"] == 1
+
+
+def test_filter_capacity(settings, enabled):
+    settings.DUPLICATE_FILTER_CAPACITY = 1
+    today = date.today()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    duplicate_filter.add(first, today)
+    duplicate_filter.add(second, today)
+
+    assert duplicate_filter.seen(first, today)
+    assert not duplicate_filter.seen(second, today)
+
+
+def test_filter_disabled():
+    system_id = uuid.uuid4()
+    duplicate_filter.add(system_id, date.today())
+
+    assert not duplicate_filter.seen(system_id, date.today())
+
+
+def test_repeat_checkin_skips_database(db, client, enabled, django_assert_num_queries):
+    _post(client)
+    with django_assert_num_queries(0):
+        _post(client)
+
+    assert System.objects.filter(system_id=SYSTEM_ID).count() == 1
+
+
+def test_repeat_checkin_next_day(yesterday, db, client, enabled):
+    with yesterday():
+        _post(client)
+    _post(client)
+
+    assert System.objects.filter(system_id=SYSTEM_ID).count() == 2
+
+
+def test_dropped_checkin_is_not_remembered(db, client, enabled):
+    _post(client, system_id="not a uuid")
+
+    assert duplicate_filter.stats()["entries"] == 0
+
+
+@pytest.fixture
+def buffered(settings):
+    settings.INGEST_MODE = "buffered"
+    yield
+    checkin_buffer.stop()
+
+
+def test_buffered_checkin_remembered_once_stored(transactional_db, client, enabled, buffered):
+    _post(client)
+
+    assert not duplicate_filter.seen(uuid.UUID(SYSTEM_ID), date.today())
+    checkin_buffer.flush()
+    assert duplicate_filter.seen(uuid.UUID(SYSTEM_ID), date.today())
+
+
+def test_buffered_checkin_not_remembered_when_not_stored(
+    transactional_db, client, enabled, buffered, monkeypatch
+):
+    def fail(batch):
+        raise RuntimeError("The database is gone.")
+
+    monkeypatch.setattr("pulpanalytics.buffer.insert_checkins", fail)
+    _post(client)
+    checkin_buffer.flush()
+
+    assert not duplicate_filter.seen(uuid.UUID(SYSTEM_ID), date.today())
+
+
+def test_runtime_stats(db, client, enabled):
+    _post(client)
+    _post(client)
+    _post(client, system_id=str(uuid.uuid4()))
+
+    response = client.get(reverse("pulpanalytics:runtime_stats"))
+
+    assert response.status_code == 200
+    stats = response.json()["duplicate_filter"]
+    assert stats["enabled"] is True
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+import zstandard
+from django.urls import reverse
+
+from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.models import Component, System
+
+SYSTEM_ID = "00000000000000000000000000000000"
+
+ENCODERS = {
+    "gzip": gzip.compress,
+    "zstd": lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+@pytest.fixture(params=ENCODERS.keys())
+def encoding(request):
+    return request.param
+
+
+def _post(client, name, body, encoding):
+    return client.post(
+        reverse(f"pulpanalytics:{name}"),
+        body,
+        "application/octets",
+        HTTP_CONTENT_ENCODING=encoding,
+    )
+
+
+def test_compressed_checkin(db, client, encoding):
+    analytics = Analytics()
+    analytics.system_id = SYSTEM_ID
+    analytics.components.add(name="core", version="3.28.1")
+    body = ENCODERS[encoding](analytics.SerializeToString())
+
+    response = _post(client, "index", body, encoding)
+
+    assert response.status_code == 200, response.content
+    assert System.objects.get(system_id=SYSTEM_ID).component_set.count() == 1
+
+
+def test_compressed_batch(db, client, encoding, checkin_message, delimited):
+    body = ENCODERS[encoding](delimited(checkin_message(), checkin_message()))
+
+    response = _post(client, "batch", body, encoding)
+
+    assert response.status_code == 200, response.content
+    assert response.json() == {"accepted": 2, "duplicate": 0, "dropped": 0}
+    assert Component.objects.count() == 2
+
+
+def test_decompression_bomb(db, client, settings, encoding):
+    settings.INGEST_MAX_DECODED_SIZE = 1024
+    body = ENCODERS[encoding](b"\0" * 10 * 1024 * 1024)
+
+    response = _post(client, "index", body, encoding)
+
+    assert response.status_code == 413
+    assert not System.objects.exists()
+
+
+def test_corrupt_body(db, client, encoding):
+    response = _post(client, "index", b"definitely not compressed", encoding)
+
+    assert response.status_code == 400
+
+
+def test_unsupported_encoding(db, client):
+    response = _post(client, "index", b"", "br")
+
+    assert response.status_code == 415
@@ -0,0 +1,119 @@
+import io
+from datetime import date
+
+import pyarrow.parquet
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import Permission, User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management import call_command
+from django.urls import reverse
+
+from pulpanalytics import async_views, export
+from pulpanalytics.models import DailySummary, DeploymentStats
+
+
+@pytest.fixture
+def summaries(db):
+    for day in [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3)]:
+        daily_summary = DailySummary.objects.create(date=day)
+        DeploymentStats.objects.create(summary=daily_summary, online_worker_hosts_avg=1.5)
+        daily_summary.xyversioncount_set.create(name="core", version="3.28", count=day.day)
+        daily_summary.xyversioncount_set.create(name="rpm", version="3.20", count=1)
+
+
+@pytest.fixture
+def analyst(db, client):
+    user = User.objects.create_user("analyst")
+    user.user_permissions.add(Permission.objects.get(codename="view_dailysummary"))
+    client.force_login(user)
+    return user
+
+
+def _export(client, table, **query):
+    return client.get(reverse("pulpanalytics:export", kwargs={"table": table}), query)
+
+
+def test_csv(summaries, analyst, client):
+    response = _export(client, "xyversioncount", start_date="2024-01-02")
+
+    assert response["Content-Type"] == "text/csv"
+    assert response["Content-Disposition"] == 'attachment; filename="xyversioncount.csv"'
+    assert b"".join(response.streaming_content).decode().splitlines() == [
+        "date,name,version,count",
+        "2024-01-02,core,3.28,2",
+        "2024-01-02,rpm,3.20,1",
+        "2024-01-03,core,3.28,3",
+        "2024-01-03,rpm,3.20,1",
+    ]
+
+
+def test_parquet_row_groups(summaries, analyst, client, monkeypatch):
+    monkeypatch.setattr(export, "ROW_GROUP_SIZE", 2)
+
+    response = _export(client, "deploymentstats", format="parquet", end_date="2024-01-02")
+
+    parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(response.streaming_content)))
+    assert parquet_file.metadata.num_row_groups == 1
+    table = parquet_file.read()
+    assert table.column_names == export.columns(DeploymentStats)
+    assert table.column("date").to_pylist() == [date(2024, 1, 1), date(2024, 1, 2)]
+    assert table.column("online_worker_hosts_avg").to_pylist() == [1.5, 1.5]
+
+
+def test_one_chunk_per_row_group(summaries, monkeypatch):
+    monkeypatch.setattr(export, "ROW_GROUP_SIZE", 2)
+    encoder = export.ParquetEncoder(DailySummary)
+
+    chunks = list(export.stream(encoder, export.export_queryset(DailySummary).iterator()))
+
+    # Two row groups and the footer.
+    assert len(chunks) == 3
+    assert pyarrow.parquet.ParquetFile(io.BytesIO(b"".join(chunks))).metadata.num_row_groups == 2
+
+
+def test_empty(db, analyst, client):
+    response = _export(client, "agecount")
+
+    assert b"".join(response.streaming_content) == b"date,age,count\r\n"
+
+
+def test_permission_required(summaries, client):
+    assert _export(client, "dailysummary").status_code == 403
+    client.force_login(User.objects.create_user("visitor"))
+    assert _export(client, "dailysummary").status_code == 403
+
+
+def test_unknown(db, analyst, client):
+    assert _export(client, "system").status_code == 404
+    assert _export(client, "dailysummary", format="xlsx").status_code == 400
+
+
+def test_async_view(summaries, analyst, client, async_rf):
+    request = async_rf.get("/", {"format": "parquet"})
+    request.COOKIES = {name: cookie.value for name, cookie in client.cookies.items()}
+    # The user is looked up from the session cookie, as in a deployment.
+    handler = SessionMiddleware(
+        AuthenticationMiddleware(
+            lambda request: async_views.export_view(request, table="xyversioncount")
+        )
+    )
+
+    async def _content():
+        response = await handler(request)
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    table = pyarrow.parquet.read_table(io.BytesIO(async_to_sync(_content)()))
+    assert table.num_rows == 6
+
+
+def test_command(summaries, tmp_path, capsys):
+    call_command("export", str(tmp_path), "--format", "parquet", "--start-date", "2024-01-03")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{table}.parquet" for table in export.TABLES
+    )
+    table = pyarrow.parquet.read_table(tmp_path / "xyversioncount.parquet")
+    assert table.column("count").to_pylist() == [3, 1]
+    assert f"Wrote {tmp_path / 'dailysummary.parquet'}" in capsys.readouterr().out
@@ -0,0 +1,35 @@
+import uuid
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from pulpanalytics.first_seen import FirstSeenCache, get_first_seen
+from pulpanalytics.models import SystemFirstSeen
+
+
+def test_cache_is_bounded():
+    cache = FirstSeenCache(maxsize=2)
+    now = timezone.now()
+    cache.set("a", now)
+    cache.set("b", now)
+    assert cache.get("a") == now
+    cache.set("c", now)
+
+    assert cache.get("a") == now
+    assert cache.get("b") is None
+    assert cache.get("c") == now
+
+
+def test_get_first_seen(db):
+    system_id = uuid.uuid4()
+    earlier = timezone.now() - timezone.timedelta(days=5)
+    now = timezone.now()
+
+    assert get_first_seen(system_id, earlier) == earlier
+    assert SystemFirstSeen.objects.get(system_id=system_id).first_seen == earlier
+    assert get_first_seen(system_id, now) == earlier
+
+    with CaptureQueriesContext(connection) as queries:
+        assert get_first_seen(system_id, now) == earlier
+    assert len(queries) == 0
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.utils import timezone
+
+from pulpanalytics.models import Component, System
+from pulpanalytics.partitions import day_bounds, ensure_partitions, partition_days, partition_name
+
+SYSTEM_ID = "00000000000000000000000000000000"
+
+
+def _partition_of(model, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT tableoid::regclass::text FROM {model._meta.db_table} WHERE id = %s", [pk]
+        )
+        return cursor.fetchone()[0]
+
+
+def test_checkin_goes_to_its_day(db):
+    system = System.objects.create(system_id=SYSTEM_ID, postgresql_version=0)
+    component = system.component_set.create(name="core", version="3.28.1")
+    day = system.created.date()
+
+    assert component.created == system.created
+    assert _partition_of(System, system.pk) == partition_name("pulpanalytics_system", day)
+    assert _partition_of(Component, component.pk) == partition_name("pulpanalytics_component", day)
+
+
+@pytest.mark.parametrize("days", [0, 30])
+def test_one_checkin_per_day(yesterday, db, days):
+    # 30 days ago has no partition of its own, the default partition enforces the rule there.
+    with yesterday(days):
+        System.objects.create(system_id=SYSTEM_ID, postgresql_version=0)
+        with pytest.raises(IntegrityError):
+            System.objects.create(system_id=SYSTEM_ID, postgresql_version=0)
+
+
+def test_ensure_partitions_moves_rows(old_system, db):
+    system = old_system(30)
+    component = system.component_set.first()
+    day = system.created.date()
+    assert _partition_of(System, system.pk) == "pulpanalytics_system_default"
+
+    ensure_partitions(day, day + timedelta(days=1))
+
+    assert day in partition_days("pulpanalytics_system")
+    assert _partition_of(System, system.pk) == partition_name("pulpanalytics_system", day)
+    assert _partition_of(Component, component.pk) == partition_name("pulpanalytics_component", day)
+
+
+def test_summarize_drops_old_partitions(old_system, db):
+    old_system(30)
+
+    call_command("summarize")
+
+    assert not System.objects.exists()
+    assert not Component.objects.exists()
+    today = timezone.now().date()
+    assert today + timedelta(days=7) in partition_days("pulpanalytics_system")
+
+
+def test_summary_reads_one_partition(db):
+    start, end = day_bounds(timezone.now().date())
+    plan = System.objects.filter(created__gte=start, created__lt=end).explain()
+
+    assert partition_name("pulpanalytics_system", start.date()) in plan
+    assert "pulpanalytics_system_default" not in plan
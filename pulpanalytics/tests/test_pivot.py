@@ -0,0 +1,36 @@
+from datetime import date
+
+from pulpanalytics.pivot import pivot, power_of_two_bucket
+
+DAY1 = date(2024, 1, 1)
+DAY2 = date(2024, 1, 2)
+DAY3 = date(2024, 1, 3)
+
+
+def test_pivot_fills_missing_days():
+    rows = [(DAY1, "a", 1), (DAY2, "b", 2), (DAY3, "a", 3)]
+
+    assert pivot(rows) == ([DAY1, DAY2, DAY3], {"a": [1, 0, 3], "b": [0, 2, 0]})
+
+
+def test_pivot_adds_up_mapped_keys():
+    rows = [(DAY1, 3, 1), (DAY1, 4, 2), (DAY1, 5, 4), (DAY2, 0, 1.5)]
+
+    labels, series = pivot(iter(rows), power_of_two_bucket)
+
+    assert labels == [DAY1, DAY2]
+    assert series == {4: [3, 0], 8: [4, 0], 0: [0, 1.5]}
+
+
+def test_pivot_single_pass():
+    rows = [(DAY1, "a", 1), (DAY2, "a", 2), (DAY3, "b", 3)]
+
+    assert pivot(iter(rows)) == ([DAY1, DAY2, DAY3], {"a": [1, 2, 0], "b": [0, 0, 3]})
+
+
+def test_pivot_empty():
+    assert pivot([]) == ([], {})
+
+
+def test_power_of_two_bucket():
+    assert [power_of_two_bucket(value) for value in range(10)] == [0, 1, 2, 4, 4, 8, 8, 8, 8, 16]
@@ -2,7 +2,7 @@ import pytest
 from django.urls import reverse
 
 from pulpanalytics.analytics_pb2 import Analytics
-from pulpanalytics.models import Component, System
+from pulpanalytics.models import Component, System, SystemFirstSeen
 
 SYSTEM_ID = "00000000000000000000000000000000"
 
@@ -13,6 +13,12 @@ def collect_dev_systems(request, settings):
     return request.param
 
 
+@pytest.fixture(params=["orm", "statement"], autouse=True)
+def ingest_mode(request, settings):
+    settings.INGEST_MODE = request.param
+    return request.param
+
+
 def test_system_reports_twice(yesterday, db, client):
     analytics = Analytics()
     analytics.system_id = SYSTEM_ID
@@ -115,3 +121,59 @@ def test_collect_system_with_services(db, client):
     assert system.content_app_hosts == 2
     assert system.worker_processes == 3
     assert system.worker_hosts == 4
+
+
+def test_first_seen_is_kept(yesterday, db, client):
+    analytics = Analytics()
+    analytics.system_id = SYSTEM_ID
+
+    with yesterday(days=3):
+        response = client.post(
+            reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+        )
+    assert response.status_code == 200, response.status_code
+
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200, response.status_code
+
+    first, second = System.objects.filter(system_id=SYSTEM_ID).order_by("created")
+    assert second.first_seen == first.first_seen == first.created
+    assert (second.created - second.first_seen).days == 3
+    assert SystemFirstSeen.objects.get(system_id=SYSTEM_ID).first_seen == first.created
+
+
+def test_first_seen_survives_cleanup(yesterday, db, client):
+    analytics = Analytics()
+    analytics.system_id = SYSTEM_ID
+
+    with yesterday(days=30):
+        response = client.post(
+            reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+        )
+    assert response.status_code == 200, response.status_code
+    System.objects.all().delete()
+
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200, response.status_code
+
+    system = System.objects.get(system_id=SYSTEM_ID)
+    assert (system.created - system.first_seen).days == 30
+
+
+def test_duplicate_component_is_dropped(db, client):
+    analytics = Analytics()
+    analytics.system_id = SYSTEM_ID
+    analytics.components.add(name="comp1", version="1.2.3")
+    analytics.components.add(name="comp1", version="1.2.4")
+
+    response = client.post(
+        reverse("pulpanalytics:index"), analytics.SerializeToString(), "application/octets"
+    )
+    assert response.status_code == 200, response.status_code
+
+    assert System.objects.filter(system_id=SYSTEM_ID).count() == 0
+    assert Component.objects.count() == 0
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from pulpanalytics.models import Component, DailySummary, System
+from pulpanalytics.partitions import ensure_partitions, partition_days
+from pulpanalytics.retention import purge_checkins
+
+
+def test_purge_checkins(old_system, db):
+    in_partition = old_system(31)
+    in_default = old_system(30)
+    ensure_partitions(in_partition.created.date(), in_partition.created.date() + timedelta(days=1))
+    kept = old_system(1)
+
+    result = purge_checkins(in_default.created.date() + timedelta(days=1))
+
+    assert result.days == [in_partition.created.date()]
+    # The rows of the dropped partition count as well.
+    assert (result.systems, result.components, result.finished) == (2, 4, True)
+    assert in_partition.created.date() not in partition_days("pulpanalytics_system")
+    assert list(System.objects.values_list("pk", flat=True)) == [kept.pk]
+    assert set(Component.objects.values_list("system", flat=True)) == {kept.pk}
+
+
+def test_purge_checkins_in_chunks(old_system, db):
+    for _ in range(5):
+        old_system(30)
+
+    result = purge_checkins(timezone.now().date(), chunk_size=2)
+
+    assert (result.systems, result.components, result.finished) == (5, 10, True)
+    assert not System.objects.exists()
+    assert not Component.objects.exists()
+
+
+def test_purge_checkins_time_budget(old_system, db):
+    old_system(30)
+
+    result = purge_checkins(timezone.now().date(), time_budget=0)
+
+    assert (result.systems, result.finished) == (0, False)
+    assert System.objects.count() == 1
+
+
+def _summarized(days):
+    DailySummary.objects.create(date=timezone.now().date() - timedelta(days=days))
+
+
+def test_purge_checkins_dry_run(old_system, db, capsys):
+    _summarized(1)
+    old_system(30)
+    old_system(5)
+
+    call_command("purge_checkins", "--dry-run")
+
+    assert "delete 1 Systems and 2 Components" in capsys.readouterr().out
+    assert System.objects.count() == 2
+
+
+def test_purge_checkins_command(old_system, db, capsys):
+    _summarized(1)
+    old_system(30)
+    old_system(20)
+
+    call_command("purge_checkins", "--days", "25", "--sleep", "0")
+
+    assert "deleted 1 Systems and 2 Components" in capsys.readouterr().out
+    assert System.objects.count() == 1
+
+
+def test_purge_checkins_keeps_unsummarized(old_system, db, capsys):
+    _summarized(26)
+    old_system(30)
+    not_summarized = old_system(20)
+
+    call_command("purge_checkins", "--days", "14", "--sleep", "0")
+
+    assert "they are not summarized yet" in capsys.readouterr().out
+    assert list(System.objects.values_list("pk", flat=True)) == [not_summarized.pk]
+
+
+def test_purge_checkins_without_summaries(old_system, db):
+    old_system(30)
+
+    with pytest.raises(CommandError):
+        call_command("purge_checkins", "--sleep", "0")
+    assert System.objects.count() == 1
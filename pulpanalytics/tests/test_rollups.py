@@ -0,0 +1,148 @@
+import uuid
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics.models import DailySummary, Rollup, System
+from pulpanalytics.rollups import period_bounds, update_rollups
+
+MONDAY = date(2024, 1, 29)
+
+
+@pytest.mark.parametrize(
+    "day,resolution,bounds",
+    [
+        (date(2024, 1, 29), "week", (date(2024, 1, 29), date(2024, 2, 5))),
+        (date(2024, 2, 4), "week", (date(2024, 1, 29), date(2024, 2, 5))),
+        (date(2024, 1, 31), "month", (date(2024, 1, 1), date(2024, 2, 1))),
+        (date(2024, 12, 1), "month", (date(2024, 12, 1), date(2025, 1, 1))),
+    ],
+)
+def test_period_bounds(day, resolution, bounds):
+    assert period_bounds(day, resolution) == bounds
+
+
+def _summaries(*counts):
+    days = []
+    for index, count in enumerate(counts):
+        daily_summary = DailySummary.objects.create(date=MONDAY + timezone.timedelta(days=index))
+        daily_summary.xyversioncount_set.create(name="core", version="3.28", count=count)
+        daily_summary.agecount_set.create(age=index, count=count)
+        daily_summary.numbercount_set.create(name="users", number=1, count=count)
+        days.append(daily_summary.date)
+    return days
+
+
+def test_update_rollups(db):
+    update_rollups(_summaries(3, 6, 9, 12))
+
+    week = Rollup.objects.get(resolution="week")
+    assert (week.period, week.days) == (MONDAY, 4)
+    assert week.xyversionrollup_set.get().count == 7.5
+    assert week.numberrollup_set.get().count == 7.5
+    ages = week.agerollup_set.order_by("age").values_list("count", flat=True)
+    assert list(ages) == [0.75, 1.5, 2.25, 3.0]
+    # January 29 to 31 are in one month, February 1 in the next.
+    months = Rollup.objects.filter(resolution="month").order_by("period")
+    assert list(months.values_list("days", flat=True)) == [3, 1]
+
+
+def test_update_rollups_replaces(db):
+    update_rollups(_summaries(2))
+    daily_summary = DailySummary.objects.create(date=MONDAY + timezone.timedelta(days=1))
+    daily_summary.xyversioncount_set.create(name="core", version="3.28", count=4)
+
+    update_rollups([MONDAY])
+
+    week = Rollup.objects.get(resolution="week")
+    assert week.days == 2
+    assert week.xyversionrollup_set.get().count == 3.0
+
+
+def test_summarize_updates_rollups(yesterday, db):
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+
+    call_command("summarize")
+
+    day = (timezone.now() - timezone.timedelta(days=1)).date()
+    assert Rollup.objects.filter(period=period_bounds(day, "week")[0], days=1).exists()
+    assert Rollup.objects.filter(period=period_bounds(day, "month")[0], days=1).exists()
+
+
+def test_backfill_rolls_up_old_summaries(db):
+    _summaries(2, 4)
+
+    call_command("summarize", "--backfill", str(MONDAY), str(MONDAY))
+
+    assert Rollup.objects.get(resolution="week").days == 2
+
+
+@pytest.mark.parametrize("resolution", ["week", "month"])
+def test_plugin_stats_resolution(db, client, resolution):
+    update_rollups(_summaries(3, 6, 9, 12))
+
+    response = client.get(
+        reverse("pulpanalytics:plugin_stats", kwargs={"plugin": "core"}),
+        {"resolution": resolution, "start_date": "2024-01-01"},
+    )
+
+    assert response.status_code == 200
+    labels = ["2024-01-29"] if resolution == "week" else ["2024-01-01", "2024-02-01"]
+    data = [7.5] if resolution == "week" else [6.0, 12.0]
+    assert response.json() == {
+        "labels": labels,
+        "datasets": [{"data": data, "fill": "origin", "label": "3.28"}],
+    }
+
+
+@pytest.mark.parametrize(
+    "resolution,start_date,labels",
+    [
+        ("week", "2024-01-31", ["2024-01-29"]),
+        ("month", "2024-01-30", ["2024-01-01", "2024-02-01"]),
+        ("month", "2024-02-01", ["2024-02-01"]),
+    ],
+)
+def test_resolution_start_date_within_period(db, client, resolution, start_date, labels):
+    update_rollups(_summaries(3, 6, 9, 12))
+
+    response = client.get(
+        reverse("pulpanalytics:plugin_stats", kwargs={"plugin": "core"}),
+        {"resolution": resolution, "start_date": start_date},
+    )
+
+    assert response.json()["labels"] == labels
+
+
+def test_rbac_stats_resolution(db, client):
+    update_rollups(_summaries(3, 6, 9, 12))
+
+    response = client.get(
+        reverse("pulpanalytics:rbac_stats", kwargs={"measure": "users"}), {"resolution": "week"}
+    )
+
+    assert response.json() == {
+        "labels": ["2024-01-29"],
+        "datasets": [{"data": [7.5], "fill": "origin", "label": "1"}],
+    }
+
+
+def test_systems_by_age_resolution(db, client):
+    update_rollups(_summaries(3, 6, 9, 12))
+
+    response = client.get(
+        reverse("pulpanalytics:systems_by_age"), {"resolution": "month", "end_date": "2024-01-31"}
+    )
+
+    assert response.json()["labels"] == ["2024-01-01"]
+    assert [dataset["data"] for dataset in response.json()["datasets"]] == [[3.0], [2.0], [1.0]]
+
+
+def test_unknown_resolution(db, client):
+    response = client.get(reverse("pulpanalytics:systems_by_age"), {"resolution": "year"})
+
+    assert response.status_code == 400
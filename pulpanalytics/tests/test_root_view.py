@@ -1,6 +1,11 @@
+import json
+import re
+
 from django.urls import reverse
+from django.utils import timezone
 
-from pulpanalytics.views import RootView
+from pulpanalytics.models import DailySummary
+from pulpanalytics.views import RootView, _get_git_revision
 
 
 def test_empty_summary(db, rf):
@@ -10,3 +15,52 @@ def test_empty_summary(db, rf):
     assert response.status_code == 200, response.status_code
     assert b"<title>" in response.content
     assert b'<meta name="revision"' in response.content
+
+
+def test_revision_outside_checkout(settings, tmp_path):
+    settings.BASE_DIR = tmp_path
+    settings.GIT_REVISION = "0123abc"
+    _get_git_revision.cache_clear()
+    try:
+        assert _get_git_revision() == "0123abc"
+    finally:
+        _get_git_revision.cache_clear()
+
+
+def _inlined_dashboard(response):
+    content = response.content.decode()
+    match = re.search(
+        r'<script id="dashboard-data" type="application/json">(.*?)</script>', content
+    )
+    return match and json.loads(match[1])
+
+
+def test_dashboard_not_inlined(db, client):
+    assert _inlined_dashboard(client.get(reverse("pulpanalytics:index"))) is None
+
+
+def test_inline_dashboard(db, client, settings, django_assert_num_queries):
+    settings.INLINE_DASHBOARD = True
+    daily_summary = DailySummary.objects.create(date=timezone.now().date())
+    daily_summary.xyversioncount_set.create(name="core", version="3.28", count=1)
+
+    first = client.get(reverse("pulpanalytics:index"))
+    # The cached page only needs the summary state.
+    with django_assert_num_queries(1):
+        second = client.get(reverse("pulpanalytics:index"))
+
+    dashboard = client.get(reverse("pulpanalytics:dashboard")).json()
+    assert _inlined_dashboard(first) == dashboard
+    assert second.content == first.content
+
+
+def test_new_summary_renders_again(db, client, settings, django_capture_on_commit_callbacks):
+    settings.INLINE_DASHBOARD = True
+    client.get(reverse("pulpanalytics:index"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        daily_summary = DailySummary.objects.create(date=timezone.now().date())
+        daily_summary.xyversioncount_set.create(name="core", version="3.28", count=1)
+
+    dashboard = _inlined_dashboard(client.get(reverse("pulpanalytics:index")))
+    assert dashboard["core-versions"]["labels"] == [str(timezone.now().date())]
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics.models import Component, DailySummary, DistinctSystemsSketch, System
+from pulpanalytics.sketches import REGISTERS, HyperLogLog
+
+
+def _checkins(system_ids, names):
+    now = timezone.now()
+    systems = System.objects.bulk_create(
+        System(system_id=system_id, first_seen=now) for system_id in system_ids
+    )
+    Component.objects.bulk_create(
+        Component(system=system, created=system.created, name=name, version="1.0.0")
+        for system in systems
+        for name in names
+    )
+
+
+def test_hyperloglog_empty():
+    assert HyperLogLog().count() == 0
+
+
+def test_hyperloglog_merge():
+    sketch = HyperLogLog()
+    sketch.set(0, 3)
+    other = HyperLogLog()
+    other.set(0, 1)
+    other.set(1, 2)
+
+    sketch.merge(other)
+
+    assert list(sketch.registers[:3]) == [3, 2, 0]
+    assert len(sketch.registers) == REGISTERS
+
+
+def test_distinct_systems(yesterday, db, client, settings):
+    settings.PERSISTENT_MIN_AGE_DAYS = 0
+    system_ids = [uuid.uuid4() for _ in range(2000)]
+    with yesterday(2):
+        _checkins(system_ids[:1500], ["core"])
+    with yesterday():
+        _checkins(system_ids[1000:1500], ["core", "file"])
+        _checkins(system_ids[1500:], ["file"])
+        System.objects.create(system_id=uuid.uuid4())
+    call_command("summarize")
+
+    response = client.get(reverse("pulpanalytics:distinct_systems"))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["days"] == 2
+    assert data["systems"] == pytest.approx(2001, rel=0.05)
+    assert data["components"].keys() == {"core", "file"}
+    assert data["components"]["core"] == pytest.approx(1500, rel=0.05)
+    assert data["components"]["file"] == pytest.approx(1000, rel=0.05)
+
+
+def test_distinct_systems_range(db, client):
+    today = timezone.now().date()
+    for days in [1, 40]:
+        daily_summary = DailySummary.objects.create(date=today - timezone.timedelta(days=days))
+        sketch = HyperLogLog()
+        sketch.set(days, 1)
+        DistinctSystemsSketch.objects.create(
+            summary=daily_summary, name="", registers=sketch.registers
+        )
+
+    recent = client.get(reverse("pulpanalytics:distinct_systems")).json()
+    everything = client.get(
+        reverse("pulpanalytics:distinct_systems"), {"start_date": "2000-01-01"}
+    ).json()
+
+    assert recent == {"days": 1, "systems": 1, "components": {}}
+    assert everything == {"days": 2, "systems": 2, "components": {}}
+
+
+def test_distinct_systems_empty(db, client):
+    response = client.get(reverse("pulpanalytics:distinct_systems"))
+
+    assert response.json() == {"days": 0, "systems": 0, "components": {}}
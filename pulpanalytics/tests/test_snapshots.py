@@ -0,0 +1,74 @@
+import gzip
+import re
+import uuid
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from pulpanalytics.chart_cache import chart_cache
+from pulpanalytics.models import ChartSnapshot, DailySummary, System
+from pulpanalytics.snapshots import DASHBOARD_URLS, write_snapshots
+
+DASHBOARD = "/dashboard/"
+
+
+def _summary():
+    daily_summary = DailySummary.objects.create(date=timezone.now().date())
+    daily_summary.xyversioncount_set.create(name="core", version="3.28", count=1)
+
+
+def _replace_snapshot(url, content):
+    ChartSnapshot.objects.filter(url=url).update(content=gzip.compress(content))
+
+
+def test_dashboard_urls(db, client):
+    index = client.get(reverse("pulpanalytics:index")).content.decode()
+
+    assert sorted(re.findall(r"fetch\('([^']+)'\)", index)) == sorted(DASHBOARD_URLS)
+
+
+def test_summarize_writes_snapshots(yesterday, db, capsys):
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=0)
+
+    call_command("summarize")
+
+    assert f"Wrote {len(DASHBOARD_URLS)} chart snapshots" in capsys.readouterr().out
+    assert ChartSnapshot.objects.count() == len(DASHBOARD_URLS)
+
+
+def test_snapshot_is_live_response(db, client):
+    _summary()
+    live = client.get(DASHBOARD).content
+
+    write_snapshots()
+
+    assert gzip.decompress(ChartSnapshot.objects.get(url=DASHBOARD).content) == live
+
+
+def test_snapshot_served(db, client, django_assert_num_queries):
+    _summary()
+    write_snapshots()
+    _replace_snapshot(DASHBOARD, b'{"snapshot": true}')
+
+    # The summary state and the snapshot are read, nothing is aggregated.
+    with django_assert_num_queries(2):
+        response = client.get(DASHBOARD)
+
+    assert response.json() == {"snapshot": True}
+    assert client.get(DASHBOARD, {"start_date": "2024-01-01"}).json() != {"snapshot": True}
+    stats = chart_cache.stats()
+    assert (stats["hits"], stats["snapshot_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_outdated_snapshot_not_served(db, client, django_capture_on_commit_callbacks):
+    write_snapshots()
+    _replace_snapshot(DASHBOARD, b'{"snapshot": true}')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _summary()
+    chart_cache.clear()
+
+    labels = client.get(DASHBOARD).json()["core-versions"]["labels"]
+    assert labels == [str(timezone.now().date())]
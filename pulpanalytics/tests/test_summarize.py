@@ -1,9 +1,10 @@
 import uuid
 
 import pytest
-from django.core.management import call_command
+from django.core.management import CommandError, call_command
 from django.utils import timezone
 
+from pulpanalytics.management.commands.summarize import Command
 from pulpanalytics.models import DailySummary, System
 
 SYSTEM_ID = "00000000000000000000000000000000"
@@ -224,3 +225,109 @@ def test_summary_rbac(yesterday, db):
         {"number": 4, "count": 1},
         {"number": 5, "count": 1},
     ]
+
+
+def test_summary_component_queries(yesterday, db, django_assert_num_queries):
+    with yesterday():
+        for index in range(5):
+            system = System.objects.create(system_id=uuid.uuid4())
+            system.component_set.create(name=f"plugin{index}", version=f"{index}.0.0")
+            system.component_set.create(name="core", version=f"3.{index}.0")
+    daily_summary = DailySummary.objects.create(date=timezone.now() - timezone.timedelta(days=1))
+
+    # One aggregation and one insert per count table, however many plugins there are.
+    with django_assert_num_queries(3):
+        Command._handle_components(System.objects.all(), daily_summary)
+
+    assert daily_summary.xyversioncount_set.count() == 10
+    assert daily_summary.xyzversioncount_set.count() == 10
+
+
+def test_summary_system_stats_queries(yesterday, db, django_assert_num_queries):
+    with yesterday():
+        for index in range(5):
+            System.objects.create(
+                system_id=uuid.uuid4(), postgresql_version=index, users=index, worker_hosts=index
+            )
+    daily_summary = DailySummary.objects.create(date=timezone.now() - timezone.timedelta(days=1))
+
+    # One scan for all histograms and averages, then one insert per table.
+    with django_assert_num_queries(4):
+        Command._handle_system_stats(System.objects.all(), daily_summary)
+
+    assert daily_summary.postgresversioncount_set.count() == 5
+    assert daily_summary.numbercount_set.filter(name="users").count() == 5
+    assert not daily_summary.numbercount_set.filter(name="groups").exists()
+    assert daily_summary.deploymentstats.online_worker_hosts_avg == 2.0
+
+
+def _backfill(*args, days=1):
+    day = (timezone.now() - timezone.timedelta(days=1)).date()
+    start = day - timezone.timedelta(days=days - 1)
+    call_command("summarize", "--backfill", str(start), str(day), *args)
+    return DailySummary.objects.get(date=day)
+
+
+def test_backfill_replaces_summary(yesterday, db, capsys):
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+    call_command("summarize")
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+
+    daily_summary = _backfill()
+
+    assert daily_summary.postgresversioncount_set.get().count == 2
+    assert "Summarized 1 days" in capsys.readouterr().out
+
+
+def test_backfill_jobs(yesterday, transactional_db):
+    with yesterday(2):
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=140000)
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+    call_command("summarize")
+    with yesterday(2):
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=140000)
+
+    daily_summary = _backfill("--jobs", "2", days=2)
+
+    assert daily_summary.postgresversioncount_set.get().version == 150000
+    assert DailySummary.objects.count() == 2
+    assert DailySummary.objects.earliest("date").postgresversioncount_set.get().count == 2
+
+
+def test_backfill_keeps_summary_without_checkins(yesterday, db, capsys):
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+    call_command("summarize")
+    System.objects.all().delete()
+
+    daily_summary = _backfill()
+
+    assert daily_summary.postgresversioncount_set.get().count == 1
+    assert "check-ins are gone" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("summarized", [True, False])
+def test_backfill_stops_at_latest_summary(yesterday, db, summarized):
+    with yesterday():
+        System.objects.create(system_id=uuid.uuid4(), postgresql_version=150000)
+    if summarized:
+        DailySummary.objects.create(date=(timezone.now() - timezone.timedelta(days=2)).date())
+
+    with pytest.raises(CommandError):
+        _backfill()
+    assert DailySummary.objects.count() == summarized
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1"])
+def test_backfill_jobs_must_be_positive(db, jobs):
+    with pytest.raises(CommandError, match="--jobs"):
+        _backfill("--jobs", jobs)
+
+
+def test_backfill_stops_before_today(db):
+    today = str(timezone.now().date())
+    with pytest.raises(CommandError):
+        call_command("summarize", "--backfill", today, today)
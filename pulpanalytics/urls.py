@@ -1,22 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
-from pulpanalytics.views import (
-    RootView,
-    demography_view,
-    deployment_stats_view,
-    plugin_stats_view,
-    postgresql_versions_view,
-    rbac_stats_view,
-    systems_by_age_view,
-)
+from pulpanalytics import async_views
+from pulpanalytics import views as sync_views
+
+views = async_views if settings.ASYNC_VIEWS else sync_views
 
 app_name = "pulpanalytics"
 urlpatterns = [
-    path("", RootView.as_view(), name="index"),
-    path("deployment_stats/<str:component>/", deployment_stats_view, name="deployment_stats"),
-    path("plugin_stats/<str:plugin>/", plugin_stats_view, name="plugin_stats"),
-    path("postgresql_versions/", postgresql_versions_view, name="postgresql_versions"),
-    path("demography/", demography_view, name="demography"),
-    path("systems_by_age/", systems_by_age_view, name="systems_by_age"),
-    path("rbac_stats/<str:measure>/", rbac_stats_view, name="rbac_stats"),
+    path("", views.RootView.as_view(), name="index"),
+    path("batch/", views.batch_view, name="batch"),
+    path("deployment_stats/<str:component>/", views.deployment_stats_view, name="deployment_stats"),
+    path("plugin_stats/<str:plugin>/", views.plugin_stats_view, name="plugin_stats"),
+    path("postgresql_versions/", views.postgresql_versions_view, name="postgresql_versions"),
+    path("demography/", views.demography_view, name="demography"),
+    path("distinct_systems/", views.distinct_systems_view, name="distinct_systems"),
+    path("plugin_systems/", views.plugin_systems_view, name="plugin_systems"),
+    path("plugin_cooccurrence/", views.plugin_cooccurrence_view, name="plugin_cooccurrence"),
+    path("systems_by_age/", views.systems_by_age_view, name="systems_by_age"),
+    path("rbac_stats/<str:measure>/", views.rbac_stats_view, name="rbac_stats"),
+    path("dashboard/", views.dashboard_view, name="dashboard"),
+    path("export/<str:table>/", views.export_view, name="export"),
+    path("runtime_stats/", views.runtime_stats_view, name="runtime_stats"),
 ]
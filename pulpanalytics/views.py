@@ -1,34 +1,64 @@
-import logging
+import json
 from collections import defaultdict
 from contextlib import suppress
+from datetime import timedelta
 from functools import lru_cache
 from itertools import accumulate
 
 from django.conf import settings
-from django.db import IntegrityError, transaction
-from django.http import Http404, HttpResponse, JsonResponse
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.db.models import F, Q
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.template import loader
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET
-from git import Repo
+from django.views.decorators.http import require_GET, require_POST
+from git import GitError, Repo
 from packaging.version import parse as parse_version
 
+from pulpanalytics import columnar, export
 from pulpanalytics.analytics_pb2 import Analytics
+from pulpanalytics.bitmaps import combine
+from pulpanalytics.buffer import checkin_buffer
+from pulpanalytics.chart_cache import cached_chart, chart_cache, state_queryset
+from pulpanalytics.dedup import duplicate_filter
+from pulpanalytics.encoding import BodyDecodingError, decoded_body, decoded_stream
+from pulpanalytics.ingest import (
+    LogAndDropData,
+    MalformedBatch,
+    save_batch,
+    save_checkin,
+    validate_checkin,
+)
 from pulpanalytics.models import (
     AgeCount,
-    Component,
+    AgeRollup,
+    CooccurrenceCount,
     DailySummary,
     DeploymentStats,
+    DistinctSystemsSketch,
     NumberCount,
-    System,
+    NumberRollup,
+    PostgresVersionCount,
+    SystemBitmap,
     XYVersionCount,
+    XYVersionRollup,
     XYZVersionCount,
+    XYZVersionRollup,
 )
-
-logger = logging.getLogger(__name__)
-
+from pulpanalytics.pivot import pivot, power_of_two_bucket
+from pulpanalytics.rollups import RESOLUTIONS, ROLLED_UP, period_bounds
+from pulpanalytics.sketches import HyperLogLog
 
 PLUGINS = [
     "ansible",
@@ -47,140 +77,136 @@ PLUGINS = [
 ]
 
 
-class LogAndDropData(IntegrityError):
-    def __init__(self, msg):
-        logger.error(msg)
-        super().__init__(msg)
-
-
 @lru_cache(maxsize=1)
 def _get_git_revision():
-    return Repo().commit().hexsha
-
-
-def _check_component_version(version):
-    if not version.count(".") == 2:
-        raise LogAndDropData(f"The version string {version} does not have two periods.")
+    try:
+        return Repo(settings.BASE_DIR).commit().hexsha
+    except (GitError, ValueError):
+        # Deployed without the checkout, or from one without any commit.
+        return settings.GIT_REVISION
 
-    x, y, z = version.split(".")
-    for item in [x, y, z]:
-        if not item.isdigit():
-            raise LogAndDropData(f"The version string {version} does not only contain numbers.")
 
+DISTINCT_DAYS = 30
 
-def _save_components(system, analytics):
-    components = []
-    for component in analytics.components:
-        if not settings.COLLECT_DEV_SYSTEMS:
-            _check_component_version(component.version)
-        components.append(Component(system=system, name=component.name, version=component.version))
-    Component.objects.bulk_create(components)
+RBAC_MEASURES = ["users", "groups", "domains", "custom_access_policies", "custom_roles"]
+# The first days the dashboard shows systems by age and RBAC stats for.
+DASHBOARD_AGES_SINCE = parse_date("2022-10-16")
+DASHBOARD_RBAC_SINCE = parse_date("2023-03-10")
 
 
-@require_GET
-def postgresql_versions_view(request):
+def _latest_summary_queryset(request):
     date = request.GET.get("date")
     qs = DailySummary.objects.order_by("date")
     if date is not None:
         qs = qs.filter(date__lte=date)
-    daily_summary = qs.prefetch_related("postgresversioncount_set").last()
-    if daily_summary is None:
-        return JsonResponse({})
-    data = daily_summary.postgresversioncount_set.order_by("version")
-    labels = [item.pretty_version for item in data]
-    datasets = [{"data": [item.count for item in data]}]
-    return JsonResponse({"labels": labels, "datasets": datasets})
+    return qs
 
 
-@require_GET
-def deployment_stats_view(request, component):
-    if component not in ["worker", "content_app"]:
-        raise Http404("Not found")
+def _resolution_queryset(request, daily_model, rollup_model):
+    """Return the rows of `daily_model`, or of `rollup_model` for `?resolution=week|month`.
 
+    Rollup rows carry the first day of their period as `summary_id`, like the daily rows.
+    """
+    resolution = request.GET.get("resolution", "day")
+    if resolution == "day":
+        return daily_model.objects.order_by("summary_id")
+    if resolution not in RESOLUTIONS:
+        raise BadRequest(f"Unknown resolution {resolution}.")
+    qs = rollup_model.objects.filter(rollup__resolution=resolution).order_by("rollup__period")
+    return qs.annotate(summary_id=F("rollup__period"))
+
+
+def _date_range(qs, request, field="summary_id"):
     start_date = request.GET.get("start_date")
     end_date = request.GET.get("end_date")
-    qs = DeploymentStats.objects.order_by("summary_id")
     if start_date is not None:
-        qs = qs.filter(summary_id__gte=start_date)
+        if qs.model in ROLLED_UP:
+            # A rollup covers its whole period, keep the one `start_date` falls within.
+            day = parse_date(start_date)
+            if day is None:
+                raise BadRequest(f"Invalid start_date {start_date}.")
+            start_date = period_bounds(day, request.GET["resolution"])[0]
+        qs = qs.filter(**{f"{field}__gte": start_date})
     if end_date is not None:
-        qs = qs.filter(summary_id__lte=end_date)
-    labels = list(qs.values_list("summary_id", flat=True))
+        qs = qs.filter(**{f"{field}__lte": end_date})
+    return qs
+
+
+def _series_response(request, data, to_columnar=columnar.series):
+    """Respond with `data` for Chart.js, or in its compact form for `?format=columnar`."""
+    chart_format = request.GET.get("format", "chartjs")
+    if chart_format == "columnar":
+        return columnar.response(to_columnar(data))
+    if chart_format != "chartjs":
+        raise BadRequest(f"Unknown format {chart_format}.")
+    return JsonResponse(data)
+
+
+def _postgresql_versions_data(daily_summary, items):
+    if daily_summary is None:
+        return {}
+    labels = [item.pretty_version for item in items]
+    datasets = [{"data": [item.count for item in items]}]
+    return {"labels": labels, "datasets": datasets}
+
+
+def _deployment_stats_queryset(request, component):
+    if component not in ["worker", "content_app"]:
+        raise Http404("Not found")
+
+    qs = _date_range(DeploymentStats.objects.order_by("summary_id"), request)
+    return qs.values_list(
+        "summary_id", f"online_{component}_processes_avg", f"online_{component}_hosts_avg"
+    )
+
+
+def _deployment_stats_data(rows):
+    labels, processes, hosts = (list(column) for column in zip(*rows)) if rows else ([], [], [])
     datasets = [
-        {
-            "label": "Mean Processes",
-            "data": list(qs.values_list(f"online_{component}_processes_avg", flat=True)),
-        },
-        {
-            "label": "Mean Hosts",
-            "data": list(qs.values_list(f"online_{component}_hosts_avg", flat=True)),
-        },
+        {"label": "Mean Processes", "data": processes},
+        {"label": "Mean Hosts", "data": hosts},
     ]
-    return JsonResponse({"labels": labels, "datasets": datasets})
+    return {"labels": labels, "datasets": datasets}
 
 
-@require_GET
-def plugin_stats_view(request, plugin):
+def _plugin_stats_queryset(request, plugin):
     if plugin not in PLUGINS:
         raise Http404("Not found")
 
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-    z_stream = request.GET.get("z_stream")
-    labels = []
-    counts_lists = defaultdict(list)
-    version_count_class = XYZVersionCount if z_stream else XYVersionCount
-    qs = version_count_class.objects.filter(name=plugin).order_by("summary_id")
-    if start_date is not None:
-        qs = qs.filter(summary__gte=start_date)
-    if end_date is not None:
-        qs = qs.filter(summary__lte=end_date)
-    index = -1
-    date = None
-    for item in qs:
-        if item.summary_id != date:
-            index += 1
-            date = item.summary_id
-            labels.append(date)
-        counts_list = counts_lists[item.version]
-        while len(counts_list) <= index:
-            counts_list.append(0)
-        counts_list[index] += item.count
-    for counts_list in counts_lists.values():
-        while len(counts_list) <= index:
-            counts_list.append(0)
+    if request.GET.get("z_stream"):
+        qs = _resolution_queryset(request, XYZVersionCount, XYZVersionRollup)
+    else:
+        qs = _resolution_queryset(request, XYVersionCount, XYVersionRollup)
+    qs = _date_range(qs.filter(name=plugin), request)
+    return qs.values_list("summary_id", "version", "count")
+
+
+def _plugin_stats_data(rows):
+    labels, series = pivot(rows)
     datasets = [
-        {"label": key, "data": counts_lists[key], "fill": "-1"}
-        for key in sorted(counts_lists.keys(), key=parse_version, reverse=True)
+        {"label": key, "data": series[key], "fill": "-1"}
+        for key in sorted(series, key=parse_version, reverse=True)
     ]
     if datasets:
         datasets[0]["fill"] = "origin"
-    return JsonResponse({"labels": labels, "datasets": datasets})
+    return {"labels": labels, "datasets": datasets}
 
 
-@require_GET
-def demography_view(request):
+def _demography_data(rows):
     def _accumulator(prev, value):
         return value | {"count": prev["count"] + value["count"]}
 
-    date = request.GET.get("date")
-    ds_qs = DailySummary.objects.order_by("date")
-    if date is not None:
-        ds_qs = ds_qs.filter(date__lte=date)
-    daily_summary = ds_qs.last()
-    if daily_summary is None:
-        return JsonResponse({})
-    qs = daily_summary.agecount_set.order_by("-age")
-    if not qs:
+    if not rows:
         # No data available
-        return JsonResponse({})
-    age = qs[0].age + 1
+        return {}
+    age = rows[0][0] + 1
     data = []
     # Fill the gaps and transform to dicts
-    for item in qs:
-        while age > item.age:
+    for row_age, count in rows:
+        while age > row_age:
             data.append({"age": age, "count": 0})
             age -= 1
-        data.append({"age": item.age, "count": item.count})
+        data.append({"age": row_age, "count": count})
         age -= 1
 
     datasets = [
@@ -202,138 +228,382 @@ def demography_view(request):
             "fill": True,
         },
     ]
-    return JsonResponse({"datasets": datasets})
+    return {"datasets": datasets}
 
 
-@require_GET
-def systems_by_age_view(request):
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-    bucket = request.GET.get("bucket")
-    labels = []
-    counts_lists = defaultdict(list)
-    qs = AgeCount.objects.order_by("summary_id")
-    if start_date is not None:
-        qs = qs.filter(summary__gte=start_date)
-    if end_date is not None:
-        qs = qs.filter(summary__lte=end_date)
-    index = -1
-    date = None
-    for item in qs:
-        if item.summary_id != date:
-            index += 1
-            date = item.summary_id
-            labels.append(date)
-        if bucket and item.age:
-            age = 1 << (item.age - 1).bit_length()
-        else:
-            age = item.age
-        counts_list = counts_lists[age]
-        while len(counts_list) <= index:
-            counts_list.append(0)
-        counts_list[index] += item.count
-    for counts_list in counts_lists.values():
-        while len(counts_list) <= index:
-            counts_list.append(0)
-    datasets = [
-        {"label": str(key), "data": counts_lists[key], "fill": "-1"}
-        for key in sorted(counts_lists.keys())
-    ]
+def _systems_by_age_queryset(request):
+    qs = _date_range(_resolution_queryset(request, AgeCount, AgeRollup), request)
+    return qs.values_list("summary_id", "age", "count")
+
+
+def _bucket_labels(datasets):
+    last_label = 0
+    for dataset in datasets:
+        label = int(dataset["label"])
+        if last_label < label:
+            dataset["label"] = f"{last_label}-{label}"
+        last_label = label + 1
+
+
+def _systems_by_age_data(rows, bucket):
+    labels, series = pivot(rows, power_of_two_bucket if bucket else None)
+    datasets = [{"label": str(key), "data": series[key], "fill": "-1"} for key in sorted(series)]
     if bucket:
-        last_label = 0
-        for dataset in datasets:
-            label = int(dataset["label"])
-            if last_label < label:
-                dataset["label"] = f"{last_label}-{label}"
-            last_label = label + 1
+        _bucket_labels(datasets)
 
     datasets.reverse()
     if datasets:
         datasets[0]["fill"] = "origin"
-    return JsonResponse({"labels": labels, "datasets": datasets})
+    return {"labels": labels, "datasets": datasets}
 
 
-@require_GET
-def rbac_stats_view(request, measure):
-    if measure not in ["users", "groups", "domains", "custom_access_policies", "custom_roles"]:
+def _rbac_stats_queryset(request, measure):
+    if measure not in RBAC_MEASURES:
         raise Http404("Not found")
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-    bucket = request.GET.get("bucket")
-    labels = []
-    counts_lists = defaultdict(list)
-    qs = NumberCount.objects.filter(name=measure).order_by("summary_id")
-    if start_date is not None:
-        qs = qs.filter(summary_id__gte=start_date)
-    if end_date is not None:
-        qs = qs.filter(summary_id__lte=end_date)
-    index = -1
-    date = None
-    for item in qs:
-        if item.summary_id != date:
-            index += 1
-            date = item.summary_id
-            labels.append(date)
-        if bucket and item.number:
-            number = 1 << (item.number - 1).bit_length()
-        else:
-            number = item.number
-        counts_list = counts_lists[number]
-        while len(counts_list) <= index:
-            counts_list.append(0)
-        counts_list[index] += item.count
-    for counts_list in counts_lists.values():
-        while len(counts_list) <= index:
-            counts_list.append(0)
-    datasets = [
-        {"label": str(key), "data": counts_lists[key], "fill": "-1"}
-        for key in sorted(counts_lists.keys())
-    ]
+    qs = _resolution_queryset(request, NumberCount, NumberRollup)
+    qs = _date_range(qs.filter(name=measure), request)
+    return qs.values_list("summary_id", "number", "count")
+
+
+def _rbac_stats_data(rows, bucket):
+    labels, series = pivot(rows, power_of_two_bucket if bucket else None)
+    datasets = [{"label": str(key), "data": series[key], "fill": "-1"} for key in sorted(series)]
     if bucket:
-        last_label = 0
-        for dataset in datasets:
-            label = int(dataset["label"])
-            if last_label < label:
-                dataset["label"] = f"{last_label}-{label}"
-            last_label = label + 1
+        _bucket_labels(datasets)
 
     if datasets:
         datasets[0]["fill"] = "origin"
-    return JsonResponse({"labels": labels, "datasets": datasets})
+    return {"labels": labels, "datasets": datasets}
+
+
+def _recent_range(qs, request, field="summary_id"):
+    """Like `_date_range()`, starting `DISTINCT_DAYS` ago if there is no `start_date`."""
+    if request.GET.get("start_date") is None:
+        start = timezone.now().date() - timedelta(days=DISTINCT_DAYS)
+        qs = qs.filter(**{f"{field}__gte": start})
+    return _date_range(qs, request, field)
+
+
+def _distinct_systems_queryset(request):
+    qs = DistinctSystemsSketch.objects.order_by("summary_id")
+    return _recent_range(qs.values_list("summary_id", "name", "registers"), request)
+
+
+def _distinct_systems_data(rows):
+    days = set()
+    sketches = defaultdict(HyperLogLog)
+    for date, name, registers in rows:
+        days.add(date)
+        sketches[name].merge(HyperLogLog(registers))
+    systems = sketches.pop("", None)
+    return {
+        "days": len(days),
+        "systems": systems.count() if systems is not None else 0,
+        "components": {name: sketch.count() for name, sketch in sorted(sketches.items())},
+    }
+
+
+def _plugin_names(request, parameter):
+    names = [name for name in request.GET.get(parameter, "").split(",") if name]
+    for name in names:
+        if name not in PLUGINS:
+            raise BadRequest(f"Unknown plugin {name}.")
+    return names
+
+
+def _plugin_systems_query(request):
+    all_of = _plugin_names(request, "all_of")
+    any_of = _plugin_names(request, "any_of")
+    if not all_of and not any_of:
+        raise BadRequest("Select plugins with all_of and/or any_of.")
+    qs = SystemBitmap.objects.filter(name__in={*all_of, *any_of}).order_by("summary_id")
+    return _recent_range(qs.values_list("summary_id", "name", "bitmap"), request), all_of, any_of
+
+
+def _plugin_systems_data(rows, all_of, any_of):
+    return {"systems": len(combine(rows, all_of, any_of))}
+
+
+def _plugin_cooccurrence_query(request):
+    """The counts in the range, and its summaries, which are the days the means are taken over."""
+    qs = CooccurrenceCount.objects.filter(name__in=PLUGINS, other__in=PLUGINS)
+    qs = _recent_range(qs.values_list("name", "other", "count"), request)
+    return qs, _recent_range(DailySummary.objects.all(), request, field="date")
+
+
+def _plugin_cooccurrence_data(rows, days):
+    totals = defaultdict(int)
+    for name, other, count in rows:
+        totals[name, other] += count
+    labels = sorted({name for pair in totals for name in pair})
+    datasets = [
+        {
+            "label": name,
+            "data": [totals.get(tuple(sorted((name, other))), 0) / days for other in labels],
+        }
+        for name in labels
+    ]
+    return {"labels": labels, "datasets": datasets}
+
+
+def _dashboard_querysets(daily_summary):
+    """One query per table for all charts of the dashboard, see `_dashboard_data`."""
+    # Demography shows the ages of the latest summary, whatever the start of systems by age.
+    latest = Q(summary=daily_summary) if daily_summary is not None else Q()
+    return {
+        "deployment_rows": DeploymentStats.objects.order_by("summary_id").values_list(
+            "summary_id",
+            "online_content_app_processes_avg",
+            "online_content_app_hosts_avg",
+            "online_worker_processes_avg",
+            "online_worker_hosts_avg",
+        ),
+        "age_rows": AgeCount.objects.filter(Q(summary_id__gte=DASHBOARD_AGES_SINCE) | latest)
+        .order_by("summary_id", "-age")
+        .values_list("summary_id", "age", "count"),
+        "number_rows": NumberCount.objects.filter(
+            name__in=RBAC_MEASURES, summary_id__gte=DASHBOARD_RBAC_SINCE
+        )
+        .order_by("summary_id")
+        .values_list("name", "summary_id", "number", "count"),
+        "version_rows": XYVersionCount.objects.filter(name__in=PLUGINS)
+        .order_by("summary_id")
+        .values_list("name", "summary_id", "version", "count"),
+        "postgresql_versions": PostgresVersionCount.objects.filter(summary=daily_summary).order_by(
+            "version"
+        ),
+    }
+
+
+def _dashboard_data(
+    daily_summary, deployment_rows, age_rows, number_rows, version_rows, postgresql_versions
+):
+    """The default series of every chart of the dashboard, by the id of its canvas."""
+    numbers = {measure: [] for measure in RBAC_MEASURES}
+    for name, *row in number_rows:
+        numbers[name].append(row)
+    versions = {plugin: [] for plugin in PLUGINS}
+    for name, *row in version_rows:
+        versions[name].append(row)
+    latest = daily_summary.date if daily_summary is not None else None
+    ages = [(age, count) for date, age, count in age_rows if date == latest]
+
+    data = {
+        "content-app-graph": _deployment_stats_data([row[:3] for row in deployment_rows]),
+        "worker-graph": _deployment_stats_data([row[:1] + row[3:] for row in deployment_rows]),
+        "systems-by-age-graph": _systems_by_age_data(
+            (row for row in age_rows if row[0] >= DASHBOARD_AGES_SINCE), bucket=True
+        ),
+    }
+    for measure, rows in numbers.items():
+        data[f"{measure.replace('_', '-')}-graph"] = _rbac_stats_data(rows, bucket=True)
+    for plugin, rows in versions.items():
+        data[f"{plugin}-versions"] = _plugin_stats_data(rows)
+    data["demography-graph"] = _demography_data(ages)
+    data["postgresql-versions-graph"] = _postgresql_versions_data(
+        daily_summary, postgresql_versions
+    )
+    return data
+
+
+@require_GET
+@cached_chart("postgresql_versions")
+def postgresql_versions_view(request):
+    daily_summary = _latest_summary_queryset(request).last()
+    items = []
+    if daily_summary is not None:
+        items = list(daily_summary.postgresversioncount_set.order_by("version"))
+    return JsonResponse(_postgresql_versions_data(daily_summary, items))
+
+
+@require_GET
+@cached_chart("deployment_stats")
+def deployment_stats_view(request, component):
+    rows = list(_deployment_stats_queryset(request, component))
+    return _series_response(request, _deployment_stats_data(rows))
+
+
+@require_GET
+@cached_chart("plugin_stats")
+def plugin_stats_view(request, plugin):
+    rows = _plugin_stats_queryset(request, plugin).iterator()
+    return _series_response(request, _plugin_stats_data(rows))
+
+
+@require_GET
+@cached_chart("distinct_systems")
+def distinct_systems_view(request):
+    """Estimate the distinct systems of a range of days, by default the last 30, overall and per
+    component."""
+    return JsonResponse(_distinct_systems_data(_distinct_systems_queryset(request)))
+
+
+@require_GET
+@cached_chart("plugin_systems")
+def plugin_systems_view(request):
+    """Count the systems that, on one day of the range, reported all plugins of `all_of` and at
+    least one of `any_of`."""
+    qs, all_of, any_of = _plugin_systems_query(request)
+    return JsonResponse(_plugin_systems_data(qs, all_of, any_of))
+
+
+@require_GET
+@cached_chart("plugin_cooccurrence")
+def plugin_cooccurrence_view(request):
+    """The mean number of systems per day reporting both of two plugins, for every pair."""
+    qs, days = _plugin_cooccurrence_query(request)
+    return JsonResponse(_plugin_cooccurrence_data(qs, days.count()))
+
+
+@require_GET
+@cached_chart("demography")
+def demography_view(request):
+    daily_summary = _latest_summary_queryset(request).last()
+    rows = []
+    if daily_summary is not None:
+        rows = list(daily_summary.agecount_set.order_by("-age").values_list("age", "count"))
+    return _series_response(request, _demography_data(rows), columnar.demography)
+
+
+@require_GET
+@cached_chart("systems_by_age")
+def systems_by_age_view(request):
+    rows = _systems_by_age_queryset(request).iterator()
+    return _series_response(request, _systems_by_age_data(rows, request.GET.get("bucket")))
+
+
+@require_GET
+@cached_chart("rbac_stats")
+def rbac_stats_view(request, measure):
+    rows = _rbac_stats_queryset(request, measure).iterator()
+    return _series_response(request, _rbac_stats_data(rows, request.GET.get("bucket")))
+
+
+@require_GET
+@cached_chart("dashboard")
+def dashboard_view(request):
+    """Every chart of the dashboard in one response, keyed by the id of its canvas."""
+    daily_summary = DailySummary.objects.order_by("date").last()
+    rows = {name: list(qs.iterator()) for name, qs in _dashboard_querysets(daily_summary).items()}
+    return JsonResponse(_dashboard_data(daily_summary, **rows))
+
+
+EXPORT_PERMISSION = "pulpanalytics.view_dailysummary"
+
+
+def _export_query(request, table):
+    """The encoder, rows and file name of the `table` export `request` asks for."""
+    if table not in export.TABLES:
+        raise Http404("Not found")
+    export_format = request.GET.get("format", "csv")
+    if export_format not in export.ENCODERS:
+        raise BadRequest(f"Unknown format {export_format}.")
+    model = export.TABLES[table]
+    qs = export.export_queryset(model, request.GET.get("start_date"), request.GET.get("end_date"))
+    return export.ENCODERS[export_format](model), qs, f"{table}.{export_format}"
+
+
+def _export_response(content, encoder, filename):
+    response = StreamingHttpResponse(content, content_type=encoder.content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_GET
+def export_view(request, table):
+    """Stream a summary table from `start_date` to `end_date` as CSV or `?format=parquet`."""
+    if not request.user.has_perm(EXPORT_PERMISSION):
+        raise PermissionDenied
+    encoder, qs, filename = _export_query(request, table)
+    return _export_response(export.stream(encoder, qs.iterator()), encoder, filename)
+
+
+def _dashboard_payload():
+    request = HttpRequest()
+    request.method = "GET"
+    return json.loads(dashboard_view(request).content)
+
+
+def _index_content(request, dashboard=None):
+    template = loader.get_template("pulpanalytics/index.html")
+    context = {
+        "PLUGINS": PLUGINS,
+        "dashboard": dashboard,
+        "deployment": settings.PULP_DEPLOYMENT,
+        "revision": _get_git_revision(),
+    }
+    return template.render(context, request)
+
+
+def _render_index(request):
+    if not settings.INLINE_DASHBOARD:
+        return HttpResponse(_index_content(request))
+    # The page embeds the dashboard data, it is cached like a chart.
+    state = state_queryset(request).first()
+    key = chart_cache.key("index", request, {"revision": _get_git_revision()}, state)
+    content = chart_cache.cache.get(key)
+    chart_cache.count(content is not None)
+    if content is None:
+        content = _index_content(request, _dashboard_payload())
+        chart_cache.cache.set(key, content)
+    return HttpResponse(content)
+
+
+def _receive_checkin(request):
+    try:
+        body = decoded_body(request, settings.INGEST_MAX_DECODED_SIZE)
+    except BodyDecodingError as e:
+        return HttpResponse(str(e), status=e.status)
+    analytics = Analytics()
+    analytics.ParseFromString(body)
+
+    with suppress(LogAndDropData):
+        system_id = validate_checkin(analytics)
+        today = timezone.now().date()
+        if duplicate_filter.seen(system_id, today):
+            return HttpResponse()
+        if settings.INGEST_MODE == "buffered":
+            # Queued check-ins may still be dropped or fail, the buffer adds the stored ones.
+            if not checkin_buffer.put(analytics):
+                return HttpResponse("Too many check-ins, try again later.", status=503)
+        else:
+            save_checkin(analytics)
+            # Either stored now or already stored today, the unique constraint guarantees the row.
+            duplicate_filter.add(system_id, today)
+
+    return HttpResponse()
+
+
+def _receive_batch(request):
+    try:
+        stream = decoded_stream(request, settings.INGEST_BATCH_MAX_DECODED_SIZE)
+        result = save_batch(stream)
+    except BodyDecodingError as e:
+        return HttpResponse(str(e), status=e.status)
+    except MalformedBatch as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse(result._asdict())
+
+
+@csrf_exempt
+@require_POST
+def batch_view(request):
+    """Store a stream of length-delimited `Analytics` messages, as sent by relays."""
+    return _receive_batch(request)
+
+
+@require_GET
+def runtime_stats_view(request):
+    """Counters of the process answering the request, each worker keeps its own."""
+    return JsonResponse(
+        {"duplicate_filter": duplicate_filter.stats(), "chart_cache": chart_cache.stats()}
+    )
 
 
 @method_decorator(csrf_exempt, name="dispatch")
 class RootView(View):
     def get(self, request):
-        template = loader.get_template("pulpanalytics/index.html")
-        context = {
-            "PLUGINS": PLUGINS,
-            "deployment": settings.PULP_DEPLOYMENT,
-            "revision": _get_git_revision(),
-        }
-        return HttpResponse(template.render(context, request))
+        return _render_index(request)
 
     def post(self, request):
-        analytics = Analytics()
-        analytics.ParseFromString(request.body)
-
-        kwargs = {}
-        if analytics.HasField("rbac_stats"):
-            kwargs["users"] = analytics.rbac_stats.users
-            kwargs["groups"] = analytics.rbac_stats.groups
-            kwargs["domains"] = analytics.rbac_stats.domains
-            kwargs["custom_access_policies"] = analytics.rbac_stats.custom_access_policies
-            kwargs["custom_roles"] = analytics.rbac_stats.custom_roles
-        with suppress(IntegrityError), transaction.atomic():
-            system = System.objects.create(
-                system_id=analytics.system_id,
-                postgresql_version=analytics.postgresql_version,
-                content_app_processes=analytics.online_content_apps.processes,
-                content_app_hosts=analytics.online_content_apps.hosts,
-                worker_processes=analytics.online_workers.processes,
-                worker_hosts=analytics.online_workers.hosts,
-                **kwargs,
-            )
-            _save_components(system, analytics)
-
-        return HttpResponse()
+        return _receive_checkin(request)
@@ -2,4 +2,8 @@
 
 ./manage.py migrate
 
-gunicorn -b "0.0.0.0:8080" app.wsgi
+if [ "$SERVER_INTERFACE" = "asgi" ]; then
+    gunicorn -b "0.0.0.0:8080" -k uvicorn.workers.UvicornWorker app.asgi
+else
+    gunicorn -b "0.0.0.0:8080" app.wsgi
+fi